@@ -0,0 +1,168 @@
+"""История изменений simple_history для пакетных загрузок и ее сжатие.
+
+`HistoricalRecords` пишет историческую строку отдельным INSERT на каждый save() и
+delete(). Внутри `bulk_history(change_set)` эти строки копятся в памяти и записываются
+через bulk_create при выходе из блока, а всем историческим строкам блока, в том числе
+из `bulk_history_create`, проставляется причина изменения `change_set` - по ней
+видно, какой запуск задачи сделал изменение.
+
+`compact_history` ограничивает рост таблиц истории: записи старше срока хранения
+сворачиваются в один снимок на объект, история давно удаленных объектов удаляется.
+"""
+
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime, timedelta
+
+from django.apps import apps
+from django.db import transaction
+from django.db.models import Exists, OuterRef
+from django.utils import timezone
+from loguru import logger
+from simple_history.manager import HistoryManager
+from simple_history.models import HistoricalRecords
+
+
+HISTORY_BATCH_SIZE = 1000  # строк истории в одном INSERT/DELETE
+
+_change_set: ContextVar["ChangeSet | None"] = ContextVar("history_change_set", default=None)
+
+
+class ChangeSet:
+    def __init__(self, reason: str):
+        self.reason = reason
+        self.records: dict[type, list] = {}
+
+    def flush(self):
+        for history_model, records in self.records.items():
+            history_model.objects.bulk_create(records, batch_size=HISTORY_BATCH_SIZE)
+        self.records.clear()
+
+
+def current_change_set() -> str:
+    change_set = _change_set.get()
+    return change_set.reason if change_set is not None else ""
+
+
+@contextmanager
+def bulk_history(reason: str = ""):
+    """Копит историю save()/delete() блока и пишет ее пачкой с причиной `reason`.
+
+    Блок выполняется в транзакции, история пишется до ее коммита: транзакции
+    вызываемых функций становятся точками сохранения, и изменения фиксируются только
+    вместе со своей историей. Если блок или запись истории завершились исключением,
+    откатываются и изменения, и история. Вложенный блок входит во внешний.
+    """
+    if _change_set.get() is not None:
+        yield
+        return
+
+    change_set = ChangeSet(reason)
+    token = _change_set.set(change_set)
+    try:
+        with transaction.atomic():
+            yield
+            change_set.flush()
+    finally:
+        _change_set.reset(token)
+
+
+def task_change_set(task) -> str:
+    """Причина изменения для истории задачи Celery: имя задачи и id запуска."""
+    return f"{task.name} {task.request.id}" if task.request.id else task.name
+
+
+class ChangeSetHistoryManager(HistoryManager):
+    def bulk_history_create(self, objs, *args, default_change_reason="", **kwargs):
+        return super().bulk_history_create(
+            objs,
+            *args,
+            default_change_reason=default_change_reason or current_change_set(),
+            **kwargs,
+        )
+
+
+class ChangeSetHistoricalRecords(HistoricalRecords):
+    """HistoricalRecords, откладывающий запись истории до конца блока `bulk_history`.
+
+    Отложенные строки пишутся без сигналов pre/post_create_historical_record и без
+    истории многие-ко-многим: в проекте они не используются.
+    """
+
+    def __init__(self, *args, **kwargs):
+        kwargs.setdefault("history_manager", ChangeSetHistoryManager)
+        super().__init__(*args, **kwargs)
+
+    def get_change_reason_for_object(self, instance, history_type, using):
+        return super().get_change_reason_for_object(instance, history_type, using) or current_change_set()
+
+    def create_historical_record(self, instance, history_type, using=None):
+        change_set = _change_set.get()
+        if change_set is None:
+            return super().create_historical_record(instance, history_type, using=using)
+
+        history_model = getattr(instance, self.manager_name).model
+        change_set.records.setdefault(history_model, []).append(
+            history_model(
+                history_date=getattr(instance, "_history_date", timezone.now()),
+                history_type=history_type,
+                history_user=self.get_history_user(instance),
+                history_change_reason=self.get_change_reason_for_object(instance, history_type, using),
+                **{field.attname: getattr(instance, field.attname) for field in self.fields_included(instance)},
+            ),
+        )
+        return None
+
+
+def history_models() -> list:
+    """Модели, история которых ведется simple_history."""
+    return [
+        model
+        for model in apps.get_models()
+        if hasattr(model._meta, "simple_history_manager_attribute")  # noqa: SLF001
+    ]
+
+
+def delete_in_batches(queryset) -> int:
+    deleted = 0
+    while ids := list(queryset.values_list("history_id", flat=True)[:HISTORY_BATCH_SIZE]):
+        with transaction.atomic():
+            deleted += queryset.model.objects.filter(history_id__in=ids).delete()[0]
+    return deleted
+
+
+def compact_history(model, cutoff: datetime, dry_run: bool = False) -> int:
+    """Сворачивает историю `model` до `cutoff` в последний снимок каждого объекта.
+
+    Состояние объекта на любой момент после `cutoff` остается восстановимым. История
+    объектов, удаленных до `cutoff`, удаляется целиком. Возвращает число удаляемых строк.
+    """
+    history = model.history.model
+    key = model._meta.pk.attname  # noqa: SLF001
+    old = history.objects.filter(history_date__lt=cutoff)
+
+    newer = history.objects.filter(
+        **{key: OuterRef(key)},
+        history_date__lt=cutoff,
+        history_id__gt=OuterRef("history_id"),
+    )
+    superseded = old.filter(Exists(newer))
+    deleted_objects = history.objects.filter(
+        **{f"{key}__in": old.filter(history_type="-").values(key)},
+    ).exclude(**{f"{key}__in": history.objects.filter(history_date__gte=cutoff).values(key)})
+
+    if dry_run:
+        return superseded.count() + deleted_objects.exclude(history_id__in=superseded.values("history_id")).count()
+    return delete_in_batches(superseded) + delete_in_batches(deleted_objects)
+
+
+def compact_all_history(retention_days: int, dry_run: bool = False) -> dict[str, int]:
+    """Сжимает историю всех моделей с simple_history. Возвращает число удаляемых строк по моделям."""
+    cutoff = timezone.now() - timedelta(days=retention_days)
+    counts = {}
+    for model in history_models():
+        label = model._meta.label  # noqa: SLF001
+        counts[label] = compact_history(model, cutoff, dry_run=dry_run)
+        if counts[label] and not dry_run:
+            logger.info(f"{label}: удалено строк истории {counts[label]}")
+    return counts
@@ -0,0 +1,20 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from core.history import compact_all_history
+
+
+class Command(BaseCommand):
+    help = "Collapse simple_history rows older than the retention period into one snapshot per object"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--days", type=int, default=settings.HISTORY_RETENTION_DAYS, help="Retention period")
+        parser.add_argument("--dry-run", action="store_true", help="Only count rows to delete")
+
+    def handle(self, *args, **options):
+        counts = compact_all_history(options["days"], dry_run=options["dry_run"])
+        for label, count in counts.items():
+            if count:
+                self.stdout.write(f"{label}: {count}")
+        verb = "Would delete" if options["dry_run"] else "Deleted"
+        self.stdout.write(self.style.SUCCESS(f"{verb} {sum(counts.values())} history rows"))
@@ -2,6 +2,7 @@
 from django.core.management.base import BaseCommand
 from edu_programs.const import POSSIBLE_DEGREES
 from edu_programs.models import EduDegree, Faculty, University
+from edu_programs.sources import SOURCES
 
 
 class Command(BaseCommand):
@@ -10,33 +11,27 @@ class Command(BaseCommand):
     def handle(self, *args, **options):
         self.stdout.write("Starting database initialization...")
 
-        # Создаем университет
-        university, created = University.objects.get_or_create(
-            name="Воронежский государственный университет",
-            defaults={"abbreviation": "ВГУ"},
-        )
-        if created:
-            self.stdout.write(self.style.SUCCESS(f"Created University: {university}"))
-        else:
-            self.stdout.write(self.style.WARNING(f"University already exists: {university}"))
-
-        # Создаем факультеты
-        faculties_data = [
-            {"name": "Компьютерных наук", "abbreviation": "ФКН"},
-            {"name": "Математический", "abbreviation": "МатФак"},
-            {"name": "Прикладной математики, информатики и механики", "abbreviation": "ПММ"},
-        ]
-
+        # Создаем университеты и факультеты источников программ
         created_faculties = 0
-        for data in faculties_data:
-            faculty, created = Faculty.objects.get_or_create(
-                university=university,
-                name=data["name"],
-                defaults={"abbreviation": data["abbreviation"]},
+        for source in SOURCES.values():
+            university, created = University.objects.get_or_create(
+                name=source.name,
+                defaults={"abbreviation": source.abbreviation},
             )
             if created:
-                created_faculties += 1
-                self.stdout.write(self.style.SUCCESS(f"Created Faculty: {faculty}"))
+                self.stdout.write(self.style.SUCCESS(f"Created University: {university}"))
+            else:
+                self.stdout.write(self.style.WARNING(f"University already exists: {university}"))
+
+            for name, abbreviation in source.faculties:
+                faculty, created = Faculty.objects.get_or_create(
+                    university=university,
+                    name=name,
+                    defaults={"abbreviation": abbreviation},
+                )
+                if created:
+                    created_faculties += 1
+                    self.stdout.write(self.style.SUCCESS(f"Created Faculty: {faculty}"))
 
         self.stdout.write(self.style.SUCCESS(f"Created {created_faculties} faculties"))
 
@@ -1,9 +1,10 @@
 from django.db.models import Model
-from simple_history.models import HistoricalRecords
+
+from core.history import ChangeSetHistoricalRecords
 
 
 class BaseModel(Model):
-    history = HistoricalRecords(inherit=True)
+    history = ChangeSetHistoricalRecords(inherit=True)
 
     class Meta:
         abstract = True
@@ -0,0 +1,10 @@
+from rest_framework.pagination import CursorPagination
+
+
+class KeysetPagination(CursorPagination):
+    """Пагинация по ключу: страница любой глубины - один индексный запрос без OFFSET и COUNT."""
+
+    ordering = "id"
+    page_size = 50
+    page_size_query_param = "page_size"
+    max_page_size = 500
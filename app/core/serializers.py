@@ -3,3 +3,16 @@ from rest_framework import serializers
 
 class HealthSerializer(serializers.Serializer):
     status = serializers.CharField()
+
+
+class SparseFieldsMixin:
+    """Оставляет в ответе только поля из параметра запроса `?fields=id,name`."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        request = self.context.get("request")
+        requested = request.query_params.get("fields") if request else None
+        if requested:
+            allowed = {name.strip() for name in requested.split(",")}
+            for name in set(self.fields) - allowed:
+                self.fields.pop(name)
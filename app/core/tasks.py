@@ -0,0 +1,11 @@
+from celery import shared_task
+from django.conf import settings
+
+from core.history import compact_all_history
+
+
+@shared_task
+def compact_history_task():
+    """Сворачивает историю изменений старше `HISTORY_RETENTION_DAYS`."""
+    counts = compact_all_history(settings.HISTORY_RETENTION_DAYS)
+    return f"Удалено {sum(counts.values())} строк истории"
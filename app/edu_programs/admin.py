@@ -1,7 +1,16 @@
+import base64
+
 from django.contrib import admin
+from django.contrib.admin.views.main import ORDER_VAR
+from django.db.models import Value
+from django.db.models.functions import Concat
+from django.utils.html import format_html
 from simple_history.admin import SimpleHistoryAdmin
 
 from edu_programs.models import (
+    Competency,
+    Discipline,
+    DocumentArtifact,
     EducationGroup,
     EduDegree,
     Faculty,
@@ -9,8 +18,53 @@ from edu_programs.models import (
     ProfessionalStandard,
     ProfessionalStandardGroup,
     Program,
+    ProgramScore,
     University,
 )
+from edu_programs.search import search_professional_standards, search_programs
+
+
+class FullCodeAdminMixin:
+    """Колонка "Полный код", собираемая в SQL из полей `full_code_fields`.
+
+    Связи из `list_select_related` подтягиваются и в `get_queryset`, поэтому `__str__`
+    не делает запросов ни в списке, ни в автодополнении других админок.
+    """
+
+    full_code_fields = ()
+
+    def get_queryset(self, request):
+        parts = []
+        for field in self.full_code_fields:
+            parts.extend((field, Value(".")))
+        return (
+            super()
+            .get_queryset(request)
+            .select_related(*self.list_select_related)
+            .annotate(full_code_sql=Concat(*parts[:-1]))
+        )
+
+    @admin.display(description="Полный код", ordering="full_code_sql")
+    def full_code(self, obj):
+        return obj.full_code_sql
+
+
+class RankedSearchAdminMixin:
+    """Поиск в списке через `search_function` из `edu_programs.search` вместо `search_fields`.
+
+    Найденное идет в порядке релевантности, пока сортировка не выбрана в заголовке списка.
+    """
+
+    search_function = None
+
+    def get_search_results(self, request, queryset, search_term):
+        if not search_term:
+            return super().get_search_results(request, queryset, search_term)
+        results = self.search_function(search_term, queryset)
+        if ORDER_VAR in request.GET:
+            # список сортируется до поиска, `search_function` заменяет эту сортировку своей
+            results = results.order_by(*queryset.query.order_by)
+        return results, False
 
 
 @admin.register(University)
@@ -25,6 +79,8 @@ class FacultyAdmin(SimpleHistoryAdmin):
     list_display = ("name", "abbreviation", "university")
     search_fields = ("name", "abbreviation", "university__name")
     list_filter = ("university",)
+    list_select_related = ("university",)
+    autocomplete_fields = ("university",)
 
 
 @admin.register(ProfessionalStandardGroup)
@@ -40,16 +96,14 @@ class EducationGroupAdmin(SimpleHistoryAdmin):
 
 
 @admin.register(ProfessionalStandard)
-class ProfessionalStandardAdmin(SimpleHistoryAdmin):
+class ProfessionalStandardAdmin(RankedSearchAdminMixin, FullCodeAdminMixin, SimpleHistoryAdmin):
     list_display = ("full_code", "name", "code", "professional_standard_group")
     search_fields = ("name", "code", "professional_standard_group__name")
     list_filter = ("professional_standard_group",)
-
-    def full_code(self, obj):
-        return f"{obj.professional_standard_group.code}.{obj.code}"
-
-    full_code.short_description = "Полный код"
-    full_code.admin_order_field = "code"
+    list_select_related = ("professional_standard_group",)
+    autocomplete_fields = ("professional_standard_group",)
+    full_code_fields = ("professional_standard_group__code", "code")
+    search_function = staticmethod(search_professional_standards)
 
 
 @admin.register(EduDegree)
@@ -59,10 +113,13 @@ class EduDegreeAdmin(SimpleHistoryAdmin):
 
 
 @admin.register(FederalStateEducationStandard)
-class FederalStateEducationStandardAdmin(SimpleHistoryAdmin):
+class FederalStateEducationStandardAdmin(FullCodeAdminMixin, SimpleHistoryAdmin):
     list_display = ("full_code", "name", "code", "edu_group", "edu_degree")
     search_fields = ("name", "code", "edu_group__name", "edu_degree__name")
     list_filter = ("edu_group", "edu_degree")
+    list_select_related = ("edu_group", "edu_degree")
+    autocomplete_fields = ("edu_group", "edu_degree")
+    full_code_fields = ("edu_group__code", "edu_degree__code", "code")
     fieldsets = (
         (
             None,
@@ -77,15 +134,38 @@ class FederalStateEducationStandardAdmin(SimpleHistoryAdmin):
         ),
     )
 
-    def full_code(self, obj):
-        return f"{obj.edu_group.code}.{obj.edu_degree.code}.{obj.code}"
 
-    full_code.short_description = "Полный код"
-    full_code.admin_order_field = "code"
+class DisciplineInline(admin.TabularInline):
+    model = Discipline
+    fields = ("index", "name", "competencies")
+    extra = 0
+
+
+class CompetencyInline(admin.TabularInline):
+    model = Competency
+    fields = ("code", "description")
+    extra = 0
+
+
+def preview_html(artifact: DocumentArtifact | None) -> str:
+    if artifact is None:
+        return "Данные документа еще не извлечены"
+    if not artifact.preview:
+        return f"Страниц: {artifact.page_count}"
+    try:
+        with artifact.preview.open("rb") as file:
+            image = base64.b64encode(file.read()).decode()
+    except OSError:
+        return f"Страниц: {artifact.page_count}, файл превью недоступен"
+    return format_html(
+        '<img src="data:image/png;base64,{}" alt="" style="border: 1px solid #ccc"><p>Страниц: {}</p>',
+        image,
+        artifact.page_count,
+    )
 
 
 @admin.register(Program)
-class ProgramAdmin(SimpleHistoryAdmin):
+class ProgramAdmin(RankedSearchAdminMixin, FullCodeAdminMixin, SimpleHistoryAdmin):
     list_display = (
         "full_code",
         "code",
@@ -98,11 +178,16 @@ class ProgramAdmin(SimpleHistoryAdmin):
     )
     search_fields = ("code", "name", "university__name", "faculty__name", "edu_group__name")
     list_filter = (
-        "university",
-        "faculty",
+        ("university", admin.RelatedOnlyFieldListFilter),
+        ("faculty", admin.RelatedOnlyFieldListFilter),
         "edu_degree",
     )
-    filter_horizontal = ("professional_standards",)
+    list_select_related = ("edu_group", "edu_degree", "university", "faculty")
+    autocomplete_fields = ("university", "faculty", "edu_group", "edu_degree", "professional_standards")
+    full_code_fields = ("edu_group__code", "edu_degree__code", "code")
+    inlines = (DisciplineInline, CompetencyInline)
+    readonly_fields = ("document_preview",)
+    search_function = staticmethod(search_programs)
     fieldsets = (
         (
             None,
@@ -118,13 +203,55 @@ class ProgramAdmin(SimpleHistoryAdmin):
                     "approval_year",
                     "professional_standards",
                     "document",
+                    "document_preview",
                 ),
             },
         ),
     )
 
-    def full_code(self, obj):
-        return f"{obj.edu_group.code}.{obj.edu_degree.code}.{obj.code}"
+    def document_preview(self, obj):
+        artifact = DocumentArtifact.objects.filter(pk=obj.document_hash).first() if obj.document_hash else None
+        return preview_html(artifact)
+
+    document_preview.short_description = "Превью документа"
+
+
+@admin.register(Discipline)
+class DisciplineAdmin(SimpleHistoryAdmin):
+    list_display = ("index", "name", "competencies", "program")
+    search_fields = ("index", "name", "competencies")
+    list_select_related = ("program__edu_group", "program__edu_degree")
+
+
+@admin.register(Competency)
+class CompetencyAdmin(SimpleHistoryAdmin):
+    list_display = ("code", "description", "program")
+    search_fields = ("code", "description")
+    list_select_related = ("program__edu_group", "program__edu_degree")
+
+
+@admin.register(ProgramScore)
+class ProgramScoreAdmin(admin.ModelAdmin):
+    list_display = ("program", "demand", "uniqueness", "computed_at")
+    readonly_fields = ("program", "demand", "uniqueness", "components", "computed_at")
+    list_select_related = ("program__edu_group", "program__edu_degree")
+    ordering = ("-demand",)
+
+    def has_add_permission(self, request):
+        return False
+
+
+@admin.register(DocumentArtifact)
+class DocumentArtifactAdmin(admin.ModelAdmin):
+    list_display = ("document_hash", "page_count", "created_at")
+    search_fields = ("document_hash",)
+    fields = ("document_hash", "page_count", "created_at", "preview_image")
+    readonly_fields = fields
+
+    def preview_image(self, obj):
+        return preview_html(obj)
+
+    preview_image.short_description = "Превью первой страницы"
 
-    full_code.short_description = "Полный код"
-    full_code.admin_order_field = "code"
+    def has_add_permission(self, request):
+        return False
@@ -0,0 +1,161 @@
+"""Оценки востребованности и уникальности образовательных программ.
+
+Оценки считаются сразу для всех программ по матрицам инцидентности
+"программа x признак" (профессиональные стандарты, дисциплины), которые хранятся
+как пары индексов строк и столбцов. Веса составляющих берутся из `ANALYTICS_CONFIG`:
+
+- востребованность: `employment` - число профессиональных стандартов программы
+  относительно максимального по всем программам, `disciplines` - доля дисциплин,
+  формирующих профессиональные компетенции (ПК);
+- уникальность: `competencies` - средняя редкость профессиональных стандартов программы
+  (по ним формируются профессиональные компетенции), `disciplines` - средняя редкость
+  ее дисциплин среди всех программ.
+"""
+
+from typing import NamedTuple
+
+import numpy as np
+import pandas as pd
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from edu_programs.cache import invalidate
+from edu_programs.const import ANALYTICS_SCORE_PRECISION, INGESTION_BATCH_SIZE
+from edu_programs.models import Discipline, Program, ProgramScore
+
+
+PROFESSIONAL_COMPETENCY = r"(?<![А-ЯЁ])ПК-\d"
+
+
+class Scores(NamedTuple):
+    program_ids: np.ndarray
+    demand: np.ndarray
+    uniqueness: np.ndarray
+    components: dict[str, np.ndarray]
+
+
+def feature_rarity(rows: np.ndarray, cols: np.ndarray, n_programs: int) -> tuple[np.ndarray, np.ndarray]:
+    """Число признаков каждой программы и их средняя редкость.
+
+    `rows`, `cols` - ненулевые ячейки матрицы инцидентности, повторы схлопываются.
+    Редкость признака - 1, если он есть только у одной программы, и 0, если у всех.
+    """
+    counts = np.zeros(n_programs)
+    rarity = np.zeros(n_programs)
+    if not len(rows):
+        return counts, rarity
+
+    n_features = int(cols.max()) + 1
+    cells = np.unique(rows.astype(np.int64) * n_features + cols)
+    rows, cols = np.divmod(cells, n_features)
+
+    frequency = np.bincount(cols, minlength=n_features)
+    weights = 1 - (frequency - 1) / max(n_programs - 1, 1)
+
+    counts = np.bincount(rows, minlength=n_programs).astype(float)
+    total = np.bincount(rows, weights=weights[cols], minlength=n_programs)
+    np.divide(total, counts, out=rarity, where=counts > 0)
+    return counts, rarity
+
+
+def standard_incidence(program_ids: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Ячейки матрицы "программа x профессиональный стандарт"."""
+    links = np.array(
+        list(Program.professional_standards.through.objects.values_list("program_id", "professionalstandard_id")),
+        dtype=np.int64,
+    ).reshape(-1, 2)
+    _, cols = np.unique(links[:, 1], return_inverse=True)
+    return np.searchsorted(program_ids, links[:, 0]), cols
+
+
+def discipline_incidence(program_ids: np.ndarray) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Ячейки матрицы "программа x дисциплина" и признак профессиональной компетенции у каждой.
+
+    Дисциплины разных программ считаются одной, если совпадают названия без учета регистра и пробелов.
+    """
+    disciplines = pd.DataFrame.from_records(
+        Discipline.objects.values_list("program_id", "name", "competencies"),
+        columns=["program_id", "name", "competencies"],
+    )
+    cols, _ = pd.factorize(disciplines["name"].str.lower().str.split().str.join(" "))
+    professional = disciplines["competencies"].str.contains(PROFESSIONAL_COMPETENCY, regex=True)
+    return (
+        np.searchsorted(program_ids, disciplines["program_id"].to_numpy(dtype=np.int64)),
+        cols,
+        professional.to_numpy(dtype=float),
+    )
+
+
+def compute_scores() -> Scores:
+    """Считает оценки всех программ тремя запросами к БД."""
+    program_ids = np.fromiter(Program.objects.order_by("pk").values_list("pk", flat=True), dtype=np.int64)
+    n_programs = len(program_ids)
+
+    standard_counts, standard_rarity = feature_rarity(*standard_incidence(program_ids), n_programs)
+    discipline_rows, discipline_cols, professional = discipline_incidence(program_ids)
+    discipline_counts, discipline_rarity = feature_rarity(discipline_rows, discipline_cols, n_programs)
+
+    employment = standard_counts / standard_counts.max() if standard_counts.any() else standard_counts
+    professional_share = np.divide(
+        np.bincount(discipline_rows, weights=professional, minlength=n_programs),
+        discipline_counts,
+        out=np.zeros(n_programs),
+        where=discipline_counts > 0,
+    )
+
+    demand = settings.ANALYTICS_CONFIG["DEMAND_WEIGHTS"]
+    unique = settings.ANALYTICS_CONFIG["UNIQUE_WEIGHTS"]
+    return Scores(
+        program_ids=program_ids,
+        demand=demand["employment"] * employment + demand["disciplines"] * professional_share,
+        uniqueness=unique["competencies"] * standard_rarity + unique["disciplines"] * discipline_rarity,
+        components={
+            "employment": employment,
+            "professional_disciplines": professional_share,
+            "standards_rarity": standard_rarity,
+            "disciplines_rarity": discipline_rarity,
+        },
+    )
+
+
+@transaction.atomic
+def refresh_program_scores() -> int:
+    """Пересчитывает оценки и записывает только изменившиеся. Возвращает число записанных строк."""
+    scores = compute_scores()
+    existing = {score.program_id: score for score in ProgramScore.objects.all()}
+
+    def rounded(values):
+        return np.round(values, ANALYTICS_SCORE_PRECISION).tolist()
+
+    components = {name: rounded(values) for name, values in scores.components.items()}
+    now = timezone.now()
+    to_create, to_update = [], []
+    for i, (program_id, demand, uniqueness) in enumerate(
+        zip(scores.program_ids.tolist(), rounded(scores.demand), rounded(scores.uniqueness), strict=True),
+    ):
+        program_components = {name: values[i] for name, values in components.items()}
+        score = existing.get(program_id)
+        if score is None:
+            to_create.append(
+                ProgramScore(
+                    program_id=program_id,
+                    demand=demand,
+                    uniqueness=uniqueness,
+                    components=program_components,
+                ),
+            )
+        elif (score.demand, score.uniqueness, score.components) != (demand, uniqueness, program_components):
+            score.demand, score.uniqueness, score.components = demand, uniqueness, program_components
+            score.computed_at = now
+            to_update.append(score)
+
+    ProgramScore.objects.bulk_create(to_create, batch_size=INGESTION_BATCH_SIZE)
+    ProgramScore.objects.bulk_update(
+        to_update,
+        ["demand", "uniqueness", "components", "computed_at"],
+        batch_size=INGESTION_BATCH_SIZE,
+    )
+    if to_create or to_update:
+        invalidate(ProgramScore)
+    return len(to_create) + len(to_update)
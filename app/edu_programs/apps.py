@@ -6,5 +6,5 @@ class EduProgramsConfig(AppConfig):
     name = "edu_programs"
 
     def ready(self):
-        # Импортируем сигналы только после полной загрузки приложения
-        import edu_programs.signals  # noqa: F401
+        # Импортируем сигналы и проверки только после полной загрузки приложения
+        from edu_programs import checks, signals  # noqa: F401
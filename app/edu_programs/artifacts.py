@@ -0,0 +1,46 @@
+"""Данные, извлекаемые из документов ОПОП: текст страниц, превью первой страницы, число страниц.
+
+Данные хранятся по SHA-256 содержимого файла, поэтому один и тот же план извлекается
+из PDF один раз - для всех программ с этим файлом и для повторных разборов после
+исправления парсеров. Текст сохраняется для страниц до `CONTENT_PAGE_COUNT_LIMIT`:
+дальше парсеры не читают.
+"""
+
+from pathlib import Path
+
+import fitz  # PyMuPDF
+from django.core.files.base import ContentFile
+
+from edu_programs.const import ARTIFACT_PREVIEW_WIDTH
+from edu_programs.models import DocumentArtifact, artifact_storage
+from edu_programs.parsers.pdf_parsers import DocumentPages
+
+
+def render_preview(doc: fitz.Document) -> bytes:
+    page = doc.load_page(0)
+    zoom = ARTIFACT_PREVIEW_WIDTH / page.rect.width
+    return page.get_pixmap(matrix=fitz.Matrix(zoom, zoom)).tobytes("png")
+
+
+def extract_artifact(document_hash: str, file_path: Path | str) -> DocumentArtifact:
+    """Открывает PDF один раз и извлекает из него все данные. Запись в БД не сохраняется."""
+    with fitz.open(file_path) as doc:
+        # PostgreSQL не хранит нулевой символ в JSON
+        page_texts = [text.replace("\x00", "") for text in DocumentPages(doc)]
+        preview = render_preview(doc) if doc.page_count else b""
+        artifact = DocumentArtifact(document_hash=document_hash, page_count=doc.page_count, page_texts=page_texts)
+
+    name = f"{document_hash}.png"
+    if preview and not artifact_storage.exists(name):
+        artifact_storage.save(name, ContentFile(preview))
+    artifact.preview = name if preview else ""
+    return artifact
+
+
+def get_or_build_artifact(document_hash: str, file_path: Path | str) -> DocumentArtifact:
+    """Сохраненные данные документа или извлеченные из файла и сохраненные сейчас."""
+    artifact = DocumentArtifact.objects.filter(pk=document_hash).first()
+    if artifact is None:
+        artifact = extract_artifact(document_hash, file_path)
+        DocumentArtifact.objects.bulk_create([artifact], ignore_conflicts=True)
+    return artifact
@@ -0,0 +1,421 @@
+"""Офлайн-бенчмарк загрузки данных на записанных ответах fgosvo.ru и vsu.ru.
+
+Фикстуры записывает `record_fixtures`: `index.json` (URL -> файл ответа и Content-Type)
+и тела ответов в `responses/`. При замере записанные ответы отдает локальный HTTP
+сервер, а сессии http_client отправляют на него запросы к сайтам (`ReplayAdapter`):
+парсеры, ограничения нагрузки на хост и http_cache работают так же, как с сайтами.
+Кэш ответов на время записи и замера - временный каталог, поэтому каждый запуск
+обходит сайты с нуля.
+
+Замеряются скорость обхода сайтов и скачивания планов, время извлечения текста и
+разбора каждого документа, число запросов к БД на записанную строку и пиковый RSS
+процесса после каждого этапа. Запись в БД идет в транзакции, которая откатывается.
+
+Пиковый RSS (`cumulative_peak_rss_kb`) - максимум с запуска процесса, он не уменьшается:
+значение этапа включает память предыдущих этапов, а рост между этапами показывает
+только, насколько этап поднял максимум.
+
+Фикстуры в репозиторий не входят (каталог `BENCHMARK_FIXTURES_DIR` в .gitignore):
+сравнивать можно только результаты, полученные на одной и той же записи.
+"""
+
+import hashlib
+import json
+import resource
+import statistics
+import tempfile
+import threading
+import time
+from collections.abc import Callable, Iterable
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import urlsplit
+
+import fitz  # PyMuPDF
+import requests
+from core.history import bulk_history
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from requests.adapters import HTTPAdapter
+
+from edu_programs.artifacts import render_preview
+from edu_programs.ingestion import (
+    SyncResult,
+    delete_stored_documents,
+    save_university_programs,
+    sync_education_standards,
+    sync_professional_standards,
+)
+from edu_programs.models import Competency, Discipline, Program, University
+from edu_programs.parsers.http_cache import http_cache
+from edu_programs.parsers.http_client import fetcher, get_session
+from edu_programs.parsers.pdf_parsers import DocumentPages
+from edu_programs.parsers.web_parsers import (
+    VSU_PROGRAMS_URL,
+    extract_fgos_education_standards,
+    extract_fgos_professional_standards,
+    vsu_program_rows,
+)
+from edu_programs.sources import get_source
+from edu_programs.utils import file_sha256
+
+
+FGOS_URL = "https://fgosvo.ru/"
+SOURCE_KEY = "vsu"  # источник, листинг и планы которого записываются в фикстуры
+
+
+def peak_rss_kb() -> int:
+    """Пиковый RSS процесса с его запуска, КиБ (Linux)."""
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def url_prefixes(urls: Iterable[str]) -> set[str]:
+    return {f"{parts.scheme}://{parts.netloc}/" for parts in map(urlsplit, urls)}
+
+
+@contextmanager
+def mounted(urls: Iterable[str], adapter: HTTPAdapter):
+    """Подключает `adapter` к сессиям http_client для хостов из `urls`."""
+    sessions = [(get_session(prefix), prefix) for prefix in url_prefixes(urls)]
+    for session, prefix in sessions:
+        session.mount(prefix, adapter)
+    try:
+        yield
+    finally:
+        for session, prefix in sessions:
+            session.adapters.pop(prefix, None)
+
+
+@contextmanager
+def temporary_http_cache():
+    directory = http_cache.directory
+    with tempfile.TemporaryDirectory() as tmp:
+        http_cache.directory = Path(tmp)
+        try:
+            yield Path(tmp)
+        finally:
+            http_cache.directory = directory
+
+
+class Fixtures:
+    """Записанные ответы сайтов в каталоге `directory`."""
+
+    def __init__(self, directory: Path):
+        self.directory = Path(directory)
+        self.index_path = self.directory / "index.json"
+        self.index: dict[str, dict] = json.loads(self.index_path.read_text()) if self.index_path.is_file() else {}
+        self.lock = threading.Lock()
+
+    def body_path(self, url: str) -> Path:
+        return self.directory / "responses" / self.index[url]["file"]
+
+    def add(self, url: str, content_type: str, body: bytes):
+        name = hashlib.sha256(url.encode()).hexdigest()[:24]
+        path = self.directory / "responses" / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(body)
+        with self.lock:
+            self.index[url] = {"file": name, "content_type": content_type}
+
+    def save(self):
+        self.index_path.write_text(json.dumps(self.index, ensure_ascii=False, indent=2, sort_keys=True))
+
+    def document_urls(self) -> list[str]:
+        return sorted(url for url, entry in self.index.items() if entry["content_type"].startswith("application/pdf"))
+
+
+class RecordingAdapter(HTTPAdapter):
+    """Сохраняет успешные ответы сайтов в фикстуры."""
+
+    def __init__(self, fixtures: Fixtures):
+        super().__init__()
+        self.fixtures = fixtures
+
+    def send(self, request, **kwargs):
+        response = super().send(request, **kwargs)
+        if response.status_code == 200:  # noqa: PLR2004
+            self.fixtures.add(request.url, response.headers.get("Content-Type", ""), response.content)
+        return response
+
+
+class ReplayAdapter(HTTPAdapter):
+    """Отправляет запросы к сайтам на локальный сервер с записанными ответами."""
+
+    def __init__(self, server_url: str):
+        super().__init__()
+        self.server_url = server_url
+
+    def send(self, request, **kwargs):
+        parts = urlsplit(request.url)
+        query = f"?{parts.query}" if parts.query else ""
+        request.url = f"{self.server_url}/{parts.scheme}/{parts.netloc}{parts.path}{query}"
+        return super().send(request, **kwargs)
+
+
+class FixtureHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive, как у сайтов
+
+    def do_GET(self):  # noqa: N802
+        scheme, _, rest = self.path.lstrip("/").partition("/")
+        url = f"{scheme}://{rest}"
+        self.server.count_request()
+        if url not in self.server.fixtures.index:
+            self.send_error(404)
+            return
+
+        body = self.server.fixtures.body_path(url).read_bytes()
+        self.send_response(200)
+        self.send_header("Content-Type", self.server.fixtures.index[url]["content_type"])
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):  # noqa: A002
+        pass
+
+
+class FixtureServer(ThreadingHTTPServer):
+    """Локальный сервер, отдающий записанные ответы по исходному URL."""
+
+    daemon_threads = True
+
+    def __init__(self, fixtures: Fixtures):
+        super().__init__(("127.0.0.1", 0), FixtureHandler)
+        self.fixtures = fixtures
+        self.request_count = 0
+        self.lock = threading.Lock()
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.server_port}"
+
+    def count_request(self):
+        with self.lock:
+            self.request_count += 1
+
+
+@contextmanager
+def replay(fixtures: Fixtures):
+    """Запускает сервер фикстур и направляет на него запросы к записанным хостам."""
+    server = FixtureServer(fixtures)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        with mounted(fixtures.index, ReplayAdapter(server.url)):
+            yield server
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def record_fixtures(directory: Path, document_limit: int) -> dict:
+    """Обходит сайты ФГОС и ВГУ и сохраняет ответы и первые `document_limit` планов."""
+    fixtures = Fixtures(directory)
+    with temporary_http_cache(), mounted([FGOS_URL, VSU_PROGRAMS_URL], RecordingAdapter(fixtures)):
+        extract_fgos_professional_standards()
+        extract_fgos_education_standards()
+        hrefs = [row["plan_href"] for row in vsu_program_rows()][:document_limit]
+        with mounted(hrefs, RecordingAdapter(fixtures)):
+            fetcher.map(lambda href: fetcher.request("GET", href).content, hrefs)
+    fixtures.save()
+    return {"responses": len(fixtures.index), "documents": len(fixtures.document_urls())}
+
+
+def measure_scrape(server: FixtureServer, scrape: Callable[[], list]) -> tuple[dict, list]:
+    requests_before = server.request_count
+    started = time.perf_counter()
+    rows = scrape()
+    seconds = time.perf_counter() - started
+    request_count = server.request_count - requests_before
+    return {
+        "seconds": round(seconds, 4),
+        "requests": request_count,
+        "rows": len(rows),
+        "requests_per_second": round(request_count / seconds, 2) if seconds else None,
+        "rows_per_second": round(len(rows) / seconds, 2) if seconds else None,
+        "cumulative_peak_rss_kb": peak_rss_kb(),
+    }, rows
+
+
+def prepared_url(url: str) -> str:
+    """URL в том виде, в каком его отправляет requests и записывают фикстуры."""
+    return requests.Request("GET", url).prepare().url
+
+
+def download_documents(rows: list[dict], urls: set[str], directory: Path) -> list[dict]:
+    """Скачивает записанные планы строк листинга в `directory` через http_cache."""
+    rows = [row for row in rows if prepared_url(row["plan_href"]) in urls]
+    for i, row in enumerate(rows):
+        row["file_path"] = directory / f"{i}.pdf"
+    fetcher.map(lambda row: http_cache.download(row["plan_href"], row["file_path"]), rows)
+    return [row for row in rows if row["file_path"].is_file()]
+
+
+def summary(values: list[float]) -> dict:
+    if not values:
+        return {}
+    ordered = sorted(values)
+    return {
+        "mean": round(statistics.mean(ordered), 6),
+        "median": round(statistics.median(ordered), 6),
+        "p95": round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))], 6),
+        "max": round(ordered[-1], 6),
+        "total": round(sum(ordered), 6),
+    }
+
+
+def measure_parse(rows: list[dict]) -> tuple[dict, list[dict]]:
+    """Время извлечения текста с превью (как в `extract_artifact`) и разбора каждого плана."""
+    source = get_source(SOURCE_KEY)
+    documents, parsed_rows = [], []
+    for row in rows:
+        started = time.perf_counter()
+        with fitz.open(row["file_path"]) as doc:
+            page_texts = list(DocumentPages(doc))
+            if doc.page_count:
+                render_preview(doc)
+        extracted = time.perf_counter()
+        parsed = source.parse_pages(page_texts)
+        finished = time.perf_counter()
+
+        documents.append(
+            {
+                "url": row["plan_href"],
+                "pages": len(page_texts),
+                "extract_seconds": round(extracted - started, 6),
+                "parse_seconds": round(finished - extracted, 6),
+                "parsed": parsed is not None,
+            },
+        )
+        if parsed is not None:
+            data = {key: value for key, value in row.items() if key != "plan_href"}
+            parsed_rows.append(
+                {
+                    **data,
+                    **parsed,
+                    "document_hash": file_sha256(row["file_path"]),
+                    "parser_version": source.parser_version,
+                },
+            )
+
+    return {
+        "documents": len(documents),
+        "parsed": len(parsed_rows),
+        "pages": sum(document["pages"] for document in documents),
+        "extract_seconds": summary([document["extract_seconds"] for document in documents]),
+        "parse_seconds": summary([document["parse_seconds"] for document in documents]),
+        "cumulative_peak_rss_kb": peak_rss_kb(),
+        "per_document": documents,
+    }, parsed_rows
+
+
+def measure_step(step: Callable[[], int]) -> dict:
+    """Запросы к БД и время шага записи; `step` возвращает число записанных строк."""
+    with CaptureQueriesContext(connection) as queries:
+        started = time.perf_counter()
+        rows = step()
+        seconds = time.perf_counter() - started
+    return {
+        "seconds": round(seconds, 4),
+        "rows": rows,
+        "queries": len(queries),
+        "queries_per_row": round(len(queries) / rows, 3) if rows else None,
+    }
+
+
+def written(result: SyncResult) -> int:
+    return result.created + result.updated
+
+
+def measure_ingestion(professional: list[dict], education: list[dict], documents: list[dict]) -> dict:
+    """Записывает данные в БД в откатываемой транзакции и считает запросы на строку.
+
+    Существующие программы пропускаются, поэтому запросы на строку показательны на
+    пустой БД, где все строки новые.
+    """
+    source = get_source(SOURCE_KEY)
+    results, stored = {}, []
+
+    def save_programs() -> int:
+        last_pk = Program.objects.order_by("-pk").values_list("pk", flat=True).first() or 0
+        save_university_programs(documents, source.university(), source.allowed_faculties)
+        created = Program.objects.filter(pk__gt=last_pk)
+        stored.extend(created.exclude(document="").values_list("document", flat=True))
+        return (
+            created.count()
+            + Discipline.objects.filter(program__in=created).count()
+            + Competency.objects.filter(program__in=created).count()
+        )
+
+    with transaction.atomic(), bulk_history("benchmark"):
+        results["professional_standards"] = measure_step(lambda: written(sync_professional_standards(professional)))
+        results["education_standards"] = measure_step(lambda: written(sync_education_standards(education)))
+        if University.objects.filter(abbreviation=source.abbreviation).exists():
+            results["programs"] = measure_step(save_programs)
+        transaction.set_rollback(True)
+
+    delete_stored_documents(stored)
+    results["cumulative_peak_rss_kb"] = peak_rss_kb()
+    return results
+
+
+def run_benchmark(directory: Path) -> dict:
+    fixtures = Fixtures(directory)
+    results = {
+        "meta": {
+            "started_at": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "fixtures": len(fixtures.index),
+            "parser_version": get_source(SOURCE_KEY).parser_version,
+        },
+        "scrape": {},
+    }
+    scrape = results["scrape"]
+    with tempfile.TemporaryDirectory() as tmp:
+        with temporary_http_cache(), replay(fixtures) as server:
+            scrape["fgos_professional_standards"], professional = measure_scrape(
+                server,
+                extract_fgos_professional_standards,
+            )
+            scrape["fgos_education_standards"], education = measure_scrape(server, extract_fgos_education_standards)
+            scrape[f"{SOURCE_KEY}_listing"], listing = measure_scrape(server, vsu_program_rows)
+
+            started = time.perf_counter()
+            rows = download_documents(listing, set(fixtures.document_urls()), Path(tmp))
+            seconds = time.perf_counter() - started
+            size = sum(row["file_path"].stat().st_size for row in rows)
+            scrape[f"{SOURCE_KEY}_documents"] = {
+                "seconds": round(seconds, 4),
+                "documents": len(rows),
+                "megabytes": round(size / 2**20, 3),
+                "megabytes_per_second": round(size / 2**20 / seconds, 2) if seconds else None,
+                "cumulative_peak_rss_kb": peak_rss_kb(),
+            }
+
+        results["parse"], documents = measure_parse(rows)
+        results["ingestion"] = measure_ingestion(professional, education, documents)
+
+    results["meta"]["cumulative_peak_rss_kb"] = peak_rss_kb()
+    return results
+
+
+def flatten(results: dict, prefix: str = "") -> dict[str, float]:
+    """Числовые метрики результата с ключами через точку, без списков по документам."""
+    flat = {}
+    for key, value in results.items():
+        name = f"{prefix}{key}"
+        if isinstance(value, dict):
+            flat.update(flatten(value, f"{name}."))
+        elif isinstance(value, int | float) and not isinstance(value, bool):
+            flat[name] = value
+    return flat
+
+
+def compare(previous: dict, current: dict) -> list[tuple[str, float, float, float | None]]:
+    """(метрика, было, стало, изменение в процентах) по метрикам, общим для двух запусков."""
+    before, after = flatten(previous), flatten(current)
+    rows = []
+    for name in sorted(before.keys() & after.keys()):
+        change = round((after[name] - before[name]) / before[name] * 100, 1) if before[name] else None
+        rows.append((name, before[name], after[name], change))
+    return rows
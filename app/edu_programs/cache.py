@@ -0,0 +1,85 @@
+"""Кэш ответов API и частых выборок справочных данных.
+
+Ключи строятся из версий пространств имен - по одному на модель. Сигналы и пакетная
+запись повышают версию модели после коммита, и все ключи, собранные со старой версией,
+перестают читаться, без перебора и удаления ключей в Redis.
+"""
+
+import hashlib
+import time
+from functools import wraps
+
+from django.core.cache import cache
+from django.db import transaction
+
+from edu_programs.const import CACHE_KEY_PREFIX, CACHE_TIMEOUT
+
+
+def namespace(model) -> str:
+    return f"{CACHE_KEY_PREFIX}:ns:{model._meta.label_lower}"  # noqa: SLF001
+
+
+def namespace_versions(models) -> list[int]:
+    """Текущие версии пространств имен `models` за одно обращение к кэшу.
+
+    Отсутствующая (вытесненная) версия заводится заново от текущего времени, чтобы не
+    совпасть ни с одной из прежних версий и не воскресить устаревшие записи.
+    """
+    keys = [namespace(model) for model in models]
+    versions = cache.get_many(keys)
+    for key in keys:
+        if key not in versions:
+            cache.add(key, time.time_ns(), timeout=None)
+            versions[key] = cache.get(key)
+    return [versions[key] for key in keys]
+
+
+def bump_namespaces(*models):
+    for model in models:
+        key = namespace(model)
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.add(key, time.time_ns(), timeout=None)
+
+
+def invalidate(*models):
+    """Сбрасывает кэш моделей после успешного коммита текущей транзакции."""
+    transaction.on_commit(lambda: bump_namespaces(*models))
+
+
+def make_key(name: str, models, *parts) -> str:
+    raw = "|".join(str(part) for part in (*namespace_versions(models), *parts))
+    return f"{CACHE_KEY_PREFIX}:{name}:{hashlib.sha256(raw.encode()).hexdigest()}"
+
+
+def get_or_set(name: str, models, parts, default, timeout=CACHE_TIMEOUT):
+    """Возвращает значение из кэша или вычисляет его вызовом `default()` и сохраняет."""
+    key = make_key(name, models, *parts)
+    value = cache.get(key)
+    if value is None:
+        value = default()
+        cache.set(key, value, timeout)
+    return value
+
+
+def cached_query(*models, timeout=CACHE_TIMEOUT):
+    """Кэширует результат функции-выборки, зависящей от данных `models`.
+
+    Функция должна возвращать сериализуемое значение (список, словарь), а не QuerySet.
+    """
+
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            return get_or_set(
+                func.__qualname__,
+                models,
+                (*args, *sorted(kwargs.items())),
+                lambda: func(*args, **kwargs),
+                timeout,
+            )
+
+        return wrapper
+
+    return decorator
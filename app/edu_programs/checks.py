@@ -0,0 +1,24 @@
+from django.conf import settings
+from django.core.checks import Error, Tags, register
+
+
+SHARED_CACHE_BACKENDS = ("django.core.cache.backends.redis.RedisCache",)
+
+
+@register(Tags.caches)
+def check_shared_cache(app_configs, **kwargs):  # noqa: ARG001
+    """Кэш должен быть общим для всех процессов.
+
+    Через него веб-процессы и воркеры celery узнают о сброшенных версиях кэша ответов,
+    а `initial_setup --follow` видит прогресс загрузки. Кэш в памяти процесса этого не дает.
+    """
+    cache = settings.CACHES["default"]
+    if cache["BACKEND"] in SHARED_CACHE_BACKENDS and cache.get("LOCATION"):
+        return []
+    return [
+        Error(
+            "Кэш по умолчанию должен быть общим кэшем Redis",
+            hint="Задайте REDIS_URL или REDIS_CACHE_URL",
+            id="edu_programs.E001",
+        ),
+    ]
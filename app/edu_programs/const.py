@@ -4,6 +4,45 @@ from pathlib import Path
 BASE_DIR = Path().cwd()
 VSU_CONTENT_COLUMNS = ["index", "section", "page"]
 VSU_OP_FILES = BASE_DIR / "edu_programs" / "parsers" / "files"
+HTTP_CACHE_DIR = BASE_DIR / "edu_programs" / "parsers" / "cache"
+
+HTTP_MAX_CONNECTIONS_PER_HOST = 4  # одновременных запросов к одному хосту
+HTTP_MIN_REQUEST_INTERVAL = 0.25  # секунд между стартами запросов к одному хосту
+HTTP_RETRY_STATUSES = (429, 500, 502, 503, 504)
+HTTP_IDEMPOTENT_METHODS = ("GET", "HEAD", "OPTIONS", "PUT", "DELETE")
+HTTP_BACKOFF_BASE = 0.5  # секунд, задержка перед первым повтором
+HTTP_BACKOFF_MAX = 30  # секунд, потолок одной задержки
+HTTP_MAX_RETRY_TIME = 120  # секунд на все повторы одного запроса
+
+FACULTY_MATCH_CUTOFF = 60  # минимальная схожесть названий факультетов, 0-100
+FACULTY_MATCHER_TTL = 10 * 60  # секунд жизни кэша факультетов в процессе
+
+INGESTION_BATCH_SIZE = 500  # строк в одном INSERT/UPDATE при пакетной записи
+
+CACHE_KEY_PREFIX = "edu_programs"
+CACHE_TIMEOUT = 24 * 60 * 60  # секунд жизни закэшированного ответа или выборки
+
+FGOS_GROUP_TIME_LIMIT = 5 * 60  # секунд на разбор одной группы ФГОС, после чего группа пропускается
+FGOS_GROUP_MAX_RETRIES = 2  # повторов разбора группы ФГОС при ошибке запроса
+PROGRESS_TIMEOUT = 24 * 60 * 60  # секунд хранения прогресса запуска загрузки
+
+ANALYTICS_REFRESH_DELAY = 60  # секунд, за которые изменения копятся перед пересчетом оценок
+ANALYTICS_SCORE_PRECISION = 6  # знаков после запятой; меньшие изменения оценок не записываются
+
+SIMILARITY_INDEX_PATH = BASE_DIR / "uploads" / "similarity" / "index.npz"
+SIMILARITY_TOP_K = 20  # похожих программ, хранимых для каждой программы
+SIMILARITY_BLOCK_SIZE = 512  # строк матрицы сходства, считаемых за один шаг
+SIMILARITY_STEM_LENGTH = 6  # символов слова, оставляемых как основа для TF-IDF
+
+SEARCH_RESULTS_LIMIT = 20  # результатов каждого типа в ответе поиска по умолчанию
+SEARCH_RESULTS_MAX = 100
+
+EXPORT_CHUNK_SIZE = 2000  # строк, читаемых из курсора и отдаваемых клиенту за один шаг
+
+BENCHMARK_FIXTURES_DIR = BASE_DIR / "edu_programs" / "parsers" / "fixtures"  # записанные ответы сайтов
+BENCHMARK_DOCUMENT_LIMIT = 50  # планов, записываемых в фикстуры
+
+ARTIFACT_PREVIEW_WIDTH = 300  # пикселей, ширина превью первой страницы документа
 
 CONTENT_PAGE_COUNT_LIMIT = 30
 DISCIPLINE_TABLE_COLUMNS = ["Индекс", "Наименование", "Формируемые компетенции"]
@@ -14,4 +53,3 @@ POSSIBLE_DEGREES = [
 ]
 ALLOWED_PROF_STANDARDS = {"06": "all", "40": ["011"]}
 ALLOWED_EDU_STANDARDS = ["01", "02", "09"]
-ALLOWED_FACULTIES = ["компьютерных наук", "математический", "прикладной математики, информатики и механики"]
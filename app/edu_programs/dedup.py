@@ -0,0 +1,120 @@
+"""Удаление дублей по натуральным ключам перед созданием ограничений уникальности.
+
+Запускается командой `deduplicate_natural_keys` до миграции, добавляющей ограничения
+(миграция не применится, пока дубли есть). Из каждой группы дублей остается строка с
+наименьшим id, связи многие-ко-многим дублей переносятся на нее. Дубли удаляются через
+ORM: каскадно удаляются их дисциплины, компетенции и оценки, пишется история удаления,
+сигналы сбрасывают кэш, после коммита перестраиваются индекс похожих программ и оценки.
+"""
+
+from core.history import bulk_history
+from django.db import connections, transaction
+from loguru import logger
+
+from edu_programs.cache import invalidate
+from edu_programs.models import (
+    EDUCATION_STANDARD_KEY,
+    PROFESSIONAL_STANDARD_KEY,
+    PROGRAM_KEY,
+    FederalStateEducationStandard,
+    ProfessionalStandard,
+    Program,
+    opop_storage,
+)
+from edu_programs.tasks import build_similarity_index, schedule_program_scores_refresh
+
+
+DEDUP_BATCH_SIZE = 500
+
+NATURAL_KEYS = {
+    ProfessionalStandard: PROFESSIONAL_STANDARD_KEY,
+    FederalStateEducationStandard: EDUCATION_STANDARD_KEY,
+    Program: PROGRAM_KEY,
+}
+
+
+def find_duplicates(connection, model, key) -> dict[int, int]:
+    """Возвращает {id дубля: id остающейся строки}."""
+    quote = connection.ops.quote_name
+    table = quote(model._meta.db_table)  # noqa: SLF001
+    columns = ", ".join(quote(model._meta.get_field(field).column) for field in key)  # noqa: SLF001
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"SELECT id, keeper FROM (SELECT id, MIN(id) OVER (PARTITION BY {columns}) AS keeper FROM {table}) AS ranked "  # noqa: S608
+            "WHERE id <> keeper",
+        )
+        return dict(cursor.fetchall())
+
+
+def batches(ids: list[int]):
+    for start in range(0, len(ids), DEDUP_BATCH_SIZE):
+        yield ids[start : start + DEDUP_BATCH_SIZE]
+
+
+def delete_rows(cursor, table: str, column: str, ids: list[int]):
+    for batch in batches(ids):
+        cursor.execute(f"DELETE FROM {table} WHERE {column} IN ({', '.join(['%s'] * len(batch))})", batch)  # noqa: S608
+
+
+def move_links(connection, through, column: str, other_column: str, duplicates: dict[int, int]):
+    """Переносит связи многие-ко-многим с дублей на остающиеся строки и удаляет старые."""
+    quote = connection.ops.quote_name
+    table = quote(through._meta.db_table)  # noqa: SLF001
+    column, other_column = quote(column), quote(other_column)
+    with connection.cursor() as cursor:
+        for duplicate_id, keeper_id in duplicates.items():
+            cursor.execute(
+                f"INSERT INTO {table} ({other_column}, {column}) "  # noqa: S608
+                f"SELECT {other_column}, %s FROM {table} WHERE {column} = %s ON CONFLICT DO NOTHING",
+                [keeper_id, duplicate_id],
+            )
+        delete_rows(cursor, table, column, list(duplicates))
+
+
+def delete_documents(names: list[str]):
+    for name in names:
+        opop_storage.delete(name)
+
+
+def delete_duplicates(model, ids: list[int], using: str) -> list[str]:
+    """Удаляет дубли `model` с зависимыми строками. Возвращает имена файлов удаленных программ."""
+    documents = []
+    for batch in batches(ids):
+        duplicates = model.objects.using(using).filter(pk__in=batch)
+        if model is Program:
+            documents.extend(name for name in duplicates.values_list("document", flat=True) if name)
+        duplicates.delete()
+    return documents
+
+
+def deduplicate(using: str = "default", dry_run: bool = False) -> dict[str, int]:
+    """Удаляет дубли всех моделей из `NATURAL_KEYS`. Возвращает число дублей по моделям."""
+    connection = connections[using]
+    tables = set(connection.introspection.table_names())
+    through = Program.professional_standards.through
+    removed_documents = []
+    counts = {}
+
+    with transaction.atomic(using=using), bulk_history("deduplicate_natural_keys"):
+        for model, key in NATURAL_KEYS.items():
+            if model._meta.db_table not in tables:  # noqa: SLF001
+                continue
+            duplicates = find_duplicates(connection, model, key)
+            counts[model.__name__] = len(duplicates)
+            if dry_run or not duplicates:
+                continue
+
+            if model is ProfessionalStandard:
+                move_links(connection, through, "professionalstandard_id", "program_id", duplicates)
+            if model is Program:
+                move_links(connection, through, "program_id", "professionalstandard_id", duplicates)
+            removed_documents.extend(delete_duplicates(model, list(duplicates), using))
+            logger.info(f"{model.__name__}: удалено дублей {len(duplicates)}")
+
+        if any(counts.get(model.__name__) for model in (Program, ProfessionalStandard)) and not dry_run:
+            invalidate(Program)  # связи со стандартами перенесены в обход сигналов
+            schedule_program_scores_refresh()
+            transaction.on_commit(lambda: build_similarity_index.apply_async(queue="default"), using=using)
+        transaction.on_commit(lambda: delete_documents(removed_documents), using=using)
+
+    return counts
@@ -0,0 +1,148 @@
+"""Отдача документов ОПОП: частичные ответы (Range), проверка ETag и отдача через nginx.
+
+ETag документа - его SHA-256 из `Program.document_hash`, для старых записей без хэша -
+размер и время изменения файла. Повторный запрос с `If-None-Match` получает 304 без
+чтения файла.
+
+Файл передается `FileResponse`, так что gunicorn отправляет его через sendfile, не
+копируя байты в Python. Если задан `DOCUMENTS_ACCEL_REDIRECT_LOCATION`, ответ содержит
+только заголовок `X-Accel-Redirect`, и файл (в том числе диапазоны) отдает nginx из
+internal location, а воркер сразу освобождается.
+"""
+
+import mimetypes
+import os
+import re
+from pathlib import Path
+from urllib.parse import quote
+
+from django.conf import settings
+from django.http import FileResponse, Http404, HttpResponse
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import content_disposition_header, http_date, quote_etag
+
+from edu_programs.models import Program, opop_storage
+
+
+RANGE = re.compile(r"bytes=(\d*)-(\d*)")
+
+
+class RangeNotSatisfiable(Exception):
+    pass
+
+
+class FileRange:
+    """Файл, читаемый с позиции `start` не дальше `length` байт.
+
+    `fileno()` отдает дескриптор исходного файла: gunicorn передает его в sendfile со
+    смещением текущей позиции и длиной из Content-Length.
+    """
+
+    def __init__(self, file, start: int, length: int):
+        file.seek(start)
+        self.file = file
+        self.remaining = length
+
+    def read(self, size: int = -1) -> bytes:
+        if size < 0 or size > self.remaining:
+            size = self.remaining
+        data = self.file.read(size)
+        self.remaining -= len(data)
+        return data
+
+    def fileno(self) -> int:
+        return self.file.fileno()
+
+    def close(self):
+        self.file.close()
+
+
+def parse_range(header: str, size: int) -> tuple[int, int] | None:
+    """Диапазон из заголовка Range как (первый, последний байт).
+
+    None - заголовок не поддерживается (несколько диапазонов, другие единицы), тогда
+    отдается весь файл. `RangeNotSatisfiable` - диапазон начинается за концом файла
+    или файл пустой: в пустом файле нет ни одного байта для диапазона.
+    """
+    match = RANGE.fullmatch(header.strip())
+    if not match or match.groups() == ("", ""):
+        return None
+    if not size:
+        raise RangeNotSatisfiable
+    first, last = match.groups()
+    if not first:
+        if not int(last):
+            raise RangeNotSatisfiable
+        return max(size - int(last), 0), size - 1
+    if last and int(last) < int(first):
+        return None
+    if int(first) >= size:
+        raise RangeNotSatisfiable
+    return int(first), min(int(last), size - 1) if last else size - 1
+
+
+def document_etag(program: Program, stat: os.stat_result) -> str:
+    return quote_etag(program.document_hash or f"{stat.st_size:x}-{stat.st_mtime_ns:x}")
+
+
+def accel_redirect_response(name: str) -> HttpResponse:
+    response = HttpResponse()
+    location = settings.DOCUMENTS_ACCEL_REDIRECT_LOCATION.rstrip("/")
+    response["X-Accel-Redirect"] = f"{location}/{quote(name)}"
+    return response
+
+
+def file_response(request, path: Path, size: int, etag: str) -> HttpResponse:
+    header = request.headers.get("Range")
+    if_range = request.headers.get("If-Range")
+    byte_range = None
+    if header and (if_range is None or if_range == etag):
+        try:
+            byte_range = parse_range(header, size)
+        except RangeNotSatisfiable:
+            response = HttpResponse(status=416)
+            response["Content-Range"] = f"bytes */{size}"
+            return response
+
+    # файл закрывает FileResponse после отправки
+    file = open(path, "rb")  # noqa: SIM115
+    if byte_range is None:
+        return FileResponse(file)
+
+    start, end = byte_range
+    response = FileResponse(FileRange(file, start, end - start + 1), status=206)
+    response["Content-Length"] = end - start + 1
+    response["Content-Range"] = f"bytes {start}-{end}/{size}"
+    return response
+
+
+def serve_document(request, program: Program) -> HttpResponse:
+    """Ответ с документом программы с учетом Range, If-Range и If-None-Match."""
+    name = program.document.name
+    if not name:
+        msg = "У программы нет документа"
+        raise Http404(msg)
+    path = Path(opop_storage.path(name))
+    try:
+        stat = path.stat()
+    except FileNotFoundError as error:
+        msg = "Файл документа не найден"
+        raise Http404(msg) from error
+
+    etag = document_etag(program, stat)
+    response = get_conditional_response(request, etag=etag, last_modified=int(stat.st_mtime))
+    if response is None:
+        if settings.DOCUMENTS_ACCEL_REDIRECT_LOCATION:
+            response = accel_redirect_response(name)
+        else:
+            response = file_response(request, path, stat.st_size, etag)
+
+    if response.status_code in {200, 206}:
+        response["Content-Type"] = mimetypes.guess_type(name)[0] or "application/octet-stream"
+        response["Content-Disposition"] = content_disposition_header(as_attachment=False, filename=path.name)
+
+    response["ETag"] = etag
+    response["Last-Modified"] = http_date(stat.st_mtime)
+    response["Accept-Ranges"] = "bytes"
+    patch_cache_control(response, private=True, no_cache=True)
+    return response
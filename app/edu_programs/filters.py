@@ -0,0 +1,32 @@
+from django_filters import rest_framework as filters
+
+from edu_programs.models import FederalStateEducationStandard, ProfessionalStandard, Program
+
+
+class ProgramFilter(filters.FilterSet):
+    university = filters.CharFilter(field_name="university__abbreviation")
+    edu_group = filters.CharFilter(field_name="edu_group__code")
+    edu_degree = filters.CharFilter(field_name="edu_degree__code")
+    min_demand = filters.NumberFilter(field_name="score__demand", lookup_expr="gte")
+    min_uniqueness = filters.NumberFilter(field_name="score__uniqueness", lookup_expr="gte")
+
+    class Meta:
+        model = Program
+        fields = ("university", "faculty", "edu_group", "edu_degree", "approval_year", "code")
+
+
+class ProfessionalStandardFilter(filters.FilterSet):
+    group = filters.CharFilter(field_name="professional_standard_group__code")
+
+    class Meta:
+        model = ProfessionalStandard
+        fields = ("group", "code")
+
+
+class FederalStateEducationStandardFilter(filters.FilterSet):
+    edu_group = filters.CharFilter(field_name="edu_group__code")
+    edu_degree = filters.CharFilter(field_name="edu_degree__code")
+
+    class Meta:
+        model = FederalStateEducationStandard
+        fields = ("edu_group", "edu_degree", "code")
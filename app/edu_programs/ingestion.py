@@ -0,0 +1,426 @@
+"""Пакетная запись спарсенных данных в БД.
+
+Каждая функция читает существующие натуральные ключи одним запросом, сравнивает их
+со спарсенным набором в памяти и применяет разницу через bulk-операции в одной
+транзакции, записывая историю simple_history также пачкой.
+"""
+
+from pathlib import Path
+from typing import NamedTuple
+
+from django.core.files import File
+from django.db import transaction
+from loguru import logger
+from simple_history.utils import bulk_create_with_history, bulk_update_with_history
+
+from edu_programs.cache import invalidate
+from edu_programs.const import INGESTION_BATCH_SIZE
+from edu_programs.matchers import get_faculty_matcher
+from edu_programs.models import (
+    EDUCATION_STANDARD_KEY,
+    PROFESSIONAL_STANDARD_KEY,
+    PROGRAM_KEY,
+    Competency,
+    Discipline,
+    EducationGroup,
+    Faculty,
+    FederalStateEducationStandard,
+    ProfessionalStandard,
+    ProfessionalStandardGroup,
+    Program,
+    University,
+    opop_storage,
+)
+from edu_programs.selectors import edu_degrees_by_code, education_groups_by_code
+from edu_programs.utils import file_sha256
+
+
+class SyncResult(NamedTuple):
+    created: int
+    updated: int
+    stale: int
+
+
+def sync_rows(model, rows, key_fields, update_fields) -> SyncResult:
+    """Создает новые и обновляет изменившиеся строки `model`.
+
+    `rows` - несохраненные экземпляры модели, `key_fields` - поля натурального ключа с
+    ограничением уникальности. Вставка идет через ON CONFLICT, поэтому строка, созданная
+    параллельной загрузкой между чтением и записью, обновляется, а не роняет транзакцию.
+    Строки, которых больше нет в источнике, не удаляются, а только подсчитываются.
+    """
+    attnames = [model._meta.get_field(field).attname for field in key_fields]  # noqa: SLF001
+
+    def key(obj):
+        return tuple(getattr(obj, attname) for attname in attnames)
+
+    existing = {key(obj): obj for obj in model.objects.only("pk", *key_fields, *update_fields)}
+
+    to_create, to_update, seen = [], [], set()
+    for obj in rows:
+        obj_key = key(obj)
+        if obj_key in seen:
+            continue
+        seen.add(obj_key)
+
+        current = existing.get(obj_key)
+        if current is None:
+            to_create.append(obj)
+        elif any(getattr(current, field) != getattr(obj, field) for field in update_fields):
+            for field in update_fields:
+                setattr(current, field, getattr(obj, field))
+            to_update.append(current)
+
+    model.objects.bulk_create(
+        to_create,
+        batch_size=INGESTION_BATCH_SIZE,
+        update_conflicts=True,
+        unique_fields=key_fields,
+        update_fields=update_fields,
+    )
+    model.history.bulk_history_create(to_create, batch_size=INGESTION_BATCH_SIZE)
+    bulk_update_with_history(to_update, model, update_fields, batch_size=INGESTION_BATCH_SIZE)
+    if to_create or to_update:
+        invalidate(model)
+
+    stale = len(existing.keys() - seen)
+    if stale:
+        logger.info(f"{model.__name__}: {stale} записей отсутствуют в источнике")
+    return SyncResult(len(to_create), len(to_update), stale)
+
+
+def upsert_groups(model, names_by_code: dict[str, str]) -> dict:
+    """Создает недостающие группы и обновляет названия. Возвращает группы по коду."""
+    existing = {group.code: group for group in model.objects.filter(code__in=names_by_code)}
+
+    created = [model(code=code, name=name) for code, name in names_by_code.items() if code not in existing]
+    updated = []
+    for code, group in existing.items():
+        if group.name != names_by_code[code]:
+            group.name = names_by_code[code]
+            updated.append(group)
+
+    if created:
+        model.objects.bulk_create(
+            created,
+            batch_size=INGESTION_BATCH_SIZE,
+            update_conflicts=True,
+            unique_fields=["code"],
+            update_fields=["name"],
+        )
+        model.history.bulk_history_create(created, batch_size=INGESTION_BATCH_SIZE)
+    if updated:
+        bulk_update_with_history(updated, model, ["name"], batch_size=INGESTION_BATCH_SIZE)
+    if created or updated:
+        invalidate(model)
+
+    return {group.code: group for group in [*existing.values(), *created]}
+
+
+@transaction.atomic
+def sync_professional_standards(standards_data: list[dict]) -> SyncResult:
+    groups = upsert_groups(
+        ProfessionalStandardGroup,
+        {data["group_code"]: data["group_name"] for data in standards_data},
+    )
+    rows = [
+        ProfessionalStandard(
+            name=data["name"],
+            professional_standard_group=groups[data["group_code"]],
+            code=data["code"],
+        )
+        for data in standards_data
+    ]
+    return sync_rows(
+        ProfessionalStandard,
+        rows,
+        key_fields=PROFESSIONAL_STANDARD_KEY,
+        update_fields=["name"],
+    )
+
+
+@transaction.atomic
+def sync_education_standards(standards_data: list[dict]) -> SyncResult:
+    groups = upsert_groups(
+        EducationGroup,
+        {data["group_code"]: data["group_name"] for data in standards_data},
+    )
+    degrees = edu_degrees_by_code()
+
+    rows = []
+    for data in standards_data:
+        if data["degree_code"] not in degrees:
+            logger.warning(f"Степень образования с кодом {data['degree_code']} отсутствует в базе")
+            continue
+        rows.append(
+            FederalStateEducationStandard(
+                name=data["name"],
+                edu_group=groups[data["group_code"]],
+                edu_degree=degrees[data["degree_code"]],
+                code=data["code"],
+            ),
+        )
+    return sync_rows(
+        FederalStateEducationStandard,
+        rows,
+        key_fields=EDUCATION_STANDARD_KEY,
+        update_fields=["name"],
+    )
+
+
+def link_professional_standards(codes_by_program: dict[Program, list[str]]) -> int:
+    """Связывает программы с профессиональными стандартами по полным кодам вида `06.001`.
+
+    Все коды всех программ разрешаются одним запросом, связи пишутся одним bulk_create
+    в промежуточную таблицу. Возвращает число переданных на запись связей.
+    """
+    pairs = {tuple(full_code.split(".", 1)) for codes in codes_by_program.values() for full_code in codes}
+    if not pairs:
+        return 0
+
+    standard_ids = {
+        (group_code, code): pk
+        for pk, group_code, code in ProfessionalStandard.objects.filter(
+            professional_standard_group__code__in={group_code for group_code, _ in pairs},
+            code__in={code for _, code in pairs},
+        ).values_list("pk", "professional_standard_group__code", "code")
+    }
+
+    through = Program.professional_standards.through
+    links = []
+    for program, codes in codes_by_program.items():
+        for full_code in dict.fromkeys(codes):
+            standard_id = standard_ids.get(tuple(full_code.split(".", 1)))
+            if standard_id is None:
+                logger.warning(f"Профессиональный стандарт с кодом {full_code} не найден")
+                continue
+            links.append(through(program_id=program.pk, professionalstandard_id=standard_id))
+
+    through.objects.bulk_create(links, batch_size=INGESTION_BATCH_SIZE, ignore_conflicts=True)
+    if links:
+        invalidate(Program)
+    return len(links)
+
+
+def store_document(program: Program, file_path: Path) -> str:
+    """Кладет файл плана в хранилище поля `document` и возвращает имя файла в нем."""
+    field = program._meta.get_field("document")  # noqa: SLF001
+    with open(file_path, "rb") as f:
+        return field.storage.save(field.generate_filename(program, file_path.name), File(f))
+
+
+def save_university_programs(
+    parsed_documents: list[dict],
+    university: University,
+    allowed_faculties: set[str],
+    update_existing=False,
+) -> SyncResult:
+    """Создает программы вуза по результатам разбора PDF одной пачкой.
+
+    `parsed_documents` - строки листинга вуза, дополненные результатом разбора плана
+    парсером источника. Загружаются только программы факультетов из `allowed_faculties`.
+    Справочники и ключи существующих программ читаются одним запросом каждый.
+    Существующие программы пропускаются, а с `update_existing` обновляются на месте:
+    название, документ, стандарты, дисциплины и компетенции заменяются разобранными заново.
+    """
+    edu_groups = education_groups_by_code()
+    edu_degrees = edu_degrees_by_code()
+    faculty_matcher = get_faculty_matcher(university.pk)
+    existing = {
+        (code, degree_code, group_code, profile, approval_year, faculty_id): (document, document_hash)
+        for code, degree_code, group_code, profile, approval_year, faculty_id, document, document_hash in (
+            Program.objects.filter(university=university).values_list(
+                "code",
+                "edu_degree__code",
+                "edu_group__code",
+                "profile",
+                "approval_year",
+                "faculty_id",
+                "document",
+                "document_hash",
+            )
+        )
+    }
+
+    programs, documents, created, updated, stored, replaced, seen = [], [], [], [], [], [], set()
+    for data in parsed_documents:
+        file_path = Path(data["file_path"])
+        faculty = faculty_matcher.match(data["faculty_name"]) if data.get("faculty_name") else None
+        if faculty is None:
+            logger.warning(f"Факультет не найден | {data.get('faculty_name')} | {file_path.stem}")
+            continue
+        if faculty.name.lower() not in allowed_faculties:
+            continue
+
+        key = (data["code"], data["degree_code"], data["group_code"], data["profile"], int(data["year"]), faculty.pk)
+        if key in seen or (key in existing and not update_existing):
+            continue
+        seen.add(key)
+
+        program = build_program(data, university, faculty, edu_groups, edu_degrees)
+        if program is None:
+            continue
+        document, document_hash = existing.get(key, (None, None))
+        if attach_document(program, file_path, document, document_hash):
+            stored.append(program.document.name)
+            if document:
+                replaced.append(document)
+        (updated if key in existing else created).append(program)
+        programs.append(program)
+        documents.append(data)
+
+    try:
+        with transaction.atomic():
+            Program.objects.bulk_create(
+                programs,
+                batch_size=INGESTION_BATCH_SIZE,
+                update_conflicts=True,
+                unique_fields=PROGRAM_KEY,
+                update_fields=["name", "document", "document_hash", "parser_version"],
+            )
+            Program.history.bulk_history_create(created, batch_size=INGESTION_BATCH_SIZE)
+            Program.history.bulk_history_create(updated, batch_size=INGESTION_BATCH_SIZE, update=True)
+            invalidate(Program)
+            if updated:
+                clear_document_contents(updated)
+            link_professional_standards(
+                {program: data["professional_standards"] for program, data in zip(programs, documents, strict=True)},
+            )
+            save_document_contents(dict(zip(programs, documents, strict=True)))
+            transaction.on_commit(lambda: delete_stored_documents(replaced))
+    except Exception:
+        delete_stored_documents(stored)
+        raise
+
+    return SyncResult(len(created), len(updated), 0)
+
+
+def build_program(
+    data: dict, university: University, faculty: Faculty, edu_groups: dict, edu_degrees: dict
+) -> Program | None:
+    """Несохраненная программа по строке листинга или None, если группы или степени нет в базе."""
+    if data["group_code"] not in edu_groups:
+        logger.warning(f"Общая группа ОП - {data['group_code']} - отсутствует в базе")
+        return None
+    if data["degree_code"] not in edu_degrees:
+        logger.warning(f"Степень образования с кодом {data['degree_code']} отсутствует в базе")
+        return None
+    return Program(
+        name=data["name"],
+        edu_group=edu_groups[data["group_code"]],
+        edu_degree=edu_degrees[data["degree_code"]],
+        code=data["code"],
+        university=university,
+        profile=data["profile"],
+        approval_year=int(data["year"]),
+        faculty=faculty,
+        document_hash=data.get("document_hash", ""),
+        parser_version=data.get("parser_version", ""),
+    )
+
+
+def attach_document(program: Program, file_path: Path, document: str | None, document_hash: str | None) -> bool:
+    """Проставляет программе документ: прежний файл `document`, если хэш не изменился, иначе `file_path`.
+
+    Возвращает True, если файл сохранен в хранилище заново.
+    """
+    if document and document_hash == program.document_hash:
+        program.document = document
+        return False
+    program.document = store_document(program, file_path)
+    return True
+
+
+def delete_stored_documents(names: list[str]):
+    for name in names:
+        opop_storage.delete(name)
+
+
+def clear_document_contents(programs: list[Program]):
+    """Удаляет стандарты, дисциплины и компетенции программ перед записью разобранных заново."""
+    Program.professional_standards.through.objects.filter(program__in=programs).delete()
+    Discipline.objects.filter(program__in=programs).delete()
+    Competency.objects.filter(program__in=programs).delete()
+    invalidate(Discipline, Competency)
+
+
+def save_document_contents(documents_by_program: dict[Program, dict]):
+    """Записывает дисциплины и компетенции, извлеченные из планов программ, одной пачкой на модель."""
+    disciplines, competencies = [], []
+    for program, data in documents_by_program.items():
+        disciplines.extend(
+            Discipline(program=program, index=index, name=name, competencies=codes)
+            for index, name, codes in data.get("disciplines", [])
+        )
+        competencies.extend(
+            Competency(program=program, code=code, description=description)
+            for code, description in data.get("competencies", [])
+        )
+
+    bulk_create_with_history(disciplines, Discipline, batch_size=INGESTION_BATCH_SIZE)
+    bulk_create_with_history(competencies, Competency, batch_size=INGESTION_BATCH_SIZE)
+    invalidate(Discipline, Competency)
+
+
+def backfill_document_hashes() -> int:
+    """Считает хэши документов программ, созданных до появления `document_hash`."""
+    programs = list(Program.objects.filter(document_hash="").exclude(document="").only("pk", "document"))
+    for program in programs:
+        try:
+            program.document_hash = file_sha256(program.document.path)
+        except OSError:
+            logger.warning(f"Файл документа программы {program.pk} недоступен")
+    Program.objects.bulk_update(
+        [program for program in programs if program.document_hash],
+        ["document_hash"],
+        batch_size=INGESTION_BATCH_SIZE,
+    )
+    return len(programs)
+
+
+def hash_rows(rows: list[dict]) -> list[dict]:
+    """Проставляет строкам `document_hash`, отбрасывая строки с недоступным файлом."""
+    hashed = []
+    for row in rows:
+        try:
+            hashed.append({**row, "document_hash": file_sha256(row["file_path"])})
+        except OSError:
+            logger.warning(f"Файл {row['file_path']} недоступен")
+    return hashed
+
+
+def skip_known_documents(rows: list[dict]) -> list[dict]:
+    """Проставляет строкам `document_hash` и отбрасывает документы, уже загруженные в БД.
+
+    Сравнение идет только по хэшу файла, поэтому неизмененные планы не открываются в fitz.
+    """
+    hashed = hash_rows(rows)
+    known = set(
+        Program.objects.filter(document_hash__in={row["document_hash"] for row in hashed}).values_list(
+            "document_hash",
+            flat=True,
+        ),
+    )
+    return [row for row in hashed if row["document_hash"] not in known]
+
+
+def outdated_documents(rows: list[dict], parser_version: str) -> list[dict]:
+    """Проставляет строкам `document_hash` и оставляет документы, которые нужно разобрать заново.
+
+    Документ разбирается заново, если ни одна программа не разобрана из него версией
+    парсера `parser_version`: парсер изменился или программа не была создана
+    (например, факультет раньше не входил в загружаемые).
+
+    Версия - отпечаток только pdf_parsers.py, список факультетов источника в нее не входит.
+    Поэтому его изменение доходит лишь до документов без программ: программы добавленных
+    факультетов создадутся, а программы исключенных останутся в базе. Остальные документы
+    перечитываются только `reprocess_programs --all`.
+    """
+    hashed = hash_rows(rows)
+    current = set(
+        Program.objects.filter(
+            document_hash__in={row["document_hash"] for row in hashed},
+            parser_version=parser_version,
+        ).values_list("document_hash", flat=True),
+    )
+    return [row for row in hashed if row["document_hash"] not in current]
@@ -0,0 +1,55 @@
+import json
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+from edu_programs.benchmark import Fixtures, compare, record_fixtures, run_benchmark
+from edu_programs.const import BENCHMARK_DOCUMENT_LIMIT, BENCHMARK_FIXTURES_DIR
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark scraping, PDF parsing and database ingestion offline against recorded "
+        "fgosvo.ru/vsu.ru responses served by a local HTTP server"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--fixtures", type=Path, default=BENCHMARK_FIXTURES_DIR, help="Recorded responses")
+        parser.add_argument("--record", action="store_true", help="Record fixtures from the live sites and exit")
+        parser.add_argument(
+            "--documents",
+            type=int,
+            default=BENCHMARK_DOCUMENT_LIMIT,
+            help="Plans to record with --record",
+        )
+        parser.add_argument("--output", type=Path, help="Write JSON results to this file instead of stdout")
+        parser.add_argument("--compare", type=Path, help="Previous JSON results to compare with")
+
+    def handle(self, *args, **options):
+        if options["record"]:
+            recorded = record_fixtures(options["fixtures"], options["documents"])
+            self.stdout.write(
+                self.style.SUCCESS(
+                    f"Recorded {recorded['responses']} responses ({recorded['documents']} plans) "
+                    f"to {options['fixtures']}",
+                ),
+            )
+            return
+
+        if not Fixtures(options["fixtures"]).index:
+            msg = f"No fixtures in {options['fixtures']}, record them with --record first"
+            raise CommandError(msg)
+
+        results = run_benchmark(options["fixtures"])
+        output = json.dumps(results, ensure_ascii=False, indent=2)
+        if options["output"]:
+            options["output"].write_text(output)
+            self.stdout.write(self.style.SUCCESS(f"Results written to {options['output']}"))
+        elif not options["compare"]:
+            self.stdout.write(output)
+
+        if options["compare"]:
+            previous = json.loads(options["compare"].read_text())
+            for name, before, after, change in compare(previous, results):
+                delta = f"{change:+.1f}%" if change is not None else "n/a"
+                self.stdout.write(f"{name}: {before} -> {after} ({delta})")
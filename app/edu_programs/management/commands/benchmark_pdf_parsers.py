@@ -0,0 +1,48 @@
+import statistics
+import time
+from pathlib import Path
+
+import fitz  # PyMuPDF
+from django.core.management.base import BaseCommand, CommandError
+
+from edu_programs.const import VSU_OP_FILES
+from edu_programs.parsers.pdf_parsers import parse_title_page
+
+
+class Command(BaseCommand):
+    help = "Micro-benchmark of the title page parser on downloaded VSU plans"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--path", type=Path, default=VSU_OP_FILES, help="Directory with PDF plans")
+        parser.add_argument("--repeat", type=int, default=100, help="Parser runs per page")
+
+    def handle(self, *args, **options):
+        if options["repeat"] < 1:
+            msg = "--repeat must be at least 1"
+            raise CommandError(msg)
+
+        pages = []
+        for file_path in sorted(options["path"].glob("*.pdf")):
+            with fitz.open(file_path) as doc:
+                if doc.page_count:
+                    pages.append(doc[0].get_text(sort=True))
+        if not pages:
+            msg = f"No PDF plans found in {options['path']}"
+            raise CommandError(msg)
+
+        self.stdout.write(f"Parsing {len(pages)} first pages x {options['repeat']} runs...")
+
+        timings = []
+        standards = 0
+        for page_text in pages:
+            started = time.perf_counter()
+            for _ in range(options["repeat"]):
+                title_page = parse_title_page(page_text)
+            timings.append((time.perf_counter() - started) / options["repeat"])
+            standards += len(title_page.professional_standards)
+
+        self.stdout.write(f"Standards found: {standards}")
+        self.stdout.write(f"Mean per page:   {statistics.mean(timings) * 1e6:.1f} us")
+        self.stdout.write(f"Median per page: {statistics.median(timings) * 1e6:.1f} us")
+        self.stdout.write(f"Max per page:    {max(timings) * 1e6:.1f} us")
+        self.stdout.write(self.style.SUCCESS(f"Total per pass:  {sum(timings) * 1e3:.2f} ms"))
@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+
+from edu_programs.dedup import deduplicate
+
+
+class Command(BaseCommand):
+    help = (
+        "Remove programs and standards duplicated by natural key. "
+        "Run before applying the migration that adds the natural key unique constraints"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--dry-run", action="store_true", help="Only count duplicates")
+        parser.add_argument("--database", default="default")
+
+    def handle(self, *args, **options):
+        counts = deduplicate(options["database"], dry_run=options["dry_run"])
+        for model_name, count in counts.items():
+            self.stdout.write(f"{model_name}: {count}")
+        action = "Found" if options["dry_run"] else "Removed"
+        self.stdout.write(self.style.SUCCESS(f"{action} {sum(counts.values())} duplicates"))
@@ -0,0 +1,46 @@
+import sys
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+from edu_programs.export import EXPORT_CONTENT_TYPES, stream_export
+from edu_programs.filters import ProgramFilter
+from edu_programs.models import Program
+
+
+class Command(BaseCommand):
+    help = "Export programs with their professional standards to CSV or XLSX"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--format", choices=EXPORT_CONTENT_TYPES, default="csv", dest="file_format")
+        parser.add_argument("--output", type=Path, help="Output file, stdout if omitted")
+        parser.add_argument("--university", help="University abbreviation")
+        parser.add_argument("--faculty", type=int, help="Faculty id")
+        parser.add_argument("--degree", help="Education degree code")
+        parser.add_argument("--year", type=int, help="Approval year")
+
+    def handle(self, *args, **options):
+        filters = {
+            "university": options["university"],
+            "faculty": options["faculty"],
+            "edu_degree": options["degree"],
+            "approval_year": options["year"],
+        }
+        filterset = ProgramFilter(
+            {name: value for name, value in filters.items() if value is not None},
+            queryset=Program.objects.all(),
+        )
+        if not filterset.is_valid():
+            raise CommandError(filterset.errors.as_text())
+
+        chunks = stream_export(options["file_format"], filterset.qs)
+        if options["output"] is None:
+            for chunk in chunks:
+                sys.stdout.buffer.write(chunk)
+            sys.stdout.buffer.flush()
+            return
+
+        with open(options["output"], "wb") as file:
+            for chunk in chunks:
+                file.write(chunk)
+        self.stderr.write(self.style.SUCCESS(f"Exported to {options['output']}"))
@@ -0,0 +1,54 @@
+import time
+
+from celery import states
+from django.core.management.base import BaseCommand, CommandError
+
+from edu_programs.progress import get_progress
+from edu_programs.tasks import initial_setup_tasks, pipeline_stages
+
+
+class Command(BaseCommand):
+    help = "Start loading FGOS standards and university programs in celery and optionally follow the progress"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--follow", action="store_true", help="Print stage progress until every stage finishes")
+        parser.add_argument("--run-id", help="Follow an already started run instead of starting a new one")
+        parser.add_argument("--interval", type=float, default=5, help="Seconds between progress checks")
+        parser.add_argument("--timeout", type=float, help="Stop following with an error after this many seconds")
+
+    def handle(self, *args, **options):
+        run_id = options["run_id"] or initial_setup_tasks.apply_async(queue="default").id
+        self.stdout.write(f"Run id: {run_id}")
+        if not (options["follow"] or options["run_id"]):
+            return
+
+        root = initial_setup_tasks.AsyncResult(run_id)
+        deadline = time.monotonic() + options["timeout"] if options["timeout"] is not None else None
+        while True:
+            progress = get_progress(run_id, pipeline_stages())
+            for stage, state in progress.items():
+                self.stdout.write(self.format_stage(stage, state))
+            if all(state["result"] is not None for state in progress.values()):
+                break
+            if root.state == states.FAILURE:
+                msg = f"Run {run_id} failed: {root.result!r}"
+                raise CommandError(msg)
+            if deadline is not None and time.monotonic() > deadline:
+                msg = f"Stages did not finish in {options['timeout']} seconds"
+                raise CommandError(msg)
+            self.stdout.write("")
+            time.sleep(options["interval"])
+
+        failed = [stage for stage, state in progress.items() if state["error"]]
+        if failed:
+            msg = f"Failed stages: {', '.join(failed)}"
+            raise CommandError(msg)
+        self.stdout.write(self.style.SUCCESS("All stages finished"))
+
+    @staticmethod
+    def format_stage(stage: str, state: dict) -> str:
+        if state["result"] is not None:
+            return f"{stage}: {state['result']}"
+        if state["total"] is None:
+            return f"{stage}: waiting"
+        return f"{stage}: {state['done']}/{state['total']} done, {state['failed']} failed"
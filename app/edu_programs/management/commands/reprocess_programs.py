@@ -0,0 +1,39 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from edu_programs.sources import SOURCES, get_source
+from edu_programs.tasks import (
+    extract_program_document,
+    reprocess_rows,
+    reprocess_university_programs,
+    save_university_programs_task,
+)
+
+
+class Command(BaseCommand):
+    help = "Re-parse downloaded university plans from the last scrape manifest without network access"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--source", choices=SOURCES, action="append", help="Source key, all sources by default")
+        parser.add_argument("--all", action="store_true", dest="force", help="Re-parse every document")
+        parser.add_argument("--async", action="store_true", dest="use_celery", help="Run in celery workers")
+
+    def handle(self, *args, **options):
+        for key in options["source"] or SOURCES:
+            if options["use_celery"]:
+                self.stdout.write(reprocess_university_programs(key, options["force"]))
+            else:
+                self.reprocess(key, force=options["force"])
+
+    def reprocess(self, key: str, force=False):
+        listing, rows = reprocess_rows(get_source(key), force)
+        if not listing:
+            msg = f"No saved {key} manifest, run parse_university_programs first"
+            raise CommandError(msg)
+        self.stdout.write(f"{key}: re-parsing {len(rows)} of {len(listing)} documents...")
+        if not rows:
+            return
+
+        parsed = [extract_program_document(key, row) for row in rows]
+        self.stdout.write(
+            self.style.SUCCESS(save_university_programs_task(parsed, key, listing, update_existing=True))
+        )
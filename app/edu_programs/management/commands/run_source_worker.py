@@ -0,0 +1,31 @@
+from django.core.management.base import BaseCommand
+from settings import celery_app
+
+from edu_programs.sources import SOURCES, get_source
+
+
+class Command(BaseCommand):
+    help = "Start a celery worker for one university source queue with the source concurrency limit"
+
+    def add_arguments(self, parser):
+        parser.add_argument("source", choices=SOURCES, help="Source key")
+        parser.add_argument("--concurrency", type=int, help="Override the source concurrency limit")
+        parser.add_argument("--loglevel", default="info")
+
+    def handle(self, *args, **options):
+        source = get_source(options["source"])
+        celery_app.worker_main(
+            [
+                "worker",
+                "-l",
+                options["loglevel"],
+                "-Q",
+                source.queue,
+                "-n",
+                f"{source.key}@%h",
+                "--concurrency",
+                str(options["concurrency"] or source.concurrency),
+                "-Ofair",
+                "--prefetch-multiplier=1",
+            ],
+        )
@@ -0,0 +1,54 @@
+import re
+import threading
+import time
+
+from rapidfuzz import fuzz, process
+
+from edu_programs.const import FACULTY_MATCH_CUTOFF, FACULTY_MATCHER_TTL
+from edu_programs.models import Faculty
+
+
+def normalize_name(name: str) -> str:
+    name = name.lower().replace("ё", "е")
+    return re.sub(r"\W+", " ", name).strip()
+
+
+class FacultyMatcher:
+    """Нечеткий поиск факультета вуза по названию из документа без обращения к БД."""
+
+    def __init__(self, faculties):
+        self.faculties = list(faculties)
+        self.choices = [normalize_name(faculty.name) for faculty in self.faculties]
+        self.built_at = time.monotonic()
+
+    def match(self, name: str) -> Faculty | None:
+        result = process.extractOne(
+            normalize_name(name),
+            self.choices,
+            scorer=fuzz.ratio,
+            score_cutoff=FACULTY_MATCH_CUTOFF,
+        )
+        return self.faculties[result[2]] if result else None
+
+
+_matchers: dict[int, FacultyMatcher] = {}
+_matchers_lock = threading.Lock()
+
+
+def get_faculty_matcher(university_id: int) -> FacultyMatcher:
+    """Возвращает закэшированный в процессе матчер факультетов вуза.
+
+    Кэш сбрасывается сигналами при изменении `Faculty`; TTL страхует от изменений,
+    сделанных в других процессах (админка, соседние воркеры).
+    """
+    with _matchers_lock:
+        matcher = _matchers.get(university_id)
+        if matcher is None or time.monotonic() - matcher.built_at > FACULTY_MATCHER_TTL:
+            matcher = FacultyMatcher(Faculty.objects.filter(university_id=university_id))
+            _matchers[university_id] = matcher
+        return matcher
+
+
+def invalidate_faculty_matchers():
+    with _matchers_lock:
+        _matchers.clear()
@@ -1,4 +1,6 @@
 from core.models import BaseModel
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVectorField
 from django.core.files.storage import FileSystemStorage
 from django.core.validators import MaxValueValidator, MinValueValidator
 from django.db import models
@@ -7,6 +9,12 @@ from django.utils.translation import gettext_lazy as _
 
 fgos_storage = FileSystemStorage(location="uploads/fgos/")
 opop_storage = FileSystemStorage(location="uploads/opop/")
+artifact_storage = FileSystemStorage(location="uploads/artifacts/")
+
+# Натуральные ключи: по ним ищутся дубли при загрузке и строятся ограничения уникальности
+PROFESSIONAL_STANDARD_KEY = ("professional_standard_group", "code")
+EDUCATION_STANDARD_KEY = ("edu_group", "edu_degree", "code")
+PROGRAM_KEY = ("university", "faculty", "edu_group", "edu_degree", "code", "profile", "approval_year")
 
 
 class University(BaseModel):
@@ -71,10 +79,18 @@ class ProfessionalStandard(BaseModel):
         max_length=255,
     )
     code = models.CharField(_("Код профессионального стандарта"), max_length=20)
+    search_vector = SearchVectorField(_("Поисковый вектор"), null=True, editable=False)  # заполняет триггер БД
 
     class Meta:
         verbose_name = _("Профессиональный стандарт")
         verbose_name_plural = _("Профессиональные стандарты")
+        constraints = [
+            models.UniqueConstraint(fields=PROFESSIONAL_STANDARD_KEY, name="unique_professional_standard"),
+        ]
+        indexes = [
+            GinIndex(fields=["search_vector"], name="ps_search_vector_gin"),
+            GinIndex(fields=["name"], name="ps_name_trgm", opclasses=["gin_trgm_ops"]),
+        ]
 
     def __str__(self):
         return self.name
@@ -110,6 +126,9 @@ class FederalStateEducationStandard(BaseModel):  # образовательны
     class Meta:
         verbose_name = _("Федеральный образовательный стандарт ФГОС")
         verbose_name_plural = _("Федеральные образовательные стандарты ФГОС")
+        constraints = [
+            models.UniqueConstraint(fields=EDUCATION_STANDARD_KEY, name="unique_education_standard"),
+        ]
 
     def __str__(self) -> str:
         return (
@@ -159,10 +178,32 @@ class Program(BaseModel):  # образовательные программы 
         null=True,
         max_length=500,
     )
+    document_hash = models.CharField(
+        _("SHA-256 файла документа ОПОП"),
+        max_length=64,
+        blank=True,
+        db_index=True,
+    )
+    parser_version = models.CharField(
+        _("Версия парсера документа"),
+        max_length=16,
+        blank=True,
+        editable=False,
+    )
+    search_vector = SearchVectorField(_("Поисковый вектор"), null=True, editable=False)  # заполняет триггер БД
 
     class Meta:
         verbose_name = _("Образовательная программа ВУЗа")
         verbose_name_plural = _("Образовательные программы ВУЗов")
+        constraints = [
+            models.UniqueConstraint(fields=PROGRAM_KEY, name="unique_program", nulls_distinct=False),
+        ]
+        indexes = [
+            models.Index(fields=["faculty", "approval_year"], name="program_faculty_year_idx"),
+            GinIndex(fields=["search_vector"], name="program_search_vector_gin"),
+            GinIndex(fields=["name"], name="program_name_trgm", opclasses=["gin_trgm_ops"]),
+            GinIndex(fields=["profile"], name="program_profile_trgm", opclasses=["gin_trgm_ops"]),
+        ]
 
     def __str__(self) -> str:
         return (
@@ -175,3 +216,81 @@ class Program(BaseModel):  # образовательные программы 
         """Переопределяем метод delete для корректного удаления файла."""
         self.document.delete(save=False)  # Удаляет файл через storage
         super().delete(*args, **kwargs)
+
+
+class Discipline(BaseModel):
+    program = models.ForeignKey(
+        Program,
+        on_delete=models.CASCADE,
+        related_name="disciplines",
+        verbose_name=_("Образовательная программа"),
+    )
+    index = models.CharField(_("Индекс"), max_length=50)
+    name = models.CharField(_("Наименование"), max_length=500)
+    competencies = models.TextField(_("Формируемые компетенции"), blank=True)
+
+    class Meta:
+        verbose_name = _("Дисциплина")
+        verbose_name_plural = _("Дисциплины")
+
+    def __str__(self):
+        return f"{self.index} {self.name}"
+
+
+class Competency(BaseModel):
+    program = models.ForeignKey(
+        Program,
+        on_delete=models.CASCADE,
+        related_name="competencies",
+        verbose_name=_("Образовательная программа"),
+    )
+    code = models.CharField(_("Код компетенции"), max_length=20)
+    description = models.TextField(_("Формулировка"), blank=True)
+
+    class Meta:
+        verbose_name = _("Компетенция")
+        verbose_name_plural = _("Компетенции")
+
+    def __str__(self):
+        return self.code
+
+
+class ProgramScore(models.Model):  # вычисляется edu_programs.analytics, история не ведется
+    program = models.OneToOneField(
+        Program,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name="score",
+        verbose_name=_("Образовательная программа"),
+    )
+    demand = models.FloatField(_("Востребованность"), default=0)
+    uniqueness = models.FloatField(_("Уникальность"), default=0)
+    components = models.JSONField(_("Составляющие оценок"), default=dict, blank=True)
+    computed_at = models.DateTimeField(_("Дата расчета"), auto_now=True)
+
+    class Meta:
+        verbose_name = _("Оценка образовательной программы")
+        verbose_name_plural = _("Оценки образовательных программ")
+
+    def __str__(self):
+        return f"{self.program_id}: {self.demand:.2f} / {self.uniqueness:.2f}"
+
+
+class DocumentArtifact(models.Model):  # извлекается из PDF edu_programs.artifacts, история не ведется
+    document_hash = models.CharField(_("SHA-256 файла документа"), max_length=64, primary_key=True)
+    page_count = models.PositiveIntegerField(_("Число страниц"), default=0)
+    page_texts = models.JSONField(_("Текст страниц"), default=list, blank=True)
+    preview = models.FileField(
+        _("Превью первой страницы"),
+        storage=artifact_storage,
+        blank=True,
+        max_length=100,
+    )
+    created_at = models.DateTimeField(_("Дата извлечения"), auto_now_add=True)
+
+    class Meta:
+        verbose_name = _("Данные документа ОПОП")
+        verbose_name_plural = _("Данные документов ОПОП")
+
+    def __str__(self):
+        return self.document_hash
@@ -0,0 +1,196 @@
+from __future__ import annotations
+
+import hashlib
+import json
+from pathlib import Path
+
+import requests
+from loguru import logger
+
+from edu_programs.const import HTTP_CACHE_DIR
+from edu_programs.parsers.http_client import fetcher
+
+
+class CachedResponse:
+    """Ответ с учетом локального кэша.
+
+    `not_modified` - сервер ответил 304 и тело взято из кэша;
+    `changed` - содержимое отличается от сохраненного при прошлом запросе.
+    """
+
+    __slots__ = ("changed", "content", "encoding", "not_modified", "status_code", "url")
+
+    def __init__(self, url: str, status_code: int, content: bytes, not_modified=False, changed=True):
+        self.url = url
+        self.status_code = status_code
+        self.content = content
+        self.not_modified = not_modified
+        self.changed = changed
+        self.encoding = "utf-8"
+
+    @property
+    def text(self) -> str:
+        return self.content.decode(self.encoding, errors="replace")
+
+
+class HttpCache:
+    """Локальный кэш ответов для условных GET-запросов (ETag / Last-Modified).
+
+    Для каждого URL хранится json с ETag, Last-Modified и sha256 содержимого. Тело HTML
+    страниц хранится рядом, PDF - там, куда их скачивают, чтобы не дублировать файлы.
+    """
+
+    def __init__(self, directory: Path = HTTP_CACHE_DIR):
+        self.directory = Path(directory)
+
+    def _key(self, url: str, params=None) -> str:
+        raw = json.dumps([url, params or {}], sort_keys=True, ensure_ascii=False)
+        return hashlib.sha256(raw.encode()).hexdigest()
+
+    def _meta_path(self, key: str) -> Path:
+        return self.directory / f"{key}.json"
+
+    def _body_path(self, key: str) -> Path:
+        return self.directory / f"{key}.body"
+
+    def _load_meta(self, key: str) -> dict | None:
+        try:
+            return json.loads(self._meta_path(key).read_text())
+        except (OSError, ValueError):
+            return None
+
+    def _write(self, path: Path, data: bytes):
+        self.directory.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(f"{path.name}.tmp")
+        tmp_path.write_bytes(data)
+        tmp_path.replace(path)
+
+    def _save_meta(self, key: str, url: str, response, digest: str):
+        meta = {
+            "url": url,
+            "etag": response.headers.get("ETag"),
+            "last_modified": response.headers.get("Last-Modified"),
+            "sha256": digest,
+        }
+        self._write(self._meta_path(key), json.dumps(meta, ensure_ascii=False).encode())
+
+    @staticmethod
+    def _conditional_headers(meta: dict | None) -> dict:
+        headers = {}
+        if meta and meta.get("etag"):
+            headers["If-None-Match"] = meta["etag"]
+        if meta and meta.get("last_modified"):
+            headers["If-Modified-Since"] = meta["last_modified"]
+        return headers
+
+    @staticmethod
+    def _check_response(url: str, response: requests.Response | None) -> requests.Response:
+        """Ответ 200 или 304; иначе исключение requests, чтобы вызывающий код повторил или пропустил запрос."""
+        if response is None:
+            msg = f"Нет ответа от {url} после всех попыток"
+            raise requests.ConnectionError(msg)
+        if response.status_code not in {200, 304}:
+            response.close()
+            msg = f"{response.status_code} от {url} после всех попыток"
+            raise requests.HTTPError(msg, response=response)
+        return response
+
+    def get(self, url: str, params=None, request_name: str = "") -> CachedResponse:
+        key = self._key(url, params)
+        body_path = self._body_path(key)
+        meta = self._load_meta(key) if body_path.is_file() else None
+
+        response = self._check_response(
+            url,
+            fetcher.request(
+                method="GET",
+                url=url,
+                params=params,
+                headers=self._conditional_headers(meta),
+                request_name=request_name,
+            ),
+        )
+        if response.status_code == 304:  # noqa: PLR2004
+            return CachedResponse(url, 200, body_path.read_bytes(), not_modified=True, changed=False)
+
+        digest = hashlib.sha256(response.content).hexdigest()
+        changed = meta is None or meta.get("sha256") != digest
+        if changed:
+            self._write(body_path, response.content)
+        self._save_meta(key, url, response, digest)
+        return CachedResponse(url, 200, response.content, changed=changed)
+
+    def download(self, url: str, save_path: Path) -> bool:
+        """Скачивает файл, только если он изменился. Возвращает True, если файл переписан."""
+        save_path = Path(save_path)
+        key = self._key(url)
+        meta = self._load_meta(key) if save_path.is_file() else None
+
+        response = self._check_response(
+            url,
+            fetcher.request(
+                method="GET",
+                url=url,
+                headers=self._conditional_headers(meta),
+                stream=True,
+            ),
+        )
+        if response.status_code == 304:  # noqa: PLR2004
+            response.close()
+            return False
+
+        sha256 = hashlib.sha256()
+        tmp_path = save_path.with_name(f"{save_path.name}.part")
+        try:
+            with open(tmp_path, "wb+") as file:
+                for chunk in response.iter_content(chunk_size=8192):
+                    sha256.update(chunk)
+                    file.write(chunk)
+        except BaseException:
+            tmp_path.unlink(missing_ok=True)
+            raise
+        finally:
+            response.close()
+
+        digest = sha256.hexdigest()
+        if meta is not None and meta.get("sha256") == digest:
+            tmp_path.unlink()
+            changed = False
+        else:
+            tmp_path.replace(save_path)
+            changed = True
+        self._save_meta(key, url, response, digest)
+        return changed
+
+    @staticmethod
+    def fingerprint(payload) -> str:
+        raw = json.dumps(payload, sort_keys=True, ensure_ascii=False, default=str)
+        return hashlib.sha256(raw.encode()).hexdigest()
+
+    def fingerprint_changed(self, name: str, payload) -> bool:
+        """Отличаются ли данные `payload` от запомненных под именем `name`."""
+        path = self.directory / f"{name}.fingerprint"
+        try:
+            return path.read_text() != self.fingerprint(payload)
+        except OSError:
+            return True
+
+    def remember_fingerprint(self, name: str, payload):
+        """Запоминает данные после успешной обработки, чтобы следующий запуск мог ее пропустить."""
+        self._write(self.directory / f"{name}.fingerprint", self.fingerprint(payload).encode())
+        logger.info(f"Сохранен отпечаток данных {name}")
+
+    def remember_manifest(self, name: str, rows: list[dict]):
+        """Сохраняет записи последнего обхода сайта, чтобы повторить разбор без сети."""
+        self._write(
+            self.directory / f"{name}.manifest.json", json.dumps(rows, ensure_ascii=False, default=str).encode()
+        )
+
+    def load_manifest(self, name: str) -> list[dict] | None:
+        try:
+            return json.loads((self.directory / f"{name}.manifest.json").read_text())
+        except (OSError, ValueError):
+            return None
+
+
+http_cache = HttpCache()
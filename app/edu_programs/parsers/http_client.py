@@ -0,0 +1,202 @@
+from __future__ import annotations
+
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import NamedTuple
+from urllib.parse import urlsplit
+
+import requests
+from loguru import logger
+from requests.adapters import HTTPAdapter
+
+from edu_programs.const import (
+    HTTP_BACKOFF_BASE,
+    HTTP_BACKOFF_MAX,
+    HTTP_IDEMPOTENT_METHODS,
+    HTTP_MAX_CONNECTIONS_PER_HOST,
+    HTTP_MAX_RETRY_TIME,
+    HTTP_MIN_REQUEST_INTERVAL,
+    HTTP_RETRY_STATUSES,
+)
+
+
+_sessions: dict[str, requests.Session] = {}
+_sessions_lock = threading.Lock()
+
+
+def get_session(url: str) -> requests.Session:
+    """Возвращает общую keep-alive сессию для хоста из `url`."""
+    host = urlsplit(url).netloc
+    with _sessions_lock:
+        if host not in _sessions:
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=HTTP_MAX_CONNECTIONS_PER_HOST, max_retries=0)
+            session = requests.Session()
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+            _sessions[host] = session
+        return _sessions[host]
+
+
+class RetryPolicy(NamedTuple):
+    """Параметры повторов запроса: число попыток, повторяемые статусы и задержки."""
+
+    attempts: int = 5
+    statuses: tuple[int, ...] = HTTP_RETRY_STATUSES
+    max_time: float = HTTP_MAX_RETRY_TIME  # секунд на все повторы одного запроса
+    backoff_base: float = HTTP_BACKOFF_BASE
+    backoff_max: float = HTTP_BACKOFF_MAX
+
+    def delay(self, attempt: int) -> float:
+        """Экспоненциальная задержка с полным джиттером для попытки номер `attempt` (с нуля)."""
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2**attempt))  # noqa: S311
+
+
+DEFAULT_RETRY = RetryPolicy()
+
+
+def make_request(
+    method,
+    url,
+    params=None,
+    proxy=None,
+    payload=None,
+    headers=None,
+    cookies={},  # noqa: B006
+    request_name="",
+    timeout=6,
+    stream=None,
+    retry: RetryPolicy = DEFAULT_RETRY,
+    *,
+    wait=time.sleep,
+) -> requests.Response:
+    """Метод для выполнения запроса в несколько попыток.
+
+    Запрос идет через общую сессию хоста. Повторяются только идемпотентные методы при
+    статусах из `retry.statuses` и таймаутах; ошибка соединения повторяется для любого
+    метода, так как запрос до сервера не дошел. Между попытками выдерживается
+    экспоненциальная задержка с джиттером, суммарно не дольше `retry.max_time` секунд;
+    ждет ее `wait`, чтобы ограничитель хоста мог на это время отдать слот.
+    """
+    idempotent = method.upper() in HTTP_IDEMPOTENT_METHODS
+    session = get_session(url)
+    deadline = time.monotonic() + retry.max_time
+
+    response = None
+    for attempt in range(retry.attempts):
+        try:
+            logger.info(f"{method} | {request_name} | {proxy}")
+
+            response = session.request(
+                method,
+                url,
+                params=params,
+                headers=headers,
+                cookies=cookies,
+                json=payload,
+                proxies=proxy,
+                timeout=timeout,
+                stream=stream,
+            )
+            logger.info(f"Response status_code: {response.status_code}\n")
+
+            if response.status_code == 200 or not (idempotent and response.status_code in retry.statuses):  # noqa: PLR2004
+                return response
+
+            logger.info(f"status code {response.status_code} | Попытка повторного запроса...")
+            response.close()
+
+        except requests.ConnectionError as e:
+            logger.warning(e)
+            logger.info("Exception | Попытка повторного запроса...")
+
+        except requests.Timeout as e:
+            if not idempotent:
+                raise
+            logger.warning(e)
+            logger.info("Timeout | Попытка повторного запроса...")
+
+        delay = retry.delay(attempt)
+        if attempt + 1 == retry.attempts or time.monotonic() + delay > deadline:
+            break
+        wait(delay)
+
+    logger.info(f"Исчерпано кол-во попыток запроса {request_name}")
+    return response
+
+
+class HostLimiter:
+    """Ограничивает число одновременных запросов к хосту и частоту их отправки."""
+
+    def __init__(self, max_connections: int, min_interval: float):
+        self._slots = threading.BoundedSemaphore(max_connections)
+        self._min_interval = min_interval
+        self._lock = threading.Lock()
+        self._next_request_at = 0.0
+
+    def _acquire(self):
+        self._slots.acquire()
+        with self._lock:
+            now = time.monotonic()
+            delay = self._next_request_at - now
+            self._next_request_at = max(now, self._next_request_at) + self._min_interval
+        if delay > 0:
+            time.sleep(delay)
+
+    def __enter__(self):
+        self._acquire()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._slots.release()
+
+    def pause(self, delay: float):
+        """Ждет `delay` секунд, отдав слот хоста другим запросам на время ожидания."""
+        self._slots.release()
+        try:
+            time.sleep(delay)
+        finally:
+            self._acquire()
+
+
+class Fetcher:
+    """Конкурентная загрузка страниц с ограничением нагрузки на каждый хост.
+
+    Слот хоста удерживается только на время самого запроса, поэтому вложенные
+    вызовы `map` (листинг -> детальные страницы -> пагинация) не блокируют друг друга.
+    На паузы между повторами слот отдается, и повторяющийся URL не занимает хост.
+    Результаты `map` всегда возвращаются в порядке входных элементов.
+    """
+
+    def __init__(
+        self,
+        max_connections: int = HTTP_MAX_CONNECTIONS_PER_HOST,
+        min_interval: float = HTTP_MIN_REQUEST_INTERVAL,
+    ):
+        self.max_connections = max_connections
+        self.min_interval = min_interval
+        self._limiters: dict[str, HostLimiter] = {}
+        self._lock = threading.Lock()
+
+    def limiter(self, url: str) -> HostLimiter:
+        host = urlsplit(url).netloc
+        with self._lock:
+            if host not in self._limiters:
+                self._limiters[host] = HostLimiter(self.max_connections, self.min_interval)
+            return self._limiters[host]
+
+    def request(self, method: str, url: str, **kwargs) -> requests.Response:
+        limiter = self.limiter(url)
+        with limiter:
+            return make_request(method, url, wait=limiter.pause, **kwargs)
+
+    def map(self, func, items) -> list:
+        items = list(items)
+        if len(items) <= 1:
+            return [func(item) for item in items]
+        with ThreadPoolExecutor(max_workers=min(len(items), self.max_connections)) as executor:
+            return list(executor.map(func, items))
+
+
+fetcher = Fetcher()
@@ -1,46 +1,232 @@
+import hashlib
 import re
-from difflib import get_close_matches
+from collections import namedtuple
+from collections.abc import Iterator, Sequence
+from pathlib import Path
+from typing import NamedTuple
 
-import pandas as pd
+import fitz  # PyMuPDF
 from loguru import logger
 
-from edu_programs.models import Faculty, University
+from edu_programs.const import CONTENT_PAGE_COUNT_LIMIT, DISCIPLINE_TABLE_COLUMNS, VSU_CONTENT_COLUMNS
 
 
-def extract_professional_standards(page_text: str):
-    standards_pattern = re.compile(r"(\d{2}\.\d{3})\s+([А-ЯA-Z-][А-ЯA-Z-\s]*[А-ЯA-Z-])(?=\s|$)")
-    standards = [
-        [
-            item[0].strip().replace("\n", ""),
-            item[1].strip().replace("\n", "").lower().capitalize(),
-        ]
-        for item in standards_pattern.findall(page_text)
+# Одна альтернатива на каждый вид данных титульной страницы: текст сканируется один раз
+TITLE_PAGE_PATTERN = re.compile(
+    r"Факультет:\s*(?P<faculty>[^\n]+)"
+    r"|(?P<standard_code>\d{2}\.\d{3})\s+(?P<standard_name>[А-ЯA-Z-][А-ЯA-Z-\s]*[А-ЯA-Z-])(?=\s|$)",
+)
+
+
+CONTENTS_TITLE_PATTERN = re.compile(r"^\s*содержание\s*$", re.IGNORECASE | re.MULTILINE)
+CONTENTS_ROW_PATTERN = re.compile(
+    r"^\s*(?P<index>\d+(?:\.\d+)*)\.?\s+(?P<section>\S.*?)[\s.…]*?\s(?P<page>\d{1,3})\s*$",
+    re.MULTILINE,
+)
+COMPETENCY_CODE = r"(?:УК|ОПК|ПК)-\d+(?:\.\d+)?"
+DISCIPLINE_ROW_PATTERN = re.compile(
+    r"^\s*(?P<index>(?:Б\d|ФТД)(?:\.[\w()]+)+)\s+(?P<name>\S.*?)"
+    rf"(?:\s+(?P<competencies>{COMPETENCY_CODE}(?:[,;\s]+{COMPETENCY_CODE})*))?[,;\s]*$",
+    re.MULTILINE,
+)
+COMPETENCY_ROW_PATTERN = re.compile(
+    rf"^\s*(?P<code>{COMPETENCY_CODE})\.?\s+(?P<description>[А-ЯA-Z].*?)\s*$",
+    re.MULTILINE,
+)
+
+ContentsEntry = namedtuple("ContentsEntry", VSU_CONTENT_COLUMNS)  # noqa: PYI024
+
+
+def parser_version() -> str:
+    """Отпечаток кода и настроек парсера: меняется при любой правке этого модуля."""
+    source = Path(__file__).read_bytes()
+    options = repr((CONTENT_PAGE_COUNT_LIMIT, DISCIPLINE_TABLE_COLUMNS, VSU_CONTENT_COLUMNS)).encode()
+    return hashlib.sha256(source + options).hexdigest()[:16]
+
+
+PARSER_VERSION = parser_version()
+
+
+class StandardRecord(NamedTuple):
+    code: str  # полный код, например 06.001
+    name: str
+
+
+class TitlePage(NamedTuple):
+    faculty_name: str | None
+    professional_standards: list[StandardRecord]
+
+
+def parse_title_page(page_text: str) -> TitlePage:
+    faculty_name = None
+    standards = []
+
+    for match in TITLE_PAGE_PATTERN.finditer(page_text):
+        if match["faculty"] is not None:
+            if faculty_name is None:
+                faculty_name = match["faculty"].strip()
+            continue
+        standards.append(
+            StandardRecord(
+                code=match["standard_code"],
+                name=match["standard_name"].strip().replace("\n", "").lower().capitalize(),
+            ),
+        )
+
+    return TitlePage(faculty_name, standards)
+
+
+def parse_vsu_page(page_text: str) -> dict:
+    """Разбирает титульную страницу плана ВГУ. Не обращается к БД."""
+    title_page = parse_title_page(page_text)
+    return {
+        "professional_standards": [standard.code for standard in title_page.professional_standards],
+        "faculty_name": title_page.faculty_name,
+    }
+
+
+class DisciplineRecord(NamedTuple):
+    index: str
+    name: str
+    competencies: str
+
+
+class CompetencyRecord(NamedTuple):
+    code: str
+    description: str
+
+
+class ProgramDocument(NamedTuple):
+    contents: list[ContentsEntry]
+    disciplines: list[DisciplineRecord]
+    competencies: list[CompetencyRecord]
+
+
+class DocumentPages(Sequence):
+    """Текст страниц открытого документа, не дальше `CONTENT_PAGE_COUNT_LIMIT`.
+
+    Страница загружается только при обращении к ней и сразу освобождается, поэтому
+    память не зависит от объема плана. Парсеры принимают любую последовательность
+    текстов страниц: этот класс или текст, сохраненный в `DocumentArtifact`.
+    """
+
+    def __init__(self, doc: fitz.Document):
+        self.doc = doc
+
+    def __len__(self) -> int:
+        return min(self.doc.page_count, CONTENT_PAGE_COUNT_LIMIT)
+
+    def __getitem__(self, number: int) -> str:
+        if not 0 <= number < len(self):
+            raise IndexError(number)
+        page = self.doc.load_page(number)
+        text = page.get_text(sort=True)
+        del page
+        return text
+
+
+def iter_page_texts(
+    pages: Sequence[str], start: int = 0, stop: int = CONTENT_PAGE_COUNT_LIMIT
+) -> Iterator[tuple[int, str]]:
+    for number in range(start, min(stop, CONTENT_PAGE_COUNT_LIMIT, len(pages))):
+        yield number, pages[number]
+
+
+def parse_table_of_contents(page_text: str) -> list[ContentsEntry]:
+    if not CONTENTS_TITLE_PATTERN.search(page_text):
+        return []
+    return [
+        ContentsEntry(match["index"], match["section"].strip(), int(match["page"]))
+        for match in CONTENTS_ROW_PATTERN.finditer(page_text)
     ]
-    return pd.DataFrame(data=standards, columns=["Код", "Название"])
 
 
-def extract_program_info(page_text: str):
-    faculty_pattern = re.compile(r"Факультет:\s*([^\n]+)")
-    faculty_match = faculty_pattern.search(page_text)
-    faculty = faculty_match.group(1).strip() if faculty_match else None
-    return {"Факультет": faculty}
+def is_discipline_table_page(page_text: str) -> bool:
+    return all(column in page_text for column in DISCIPLINE_TABLE_COLUMNS)
+
+
+def parse_discipline_rows(page_text: str) -> list[DisciplineRecord]:
+    return [
+        DisciplineRecord(
+            index=match["index"],
+            name=re.sub(r"\s+", " ", match["name"]).strip(),
+            competencies=", ".join(re.findall(COMPETENCY_CODE, match["competencies"] or "")),
+        )
+        for match in DISCIPLINE_ROW_PATTERN.finditer(page_text)
+    ]
+
+
+def content_pages(contents: list[ContentsEntry], keyword: str) -> tuple[int, int] | None:
+    """Диапазон страниц раздела оглавления, в названии которого есть `keyword`."""
+    for i, entry in enumerate(contents):
+        if keyword in entry.section.lower():
+            stop = contents[i + 1].page if i + 1 < len(contents) else CONTENT_PAGE_COUNT_LIMIT
+            return entry.page - 1, max(stop, entry.page)
+    return None
+
+
+def scan_pages(pages: Sequence[str], start: int, stop: int) -> tuple[list[DisciplineRecord], list[CompetencyRecord]]:
+    disciplines, competencies = {}, {}
+    in_table = False
+    for _, page_text in iter_page_texts(pages, start=start, stop=stop):
+        if is_discipline_table_page(page_text):
+            in_table = True
+        if in_table:
+            rows = parse_discipline_rows(page_text)
+            for row in rows:
+                disciplines.setdefault(row.index, row)
+            in_table = bool(rows)
+        for match in COMPETENCY_ROW_PATTERN.finditer(page_text):
+            competencies.setdefault(match["code"], re.sub(r"\s+", " ", match["description"]))
+
+    return (
+        list(disciplines.values()),
+        [CompetencyRecord(code, description) for code, description in competencies.items()],
+    )
+
+
+def parse_vsu_document(pages: Sequence[str]) -> ProgramDocument:
+    """Разбирает оглавление, таблицу дисциплин и перечень компетенций плана.
+
+    Если оглавление найдено, текст извлекается только со страниц нужных разделов.
+    Если в них ничего не нашлось или оглавления нет, просматриваются все страницы
+    до `CONTENT_PAGE_COUNT_LIMIT`.
+    """
+    contents = []
+    for _, page_text in iter_page_texts(pages, stop=3):
+        contents = parse_table_of_contents(page_text)
+        if contents:
+            break
 
+    ranges = [content_pages(contents, "дисциплин"), content_pages(contents, "компетенц")]
+    ranges = [page_range for page_range in ranges if page_range is not None]
+    disciplines, competencies = [], []
+    if ranges:
+        start = min(page_range[0] for page_range in ranges)
+        stop = max(page_range[1] for page_range in ranges)
+        disciplines, competencies = scan_pages(pages, start, stop)
+    if not disciplines and not competencies:
+        disciplines, competencies = scan_pages(pages, 0, CONTENT_PAGE_COUNT_LIMIT)
 
-def vsu_document_parser(page_text: str, university: University):
-    result = {}
+    return ProgramDocument(contents, disciplines, competencies)
 
-    result["professional_standards"] = extract_professional_standards(page_text)
-    program_info = extract_program_info(page_text)
 
-    if program_info and "Факультет" in program_info and str(program_info["Факультет"]) != "None":
-        faculty_name = program_info["Факультет"]
-        all_faculties = Faculty.objects.filter(university=university)
-        faculty_names = [f.name for f in all_faculties]
+def parse_vsu_pages(pages: Sequence[str]) -> dict | None:
+    """Разбирает план по тексту страниц. None, если на титульной странице нет текста."""
+    page_text = pages[0] if pages else ""
+    if not page_text:
+        return None
+    document = parse_vsu_document(pages)
+    return {
+        **parse_vsu_page(page_text),
+        "disciplines": document.disciplines,
+        "competencies": document.competencies,
+    }
 
-        matches = get_close_matches(faculty_name, faculty_names, n=1, cutoff=0.6)
-        if matches:
-            result["faculty"] = all_faculties.get(name=matches[0])
-        else:
-            logger.warning(f"Факультет не найден | {faculty_name}")
 
-    return result
+def parse_vsu_document_file(file_path) -> dict | None:
+    with fitz.open(file_path) as doc:
+        parsed = parse_vsu_pages(DocumentPages(doc))
+    if parsed is None:
+        logger.info(f"{file_path} | нет текста на странице")
+    return parsed
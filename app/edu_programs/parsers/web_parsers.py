@@ -3,70 +3,12 @@ from __future__ import annotations
 import re
 from urllib.parse import unquote
 
-import requests
 from bs4 import BeautifulSoup
 from loguru import logger
 
 from edu_programs.const import ALLOWED_EDU_STANDARDS, ALLOWED_PROF_STANDARDS, POSSIBLE_DEGREES, VSU_OP_FILES
-
-
-def make_request(
-    method,
-    url,
-    params=None,
-    proxy=None,
-    payload=None,
-    headers=None,
-    cookies={},  # noqa: B006
-    retry_statuses=None,
-    attempts=5,
-    request_name="",
-    timeout=6,
-    stream=None,  # noqa: ARG001
-) -> requests.Response:
-    """Метод для выполнения запроса в несколько попыток."""
-    if headers is None:
-        headers = {}
-    if payload is None:
-        payload = {}
-    if params is None:
-        params = {}
-    if retry_statuses is None:
-        retry_statuses = [503]
-
-    response = None
-    status_code = 0
-
-    while status_code != 200:  # noqa: PLR2004
-        if attempts <= 0:
-            logger.info(f"Исчерпано кол-во попыток запроса {request_name}")
-            break
-        try:
-            logger.info(f"{method} | {request_name} | {proxy}")
-
-            response = requests.request(
-                method,
-                url,
-                params=params,
-                headers=headers,
-                cookies=cookies,
-                json=payload,
-                proxies=proxy,
-                timeout=timeout,
-            )
-            status_code = response.status_code
-            logger.info(f"Response status_code: {status_code}\n")
-
-            if response is not None and response.status_code != 200:  # noqa: PLR2004
-                logger.info(f"status code {response.status_code} | Попытка повторного запроса...")
-                attempts -= 1
-
-        except Exception as e:
-            logger.warning(e)
-            logger.info("Exception | Попытка повторного запроса...")
-            attempts -= 1
-
-    return response
+from edu_programs.parsers.http_cache import http_cache
+from edu_programs.parsers.http_client import fetcher
 
 
 def remove_brackets(text):
@@ -81,144 +23,205 @@ def remove_brackets(text):
     return re.sub(r"\s+", " ", text).strip()
 
 
-def download_pdf(url: str, save_path: str):
+def download_pdf(url: str, save_path: str) -> bool | None:
+    """Скачивает PDF, если он изменился с прошлого запуска.
+
+    Возвращает True, если файл обновлен, False, если не изменился, и None, если скачать не удалось.
+    """
     try:
-        response = make_request(method="GET", url=url, stream=True)
-        response.raise_for_status()  # Проверяем, что запрос успешен
+        return http_cache.download(url, save_path)
+    except Exception as e:
+        logger.warning(f"Не удалось скачать {url}: {e}")
+        return None
+
+
+def fetch_soup(url: str, params=None, request_name: str = "") -> BeautifulSoup:
+    response = http_cache.get(url, params=params, request_name=request_name)
+    return BeautifulSoup(response.text, "html.parser")
+
+
+VSU_PROGRAMS_URL = "https://www.vsu.ru/sveden/education/oop.html"
+
+# класс блока с кодом стандарта на странице группы каталога ФГОС
+FGOS_EDUCATION_INNER_CLASS = "w80 me-2"
+FGOS_PROFESSIONAL_INNER_CLASS = "me-2"
+
 
-        with open(save_path, "wb+") as file:
-            for chunk in response.iter_content(chunk_size=8192):
-                file.write(chunk)
+def fgos_last_page(inner_class: str) -> int:
+    """Номер последней страницы, которую вообще имеет смысл запрашивать."""
+    return 4 if inner_class == FGOS_EDUCATION_INNER_CLASS else 16
 
-    except Exception:  # noqa: S110
-        pass
 
+def is_fgos_last_page(soup: BeautifulSoup, page: int, inner_class: str) -> bool:
+    return page >= fgos_last_page(inner_class) or (
+        inner_class == FGOS_PROFESSIONAL_INNER_CLASS
+        and soup.find("li", attrs={"class": "page-item next disabled"}) is not None
+    )
 
-def parse_fgos_edu(method: str, url: str, inner_class: str):
+
+def parse_fgos_page(soup: BeautifulSoup, inner_class: str) -> list[dict]:
     results = []
 
-    next_page = True
-    page = 1
-    while next_page:
-        response = make_request(method=method, url=url, params={"page": page}, request_name="fgos_standards_inner")
-        response.encoding = "utf-8"
-        soup = BeautifulSoup(response.text, "html.parser")
-        if (
-            page > 15  # noqa: PLR2004
-            or (inner_class == "me-2" and soup.find_next("li", attrs={"class": "page-item next disabled"}))
-            or (inner_class == "w80 me-2" and page > 3)  # noqa: PLR2004
-        ):
-            next_page = False
-
-        programs = soup.find_all("div", attrs={"class": "item d-flex"})
-
-        for item in programs:
-            inner_item = item.find_next("div", attrs={"class": "d-flex"})
-            full_code = inner_item.find_next("div", attrs={"class": inner_class}).text.strip(".").split(".")
-
-            if inner_class == "me-2":  # noqa: SIM102
-                if not (
-                    ALLOWED_PROF_STANDARDS[full_code[0]] == "all"
-                    or full_code[1] in ALLOWED_PROF_STANDARDS[full_code[0]]
-                ):
-                    continue
-
-            inner_item = item.find_next("div", attrs={"class": "d-flex"})
-            results.append(
-                {
-                    "name": inner_item.find_all("div")[2].text,
-                    "code": inner_item.find_next("div", attrs={"class": inner_class}).text.strip(".").split(".")[-1],
-                },
-            )
-        page += 1
+    for item in soup.find_all("div", attrs={"class": "item d-flex"}):
+        inner_item = item.find_next("div", attrs={"class": "d-flex"})
+        full_code = inner_item.find_next("div", attrs={"class": inner_class}).text.strip(".").split(".")
+
+        if inner_class == FGOS_PROFESSIONAL_INNER_CLASS:  # noqa: SIM102
+            if not (
+                ALLOWED_PROF_STANDARDS[full_code[0]] == "all" or full_code[1] in ALLOWED_PROF_STANDARDS[full_code[0]]
+            ):
+                continue
+
+        results.append(
+            {
+                "name": inner_item.find_all("div")[2].text,
+                "code": full_code[-1],
+            },
+        )
 
     return results
 
 
-def extract_fgos_education_standards():
+def parse_fgos_edu(url: str, inner_class: str):
+    """Обходит пагинацию раздела ФГОС.
+
+    Страницы запрашиваются пачками по числу слотов хоста. Пачка разбирается по порядку
+    до первой страницы, признанной последней, — остальные страницы пачки отбрасываются,
+    поэтому результат совпадает с последовательным обходом.
+    """
     results = []
+    last_page = fgos_last_page(inner_class)
+
+    page = 1
+    while page <= last_page:
+        pages = range(page, min(page + fetcher.max_connections, last_page + 1))
+        soups = fetcher.map(
+            lambda p: fetch_soup(url, params={"page": p}, request_name="fgos_standards_inner"),
+            pages,
+        )
+        for current_page, soup in zip(pages, soups, strict=True):
+            results.extend(parse_fgos_page(soup, inner_class))
+            if is_fgos_last_page(soup, current_page, inner_class):
+                return results
+        page = pages.stop
+
+    return results
+
+
+def fgos_group_standards(group: dict, inner_class: str) -> list[dict]:
+    """Стандарты одной группы каталога ФГОС с полями группы, кроме ссылки на нее."""
+    fields = {key: value for key, value in group.items() if key != "url"}
+    return [
+        {**fields, "name": result["name"], "code": result["code"]}
+        for result in parse_fgos_edu(group["url"], inner_class)
+    ]
+
 
-    for degree_info in POSSIBLE_DEGREES:
-        degree_code = degree_info["code"]
-        url_index = degree_info.get("fgosvo_index")
-        if not url_index:
+def fgos_education_groups(degree_info: dict) -> list[dict]:
+    """Группы образовательных стандартов одной степени из `ALLOWED_EDU_STANDARDS`."""
+    soup = fetch_soup(f"https://fgosvo.ru/fgosvo/index/{degree_info['fgosvo_index']}", request_name="fgos_standards")
+
+    groups = []
+    for item in soup.find_all("div", attrs={"class": "item d-flex"}):
+        group_code = item.find_next("div", attrs={"class": "w112 text-green align-middle"}).text[:2]
+        if group_code not in ALLOWED_EDU_STANDARDS:
             continue
-        response = make_request(
-            method="GET",
-            url=f"https://fgosvo.ru/fgosvo/index/{url_index}",
-            request_name="fgos_standards",
+
+        item_link = item.find_next("a", attrs={"class": "item-link"})
+        groups.append(
+            {
+                "group_name": item_link.text.lower().capitalize(),
+                "group_code": group_code,
+                "degree_code": degree_info["code"],
+                "url": f"https://fgosvo.ru{item_link['href']}",
+            },
         )
-        response.encoding = "utf-8"
-        soup = BeautifulSoup(response.text, "html.parser")
-        fgos_programs = soup.find_all("div", attrs={"class": "item d-flex"})
+    return groups
 
-        for item in fgos_programs:
-            group_code = item.find_next("div", attrs={"class": "w112 text-green align-middle"}).text[:2]
-            if group_code not in ALLOWED_EDU_STANDARDS:
-                continue
 
-            item_link = item.find_next("a", attrs={"class": "item-link"})
-            group_name = item_link.text.lower().capitalize()
-            url = f"https://fgosvo.ru{item_link['href']}"
-
-            [
-                results.append(
-                    {
-                        "group_name": group_name,
-                        "group_code": group_code,
-                        "degree_code": degree_code,
-                        "name": result["name"],
-                        "code": result["code"],
-                    },
-                )
-                for result in parse_fgos_edu("GET", url, "w80 me-2")
-            ]
+def fgos_all_education_groups() -> list[dict]:
+    degrees = [degree_info for degree_info in POSSIBLE_DEGREES if degree_info.get("fgosvo_index")]
+    return [group for groups in fetcher.map(fgos_education_groups, degrees) for group in groups]
 
-    return results
 
+def extract_fgos_education_standards():
+    groups = fgos_all_education_groups()
+    group_results = fetcher.map(lambda group: fgos_group_standards(group, FGOS_EDUCATION_INNER_CLASS), groups)
+    return [row for rows in group_results for row in rows]
 
-def extract_fgos_professional_standards():
-    results = []
 
-    for page in range(1, 3):
-        response = make_request(
-            method="GET",
-            url=f"https://fgosvo.ru/docs/index/2?page={page}",
+def fgos_professional_groups() -> list[dict]:
+    """Группы профессиональных стандартов из `ALLOWED_PROF_STANDARDS`."""
+    soups = fetcher.map(
+        lambda page: fetch_soup(
+            f"https://fgosvo.ru/docs/index/2?page={page}",
             request_name="fgos_professional_standards",
-        )
-        response.encoding = "utf-8"
-        soup = BeautifulSoup(response.text, "html.parser")
-        fgos_standards = soup.find_all("div", attrs={"class": "item d-flex"})
+        ),
+        range(1, 3),
+    )
 
-        for item in fgos_standards:
+    groups = []
+    for soup in soups:
+        for item in soup.find_all("div", attrs={"class": "item d-flex"}):
             group_code = item.find_next("div", attrs={"class": "w80 text-green align-middle"}).text
             if group_code not in ALLOWED_PROF_STANDARDS:
                 continue
-            item_link = item.find_next("a", attrs={"class": "item-link"})
-            group_name = item_link.text.lower().capitalize()
-            url = f"https://fgosvo.ru{item_link['href']}"
-
-            [
-                results.append(
-                    {
-                        "group_name": group_name,
-                        "group_code": group_code,
-                        "name": result["name"],
-                        "code": result["code"],
-                    },
-                )
-                for result in parse_fgos_edu("GET", url, "me-2")
-            ]
 
-    return results
+            item_link = item.find_next("a", attrs={"class": "item-link"})
+            groups.append(
+                {
+                    "group_name": item_link.text.lower().capitalize(),
+                    "group_code": group_code,
+                    "url": f"https://fgosvo.ru{item_link['href']}",
+                },
+            )
+    return groups
 
 
-def extract_vsu_education_programs(download=True):
+def extract_fgos_professional_standards():
+    groups = fgos_professional_groups()
+    group_results = fetcher.map(lambda group: fgos_group_standards(group, FGOS_PROFESSIONAL_INNER_CLASS), groups)
+    return [row for rows in group_results for row in rows]
+
+
+def parse_vsu_program_row(item, year: str) -> dict | None:
+    degree = item.find("td", attrs={"itemprop": "eduLevel"}).text
+    if degree.rsplit("–")[-1].strip() not in [elem["name"] for elem in POSSIBLE_DEGREES]:
+        return None
+    if item.find("td", attrs={"itemprop": "eduForm"}).text != "очная":
+        return None
+    code = item.find("td", attrs={"itemprop": "eduCode"}).text.split(".")
+    group_code, degree_code, code = code[0], code[1], code[2]
+    name = item.find("td", attrs={"itemprop": "eduName"}).text
+    profile = re.findall(r'["\'](.*?)["\']', name)
+    profile = profile[0] if len(profile) > 0 else None
+    name = remove_brackets(name).strip()
+    plan_href = item.find("td", attrs={"itemprop": "educationPlan"})
+    plan_href = plan_href.find_next("a") if plan_href.text.lower() != "нет" else None
+    if plan_href is None:
+        return None
+    plan_href = unquote(plan_href.get("href", ""))
+    plan_name = plan_href.rsplit("/")[-1]
+    if str(plan_name) == "None":
+        return None
+
+    return {
+        "group_code": group_code,
+        "degree_code": degree_code,
+        "code": code,
+        "name": name,
+        "year": year,
+        "profile": profile or "",
+        "file_path": VSU_OP_FILES / plan_name,
+        "plan_href": plan_href,
+    }
+
+
+def vsu_program_rows() -> list[dict]:
+    """Программы из листинга сайта ВГУ со ссылками на планы в `plan_href`."""
     results = []
 
-    response = make_request(method="GET", url="https://www.vsu.ru/sveden/education/oop.html")
-    response.encoding = "utf-8"
-    soup = BeautifulSoup(response.text, "html.parser")
+    soup = fetch_soup(VSU_PROGRAMS_URL)
 
     tabs = soup.find_all("div", attrs={"class": "tab-pane"})
     for tab in tabs:
@@ -226,46 +229,34 @@ def extract_vsu_education_programs(download=True):
             year = tab["id"].replace("tab", "")
             edu_programs = tab.find_all("tr", attrs={"itemprop": "eduOp"})
 
-            for i, item in enumerate(edu_programs):
-                degree = item.find("td", attrs={"itemprop": "eduLevel"}).text
-                if degree.rsplit("–")[-1].strip() not in [elem["name"] for elem in POSSIBLE_DEGREES]:
-                    continue
-                if item.find("td", attrs={"itemprop": "eduForm"}).text != "очная":
-                    continue
-                code = item.find("td", attrs={"itemprop": "eduCode"}).text.split(".")
-                group_code, degree_code, code = code[0], code[1], code[2]
-                name = item.find("td", attrs={"itemprop": "eduName"}).text
-                profile = re.findall(r'["\'](.*?)["\']', name)
-                profile = profile[0] if len(profile) > 0 else None
-                name = remove_brackets(name).strip()
-                plan_href = item.find("td", attrs={"itemprop": "educationPlan"})
-                plan_href = plan_href.find_next("a") if plan_href.text.lower() != "нет" else None
-                if plan_href is None:
-                    continue
-                plan_href = unquote(plan_href.get("href", ""))
-                plan_name = plan_href.rsplit("/")[-1]
-                if str(plan_name) == "None":
-                    continue
-                file_path = VSU_OP_FILES / plan_name
-
-                if download:
-                    logger.info(f"Скачивание файла номер: {i}")
-                    download_pdf(plan_href, file_path)
-
-                results.append(
-                    {
-                        "group_code": group_code,
-                        "degree_code": degree_code,
-                        "code": code,
-                        "name": name,
-                        "year": year,
-                        "profile": profile or "",
-                        "file_path": file_path,
-                    },
-                )
+            for item in edu_programs:
+                row = parse_vsu_program_row(item, year)
+                if row is not None:
+                    results.append(row)
 
         except Exception as e:
             logger.exception(f"Ошибка при обращении к сайту ВГУ: {e}")
             continue
 
     return results
+
+
+def extract_vsu_education_programs(download=True):
+    results = vsu_program_rows()
+
+    if download:
+
+        def download_row(numbered_row):
+            i, row = numbered_row
+            logger.info(f"Скачивание файла номер: {i}")
+            return download_pdf(row["plan_href"], row["file_path"])
+
+        changed = fetcher.map(download_row, enumerate(results))
+    else:
+        changed = [True] * len(results)
+
+    for row, row_changed in zip(results, changed, strict=True):
+        del row["plan_href"]
+        row["changed"] = row_changed
+
+    return results
@@ -0,0 +1,61 @@
+"""Прогресс запуска загрузки данных, видимый из любого процесса.
+
+Этап - разбор стандартов ФГОС одного вида или программ одного вуза. Для этапа в кэше
+хранятся число подзадач, число завершенных и завершенных с ошибкой, а по окончании -
+итоговое сообщение и признак того, что этап завершился ошибкой. Счетчики увеличиваются атомарно (`cache.incr`), поэтому подзадачи
+на разных воркерах не затирают друг друга.
+"""
+
+from django.core.cache import cache
+
+from edu_programs.const import CACHE_KEY_PREFIX, PROGRESS_TIMEOUT
+
+
+PROGRESS_FIELDS = ("total", "done", "failed", "result", "error")
+
+
+def progress_key(run_id: str, stage: str, field: str) -> str:
+    return f"{CACHE_KEY_PREFIX}:progress:{run_id}:{stage}:{field}"
+
+
+def start_stage(run_id: str, stage: str, total: int):
+    cache.set_many(
+        {
+            progress_key(run_id, stage, "total"): total,
+            progress_key(run_id, stage, "done"): 0,
+            progress_key(run_id, stage, "failed"): 0,
+        },
+        timeout=PROGRESS_TIMEOUT,
+    )
+    cache.delete_many([progress_key(run_id, stage, "result"), progress_key(run_id, stage, "error")])
+
+
+def advance_stage(run_id: str, stage: str, failed=False):
+    fields = ("done", "failed") if failed else ("done",)
+    for field in fields:
+        try:
+            cache.incr(progress_key(run_id, stage, field))
+        except ValueError:  # прогресс истек или этап запущен без start_stage
+            return
+
+
+def finish_stage(run_id: str, stage: str, result: str):
+    cache.set(progress_key(run_id, stage, "result"), result, timeout=PROGRESS_TIMEOUT)
+
+
+def fail_stage(run_id: str, stage: str, error: str):
+    """Завершает этап ошибкой: этап считается законченным, итог - текст ошибки."""
+    cache.set_many(
+        {
+            progress_key(run_id, stage, "result"): f"Ошибка: {error}",
+            progress_key(run_id, stage, "error"): 1,
+        },
+        timeout=PROGRESS_TIMEOUT,
+    )
+
+
+def get_progress(run_id: str, stages: list[str]) -> dict[str, dict]:
+    """Состояние этапов запуска: поля `PROGRESS_FIELDS`, отсутствующие - None."""
+    keys = {(stage, field): progress_key(run_id, stage, field) for stage in stages for field in PROGRESS_FIELDS}
+    values = cache.get_many(keys.values())
+    return {stage: {field: values.get(keys[stage, field]) for field in PROGRESS_FIELDS} for stage in stages}
@@ -0,0 +1,97 @@
+"""Полнотекстовый и нечеткий поиск программ и профессиональных стандартов.
+
+`search_vector` заполняется триггером PostgreSQL при вставке и изменении текстовых
+полей, поэтому вектор актуален и после bulk_create/bulk_update из `ingestion`.
+Поиск объединяет совпадение по вектору (русская морфология, GIN индекс) и
+триграммное сходство названия (`pg_trgm`, GIN индекс), устойчивое к опечаткам.
+Запросы вида `09.03.01` или `06.001` ищутся по коду.
+"""
+
+import re
+
+from django.contrib.postgres.search import SearchQuery, SearchRank, TrigramWordSimilarity
+from django.db.models import F, Q, QuerySet
+from django.db.models.functions import Greatest
+
+from edu_programs.models import ProfessionalStandard, Program
+
+
+SEARCH_CONFIG = "russian"
+CODE_QUERY = re.compile(r"\d{2}(?:\.\d{2,3}){0,2}")
+RANK_ORDERING = ("-rank", "-similarity", "pk")  # порядок результатов `ranked`
+
+# Колонки, из которых триггер собирает search_vector, и их веса
+SEARCH_VECTOR_WEIGHTS = {
+    Program: {"name": "A", "profile": "B"},
+    ProfessionalStandard: {"name": "A"},
+}
+
+
+def search_vector_trigger_sql(model) -> list[str]:
+    """SQL функции и триггера, заполняющих `search_vector`, и заполнение пустых векторов."""
+    table = model._meta.db_table  # noqa: SLF001
+    weights = SEARCH_VECTOR_WEIGHTS[model]
+    function = f"{table}_search_vector_update"
+    vector = " || ".join(
+        f"setweight(to_tsvector('{SEARCH_CONFIG}', coalesce(NEW.{column}, '')), '{weight}')"
+        for column, weight in weights.items()
+    )
+    first_column = next(iter(weights))
+    return [
+        f"CREATE OR REPLACE FUNCTION {function}() RETURNS trigger AS $$ "
+        f"BEGIN NEW.search_vector := {vector}; RETURN NEW; END $$ LANGUAGE plpgsql",
+        f"CREATE OR REPLACE TRIGGER {function} BEFORE INSERT OR UPDATE OF {', '.join(weights)} "
+        f"ON {table} FOR EACH ROW EXECUTE FUNCTION {function}()",
+        # имена таблицы и колонок - из метаданных моделей, не из пользовательского ввода
+        f"UPDATE {table} SET {first_column} = {first_column} WHERE search_vector IS NULL",  # noqa: S608
+    ]
+
+
+def ranked(queryset: QuerySet, query: str, text_fields: list[str], code_filter: Q | None) -> QuerySet:
+    search_query = SearchQuery(query, config=SEARCH_CONFIG, search_type="websearch")
+    condition = Q(search_vector=search_query)
+    for field in text_fields:
+        condition |= Q(**{f"{field}__trigram_word_similar": query})
+    if code_filter is not None:
+        condition |= code_filter
+
+    similarity = [TrigramWordSimilarity(query, field) for field in text_fields]
+    return (
+        queryset.filter(condition)
+        .annotate(
+            rank=SearchRank(F("search_vector"), search_query),
+            similarity=Greatest(*similarity) if len(similarity) > 1 else similarity[0],
+        )
+        .order_by(*RANK_ORDERING)
+    )
+
+
+def code_lookup(query: str, fields: list[str]) -> Q | None:
+    """Фильтр по префиксу полного кода: `09`, `09.03`, `09.03.01`."""
+    query = query.strip()
+    if not CODE_QUERY.fullmatch(query):
+        return None
+    parts = query.split(".")
+    if len(parts) > len(fields):
+        return None
+    return Q(**dict(zip(fields, parts, strict=False)))
+
+
+def search_programs(query: str, queryset: QuerySet | None = None) -> QuerySet:
+    queryset = Program.objects.all() if queryset is None else queryset
+    return ranked(
+        queryset,
+        query,
+        ["name", "profile"],
+        code_lookup(query, ["edu_group__code", "edu_degree__code", "code"]),
+    )
+
+
+def search_professional_standards(query: str, queryset: QuerySet | None = None) -> QuerySet:
+    queryset = ProfessionalStandard.objects.all() if queryset is None else queryset
+    return ranked(
+        queryset,
+        query,
+        ["name"],
+        code_lookup(query, ["professional_standard_group__code", "code"]),
+    )
@@ -0,0 +1,47 @@
+"""Частые выборки справочных данных через кэш `edu_programs.cache`."""
+
+from edu_programs.cache import cached_query
+from edu_programs.models import (
+    EducationGroup,
+    EduDegree,
+    ProfessionalStandard,
+    ProfessionalStandardGroup,
+    Program,
+)
+
+
+@cached_query(EducationGroup)
+def education_groups_by_code() -> dict[str, EducationGroup]:
+    return {group.code: group for group in EducationGroup.objects.all()}
+
+
+@cached_query(EduDegree)
+def edu_degrees_by_code() -> dict[str, EduDegree]:
+    return {degree.code: degree for degree in EduDegree.objects.all()}
+
+
+@cached_query(Program, EducationGroup, EduDegree)
+def programs_by_faculty(faculty_id: int, approval_year: int | None = None) -> list[dict]:
+    programs = Program.objects.filter(faculty_id=faculty_id)
+    if approval_year is not None:
+        programs = programs.filter(approval_year=approval_year)
+    return list(
+        programs.order_by("id").values(
+            "id",
+            "name",
+            "code",
+            "profile",
+            "approval_year",
+            "edu_group__code",
+            "edu_degree__code",
+        ),
+    )
+
+
+@cached_query(ProfessionalStandard, ProfessionalStandardGroup)
+def professional_standards_by_group(group_code: str) -> list[dict]:
+    return list(
+        ProfessionalStandard.objects.filter(professional_standard_group__code=group_code)
+        .order_by("code")
+        .values("id", "code", "name"),
+    )
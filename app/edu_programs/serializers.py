@@ -0,0 +1,148 @@
+from core.serializers import SparseFieldsMixin
+from rest_framework import serializers
+
+from edu_programs.models import (
+    Competency,
+    Discipline,
+    EducationGroup,
+    EduDegree,
+    Faculty,
+    FederalStateEducationStandard,
+    ProfessionalStandard,
+    ProfessionalStandardGroup,
+    Program,
+    ProgramScore,
+    University,
+)
+
+
+class UniversitySerializer(serializers.ModelSerializer):
+    class Meta:
+        model = University
+        fields = ("id", "name", "abbreviation")
+
+
+class FacultySerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Faculty
+        fields = ("id", "name", "abbreviation")
+
+
+class EducationGroupSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = EducationGroup
+        fields = ("id", "code", "name")
+
+
+class EduDegreeSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = EduDegree
+        fields = ("id", "code", "name")
+
+
+class ProfessionalStandardGroupSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = ProfessionalStandardGroup
+        fields = ("id", "code", "name")
+
+
+class ProfessionalStandardSerializer(SparseFieldsMixin, serializers.ModelSerializer):
+    full_code = serializers.SerializerMethodField()
+    professional_standard_group = ProfessionalStandardGroupSerializer()
+
+    class Meta:
+        model = ProfessionalStandard
+        fields = ("id", "full_code", "code", "name", "professional_standard_group")
+
+    def get_full_code(self, obj) -> str:
+        return f"{obj.professional_standard_group.code}.{obj.code}"
+
+
+class ProfessionalStandardShortSerializer(serializers.ModelSerializer):
+    full_code = serializers.SerializerMethodField()
+
+    class Meta:
+        model = ProfessionalStandard
+        fields = ("id", "full_code", "name")
+
+    def get_full_code(self, obj) -> str:
+        return f"{obj.professional_standard_group.code}.{obj.code}"
+
+
+class FederalStateEducationStandardSerializer(SparseFieldsMixin, serializers.ModelSerializer):
+    full_code = serializers.SerializerMethodField()
+    edu_group = EducationGroupSerializer()
+    edu_degree = EduDegreeSerializer()
+
+    class Meta:
+        model = FederalStateEducationStandard
+        fields = ("id", "full_code", "code", "name", "edu_group", "edu_degree")
+
+    def get_full_code(self, obj) -> str:
+        return f"{obj.edu_group.code}.{obj.edu_degree.code}.{obj.code}"
+
+
+class DisciplineSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Discipline
+        fields = ("index", "name", "competencies")
+
+
+class CompetencySerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Competency
+        fields = ("code", "description")
+
+
+class ProgramScoreSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = ProgramScore
+        fields = ("demand", "uniqueness", "components", "computed_at")
+
+
+class ProgramSerializer(SparseFieldsMixin, serializers.ModelSerializer):
+    full_code = serializers.SerializerMethodField()
+    edu_group = EducationGroupSerializer()
+    edu_degree = EduDegreeSerializer()
+    university = UniversitySerializer()
+    faculty = FacultySerializer()
+    professional_standards = ProfessionalStandardShortSerializer(many=True)
+    score = ProgramScoreSerializer(allow_null=True)
+
+    class Meta:
+        model = Program
+        fields = (
+            "id",
+            "full_code",
+            "code",
+            "name",
+            "profile",
+            "approval_year",
+            "edu_group",
+            "edu_degree",
+            "university",
+            "faculty",
+            "professional_standards",
+            "score",
+        )
+
+    def get_full_code(self, obj) -> str:
+        return f"{obj.edu_group.code}.{obj.edu_degree.code}.{obj.code}"
+
+
+class ProgramDetailSerializer(ProgramSerializer):
+    disciplines = DisciplineSerializer(many=True)
+    competencies = CompetencySerializer(many=True)
+
+    class Meta(ProgramSerializer.Meta):
+        fields = (*ProgramSerializer.Meta.fields, "disciplines", "competencies")
+
+
+class SimilarProgramSerializer(serializers.Serializer):
+    score = serializers.FloatField()
+    program = ProgramSerializer()
+
+
+class SearchResultsSerializer(serializers.Serializer):
+    programs = ProgramSerializer(many=True)
+    professional_standards = ProfessionalStandardSerializer(many=True)
@@ -1,10 +1,43 @@
 from pathlib import Path
 
-from django.db.models.signals import post_delete
+from django.db import connections
+from django.db.models.signals import m2m_changed, post_delete, post_migrate, post_save, pre_migrate
 from django.dispatch import receiver
 from loguru import logger
 
-from edu_programs.models import Program
+from edu_programs.cache import invalidate
+from edu_programs.matchers import invalidate_faculty_matchers
+from edu_programs.models import (
+    Competency,
+    Discipline,
+    DocumentArtifact,
+    EducationGroup,
+    EduDegree,
+    Faculty,
+    FederalStateEducationStandard,
+    ProfessionalStandard,
+    ProfessionalStandardGroup,
+    Program,
+    ProgramScore,
+    University,
+)
+from edu_programs.search import SEARCH_VECTOR_WEIGHTS, search_vector_trigger_sql
+from edu_programs.tasks import schedule_program_scores_refresh
+
+
+CACHED_MODELS = {
+    University,
+    Faculty,
+    ProfessionalStandardGroup,
+    EducationGroup,
+    ProfessionalStandard,
+    EduDegree,
+    FederalStateEducationStandard,
+    Program,
+    Discipline,
+    Competency,
+    ProgramScore,
+}
 
 
 @receiver(post_delete, sender=Program)
@@ -15,3 +48,65 @@ def auto_delete_file_on_delete(sender, instance, **kwargs):  # noqa: ARG001
             Path(instance.document.path).unlink()
         except Exception as e:
             logger.error(f"Ошибка при удалении файла {instance.document.path}: {e}")
+
+
+@receiver(post_delete, sender=DocumentArtifact)
+def delete_artifact_preview(sender, instance, **kwargs):  # noqa: ARG001
+    """Удаляет файл превью вместе с данными документа."""
+    if instance.preview:
+        instance.preview.delete(save=False)
+
+
+@receiver(post_save, sender=Faculty)
+@receiver(post_delete, sender=Faculty)
+def reset_faculty_matchers(sender, **kwargs):  # noqa: ARG001
+    """Сбрасывает кэш матчеров факультетов после изменения справочника."""
+    invalidate_faculty_matchers()
+
+
+@receiver(post_save)
+@receiver(post_delete)
+def invalidate_model_cache(sender, **kwargs):  # noqa: ARG001
+    """Сбрасывает кэш ответов и выборок, зависящих от измененной модели."""
+    if sender in CACHED_MODELS:
+        invalidate(sender)
+
+
+@receiver(m2m_changed, sender=Program.professional_standards.through)
+def invalidate_program_standards_cache(sender, action, **kwargs):  # noqa: ARG001
+    if action in {"post_add", "post_remove", "post_clear"}:
+        invalidate(Program)
+        schedule_program_scores_refresh()
+
+
+@receiver(post_save, sender=Program)
+@receiver(post_delete, sender=Program)
+@receiver(post_save, sender=Discipline)
+@receiver(post_delete, sender=Discipline)
+def refresh_scores_on_change(sender, **kwargs):  # noqa: ARG001
+    """Пересчитывает оценки программ после изменения их входных данных."""
+    schedule_program_scores_refresh()
+
+
+@receiver(pre_migrate)
+def create_search_extensions(sender, using, **kwargs):  # noqa: ARG001
+    """Включает pg_trgm до миграций: на нем построены триграммные индексы."""
+    connection = connections[using]
+    if sender.name == "edu_programs" and connection.vendor == "postgresql":
+        with connection.cursor() as cursor:
+            cursor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+
+
+@receiver(post_migrate)
+def install_search_triggers(sender, using, **kwargs):  # noqa: ARG001
+    """Создает триггеры, поддерживающие `search_vector` в актуальном состоянии."""
+    connection = connections[using]
+    if sender.name != "edu_programs" or connection.vendor != "postgresql":
+        return
+    tables = set(connection.introspection.table_names())
+    with connection.cursor() as cursor:
+        for model in SEARCH_VECTOR_WEIGHTS:
+            if model._meta.db_table not in tables:  # noqa: SLF001
+                continue
+            for sql in search_vector_trigger_sql(model):
+                cursor.execute(sql)
@@ -0,0 +1,254 @@
+"""Индекс похожих образовательных программ.
+
+Сходство двух программ - взвешенная сумма коэффициента Жаккара по профессиональным
+стандартам и косинусной близости TF-IDF векторов названия и профиля (веса в
+`ANALYTICS_CONFIG["SIMILARITY_WEIGHTS"]`). Для каждой программы хранятся только
+`SIMILARITY_TOP_K` самых похожих - в npz файле из плоских массивов, так что запрос
+похожих программ - бинарный поиск строки без обращения к БД.
+
+Признаки программ - разреженные матрицы: у программы несколько стандартов и слов из
+всего каталога. Сходство блока программ со всеми считается произведением разреженных
+матриц и остается разреженным (только пары с общим стандартом или словом), плотные
+массивы - лишь списки `SIMILARITY_TOP_K` лучших.
+
+Программы новых вузов добавляются в индекс `update_index` без полного пересчета:
+считаются только строки новых программ против всех, а их оценки вливаются в списки
+уже проиндексированных программ.
+"""
+
+import re
+import threading
+from collections import Counter
+from typing import NamedTuple
+
+import numpy as np
+from django.conf import settings
+from loguru import logger
+from scipy import sparse
+
+from edu_programs.const import (
+    SIMILARITY_BLOCK_SIZE,
+    SIMILARITY_INDEX_PATH,
+    SIMILARITY_STEM_LENGTH,
+    SIMILARITY_TOP_K,
+)
+from edu_programs.models import Program
+
+
+class SimilarityIndex(NamedTuple):
+    program_ids: np.ndarray  # (n,) отсортированные id программ
+    neighbors: np.ndarray  # (n, k) id похожих программ, -1 - пустая ячейка
+    scores: np.ndarray  # (n, k) сходство, по убыванию
+    vocabulary: np.ndarray  # основы слов TF-IDF
+    idf: np.ndarray
+
+    def similar(self, program_id: int, limit: int = SIMILARITY_TOP_K) -> list[tuple[int, float]]:
+        row = np.searchsorted(self.program_ids, program_id)
+        if row == len(self.program_ids) or self.program_ids[row] != program_id:
+            return []
+        found = self.neighbors[row] >= 0
+        return list(
+            zip(self.neighbors[row][found][:limit].tolist(), self.scores[row][found][:limit].tolist(), strict=True),
+        )
+
+
+class Features(NamedTuple):
+    program_ids: np.ndarray
+    standards: sparse.csr_matrix  # (n, s) матрица инцидентности "программа x стандарт"
+    standard_counts: np.ndarray
+    text: sparse.csr_matrix  # (n, v) нормированные TF-IDF векторы
+
+
+def tokenize(text: str) -> list[str]:
+    return [word[:SIMILARITY_STEM_LENGTH] for word in re.findall(r"\w{3,}", text.lower().replace("ё", "е"))]
+
+
+def load_features(vocabulary: np.ndarray | None = None, idf: np.ndarray | None = None):
+    """Читает признаки всех программ двумя запросами.
+
+    Без `vocabulary` и `idf` словарь и IDF строятся по текущим программам, иначе берутся
+    из индекса, чтобы новые векторы были сопоставимы с уже посчитанными.
+    Возвращает признаки, словарь и IDF.
+    """
+    programs = list(Program.objects.order_by("pk").values_list("pk", "name", "profile"))
+    program_ids = np.array([pk for pk, _, _ in programs], dtype=np.int64)
+    documents = [Counter(tokenize(f"{name} {profile}")) for _, name, profile in programs]
+
+    if vocabulary is None:
+        frequency = Counter(token for document in documents for token in document)
+        vocabulary = np.array(sorted(frequency), dtype=str)
+        df = np.array([frequency[token] for token in vocabulary.tolist()], dtype=np.float32)
+        idf = np.log((1 + len(documents)) / (1 + df)) + 1
+    positions = {token: i for i, token in enumerate(vocabulary.tolist())}
+
+    rows, cols, counts = [], [], []
+    for row, document in enumerate(documents):
+        for token, count in document.items():
+            if token in positions:
+                rows.append(row)
+                cols.append(positions[token])
+                counts.append(count)
+    text = sparse.csr_matrix(
+        (np.array(counts, dtype=np.float32), (rows, cols)),
+        shape=(len(programs), len(vocabulary)),
+        dtype=np.float32,
+    )
+    text.data *= idf[text.indices]
+    norms = np.sqrt(np.asarray(text.multiply(text).sum(axis=1)).ravel())
+    text.data /= np.repeat(norms, np.diff(text.indptr))
+
+    links = np.array(
+        list(Program.professional_standards.through.objects.values_list("program_id", "professionalstandard_id")),
+        dtype=np.int64,
+    ).reshape(-1, 2)
+    standard_ids, cols = np.unique(links[:, 1], return_inverse=True)
+    standards = sparse.csr_matrix(
+        (np.ones(len(links), dtype=np.float32), (np.searchsorted(program_ids, links[:, 0]), cols)),
+        shape=(len(programs), len(standard_ids)),
+        dtype=np.float32,
+    )
+
+    features = Features(program_ids, standards, np.diff(standards.indptr).astype(np.float32), text)
+    return features, vocabulary, idf
+
+
+def block_similarity(features: Features, rows: np.ndarray) -> sparse.csr_matrix:
+    """Сходство программ из строк `rows` со всеми программами, разреженное (len(rows), n).
+
+    Хранятся только положительные оценки; сходство программы с собой не хранится.
+    """
+    weights = settings.ANALYTICS_CONFIG["SIMILARITY_WEIGHTS"]
+
+    shared = (features.standards[rows] @ features.standards.T).tocoo()
+    union = features.standard_counts[rows][shared.row] + features.standard_counts[shared.col] - shared.data
+    jaccard = sparse.csr_matrix((shared.data / union, (shared.row, shared.col)), shape=shared.shape)
+    cosine = features.text[rows] @ features.text.T
+
+    similarity = (weights["standards"] * jaccard + weights["text"] * cosine).tocoo()
+    keep = (similarity.data > 0) & (similarity.col != rows[similarity.row])
+    return sparse.csr_matrix(
+        (similarity.data[keep], (similarity.row[keep], similarity.col[keep])),
+        shape=similarity.shape,
+        dtype=np.float32,
+    )
+
+
+def top_k(scores: sparse.csr_matrix, k: int) -> tuple[np.ndarray, np.ndarray]:
+    """Столбцы и значения `k` наибольших элементов каждой строки по убыванию.
+
+    Если в строке меньше `k` элементов, недостающие столбцы заполняются -1, значения - 0.
+    """
+    positions = np.full((scores.shape[0], k), -1, dtype=np.int64)
+    values = np.zeros((scores.shape[0], k), dtype=np.float32)
+    for row in range(scores.shape[0]):
+        data = scores.data[scores.indptr[row] : scores.indptr[row + 1]]
+        if not len(data):
+            continue
+        best = np.argpartition(-data, k - 1)[:k] if len(data) > k else np.arange(len(data))
+        best = best[np.argsort(-data[best], kind="stable")]
+        positions[row, : len(best)] = scores.indices[scores.indptr[row] + best]
+        values[row, : len(best)] = data[best]
+    return positions, values
+
+
+def nearest(candidate_ids: np.ndarray, scores: sparse.csr_matrix, k: int) -> tuple[np.ndarray, np.ndarray]:
+    """По `k` лучших кандидатов в строке; столбцы `scores` - позиции в `candidate_ids`."""
+    positions, values = top_k(scores, k)
+    return np.where(positions >= 0, candidate_ids[np.maximum(positions, 0)], -1), values
+
+
+def merge_nearest(neighbors: np.ndarray, scores: np.ndarray, more_neighbors: np.ndarray, more_scores: np.ndarray):
+    """Сливает два списка лучших по строкам, оставляя `neighbors.shape[1]` лучших."""
+    k = neighbors.shape[1]
+    merged = np.concatenate([neighbors, more_neighbors], axis=1)
+    merged_scores = np.concatenate([np.where(neighbors >= 0, scores, 0), more_scores], axis=1)
+    order = np.argsort(-merged_scores, axis=1, kind="stable")[:, :k]
+    merged = np.take_along_axis(merged, order, axis=1)
+    merged_scores = np.take_along_axis(merged_scores, order, axis=1)
+    found = merged_scores > 0
+    return np.where(found, merged, -1), np.where(found, merged_scores, 0).astype(np.float32)
+
+
+def build_index(k: int = SIMILARITY_TOP_K) -> SimilarityIndex:
+    features, vocabulary, idf = load_features()
+    n = len(features.program_ids)
+    neighbors = np.full((n, k), -1, dtype=np.int64)
+    scores = np.zeros((n, k), dtype=np.float32)
+
+    for start in range(0, n, SIMILARITY_BLOCK_SIZE):
+        rows = np.arange(start, min(start + SIMILARITY_BLOCK_SIZE, n))
+        neighbors[rows], scores[rows] = nearest(features.program_ids, block_similarity(features, rows), k)
+
+    logger.info(f"Индекс похожих программ построен для {n} программ")
+    return SimilarityIndex(features.program_ids, neighbors, scores, vocabulary, idf)
+
+
+def update_index(index: SimilarityIndex, changed_ids=()) -> SimilarityIndex:
+    """Добавляет в индекс новые программы и пересчитывает `changed_ids`.
+
+    Удаленные и измененные программы вычеркиваются из списков остальных, после чего
+    новые и измененные программы считаются против всех и вливаются в эти списки.
+    Словарь TF-IDF берется из индекса, новые слова учитываются при полной перестройке.
+    """
+    features, _, _ = load_features(index.vocabulary, index.idf)
+    k = index.neighbors.shape[1]
+    current = features.program_ids
+
+    stale = np.union1d(np.setdiff1d(index.program_ids, current), np.asarray(changed_ids, dtype=np.int64))
+    kept_mask = np.isin(index.program_ids, current) & ~np.isin(index.program_ids, stale)
+    kept_ids = index.program_ids[kept_mask]
+    fresh_rows = np.flatnonzero(~np.isin(current, kept_ids))
+    kept_cols = np.searchsorted(current, kept_ids)
+
+    kept_neighbors = index.neighbors[kept_mask]
+    kept_scores = index.scores[kept_mask]
+    dropped = np.isin(kept_neighbors, stale)
+    kept_neighbors[dropped], kept_scores[dropped] = -1, 0
+
+    neighbors = np.full((len(current), k), -1, dtype=np.int64)
+    scores = np.zeros((len(current), k), dtype=np.float32)
+    for start in range(0, len(fresh_rows), SIMILARITY_BLOCK_SIZE):
+        rows = fresh_rows[start : start + SIMILARITY_BLOCK_SIZE]
+        similarity = block_similarity(features, rows)
+        neighbors[rows], scores[rows] = nearest(current, similarity, k)
+        kept_neighbors, kept_scores = merge_nearest(
+            kept_neighbors,
+            kept_scores,
+            *nearest(current[rows], similarity[:, kept_cols].T.tocsr(), k),
+        )
+
+    neighbors[kept_cols], scores[kept_cols] = kept_neighbors, kept_scores
+    logger.info(f"В индекс похожих программ добавлено {len(fresh_rows)}, удалено {len(stale)} программ")
+    return SimilarityIndex(current, neighbors, scores, index.vocabulary, index.idf)
+
+
+def save_index(index: SimilarityIndex, path=SIMILARITY_INDEX_PATH):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(f"{path.name}.tmp")
+    with open(tmp_path, "wb") as file:
+        np.savez(file, **index._asdict())
+    tmp_path.replace(path)
+
+
+def read_index(path=SIMILARITY_INDEX_PATH) -> SimilarityIndex | None:
+    try:
+        with np.load(path) as data:
+            return SimilarityIndex(**{field: data[field] for field in SimilarityIndex._fields})
+    except (OSError, KeyError, ValueError):
+        return None
+
+
+_loaded: dict = {}
+_loaded_lock = threading.Lock()
+
+
+def get_index(path=SIMILARITY_INDEX_PATH) -> SimilarityIndex | None:
+    """Индекс, закэшированный в процессе до следующей перезаписи файла."""
+    try:
+        mtime = path.stat().st_mtime_ns
+    except OSError:
+        return None
+    with _loaded_lock:
+        if _loaded.get("mtime") != mtime:
+            _loaded.update(mtime=mtime, index=read_index(path))
+        return _loaded["index"]
@@ -0,0 +1,74 @@
+"""Источники образовательных программ - сайты вузов.
+
+Источник связывает вуз со сбором листинга программ с его сайта (со скачиванием планов)
+и с разбором плана по тексту страниц. Сбор листинга и разбор документов источника идут
+в его собственную очередь `queue`, которую обслуживает отдельный воркер
+(`manage.py run_source_worker <key>`) с `concurrency` процессами: источники
+масштабируются независимо, и медленный сайт не задерживает остальные.
+
+Чтобы подключить вуз, достаточно написать для него парсеры листинга и плана, добавить
+источник в `SOURCES` и запустить воркер его очереди.
+"""
+
+from collections.abc import Callable, Sequence
+from typing import NamedTuple
+
+from edu_programs.models import University
+from edu_programs.parsers.pdf_parsers import PARSER_VERSION, parse_vsu_pages
+from edu_programs.parsers.web_parsers import extract_vsu_education_programs
+
+
+class UniversitySource(NamedTuple):
+    key: str  # латиницей, входит в имя очереди и файлов кэша
+    name: str
+    abbreviation: str
+    faculties: tuple[tuple[str, str], ...]  # (название, сокращение) факультетов, программы которых загружаются
+    # строки листинга с `file_path` плана и флагом `changed` (None - не скачан), см. extract_vsu_education_programs
+    extract_listing: Callable[..., list[dict]]
+    # поля программы, дисциплины и компетенции по тексту страниц плана, см. parse_vsu_pages
+    parse_pages: Callable[[Sequence[str]], dict | None]
+    parser_version: str
+    concurrency: int = 2  # процессов воркера очереди источника
+
+    @property
+    def queue(self) -> str:
+        return f"source.{self.key}"
+
+    @property
+    def manifest_name(self) -> str:
+        return f"{self.key}_education_programs"
+
+    @property
+    def allowed_faculties(self) -> set[str]:
+        return {name.lower() for name, _ in self.faculties}
+
+    def university(self) -> University:
+        return University.objects.get(abbreviation=self.abbreviation)
+
+
+SOURCES = {
+    source.key: source
+    for source in (
+        UniversitySource(
+            key="vsu",
+            name="Воронежский государственный университет",
+            abbreviation="ВГУ",
+            faculties=(
+                ("Компьютерных наук", "ФКН"),
+                ("Математический", "МатФак"),
+                ("Прикладной математики, информатики и механики", "ПММ"),
+            ),
+            extract_listing=extract_vsu_education_programs,
+            parse_pages=parse_vsu_pages,
+            parser_version=PARSER_VERSION,
+        ),
+    )
+}
+
+
+def get_source(key: str) -> UniversitySource:
+    try:
+        return SOURCES[key]
+    except KeyError:
+        msg = f"Неизвестный источник программ: {key}"
+        raise ValueError(msg) from None
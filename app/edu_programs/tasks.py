@@ -1,198 +1,416 @@
-import fitz  # PyMuPDF
-from celery import chain, shared_task
-from django.core.exceptions import ObjectDoesNotExist
-from django.core.files import File
+from collections.abc import Callable
+from typing import NamedTuple
+
+from celery import chord, group, shared_task
+from celery.exceptions import SoftTimeLimitExceeded
+from core.history import bulk_history, task_change_set
+from django.core.cache import cache
+from django.db import transaction
 from loguru import logger
 
-from edu_programs.const import ALLOWED_FACULTIES
-from edu_programs.models import (
-    EducationGroup,
-    EduDegree,
-    FederalStateEducationStandard,
-    ProfessionalStandard,
-    ProfessionalStandardGroup,
-    Program,
-    University,
+from edu_programs.analytics import refresh_program_scores
+from edu_programs.artifacts import get_or_build_artifact
+from edu_programs.const import (
+    ANALYTICS_REFRESH_DELAY,
+    CACHE_KEY_PREFIX,
+    FGOS_GROUP_MAX_RETRIES,
+    FGOS_GROUP_TIME_LIMIT,
+)
+from edu_programs.ingestion import (
+    SyncResult,
+    backfill_document_hashes,
+    hash_rows,
+    outdated_documents,
+    save_university_programs,
+    skip_known_documents,
+    sync_education_standards,
+    sync_professional_standards,
 )
-from edu_programs.parsers.pdf_parsers import vsu_document_parser
+from edu_programs.models import DocumentArtifact, Program, opop_storage
+from edu_programs.parsers.http_cache import http_cache
 from edu_programs.parsers.web_parsers import (
-    extract_fgos_education_standards,  # парсинг программ с сайта фгос
-    extract_fgos_professional_standards,  # парсинг стандартов с сайта фгос
-    extract_vsu_education_programs,  # парсинг с сайта вгу
+    FGOS_EDUCATION_INNER_CLASS,
+    FGOS_PROFESSIONAL_INNER_CLASS,
+    fgos_all_education_groups,  # каталог образовательных стандартов фгос
+    fgos_group_standards,
+    fgos_professional_groups,  # каталог профессиональных стандартов фгос
 )
+from edu_programs.progress import advance_stage, fail_stage, finish_stage, start_stage
+from edu_programs.similarity import build_index, read_index, save_index, update_index
+from edu_programs.sources import SOURCES, UniversitySource, get_source
+from edu_programs.utils import file_sha256
+
+
+class FgosScrape(NamedTuple):
+    collect_groups: Callable[[], list[dict]]  # группы каталога, каждая разбирается подзадачей
+    inner_class: str
+    sync: Callable[[list[dict]], SyncResult]
+    unchanged: str  # сообщение, если данные на сайте не изменились
+    title: str  # вид стандартов в родительном падеже
+
+
+# Ключ - этап прогресса и имя отпечатка данных в http_cache
+FGOS_SCRAPES = {
+    "fgos_professional_standards": FgosScrape(
+        fgos_professional_groups,
+        FGOS_PROFESSIONAL_INNER_CLASS,
+        sync_professional_standards,
+        "Профессиональные стандарты на сайте ФГОС не изменились",
+        "профессиональных стандартов",
+    ),
+    "fgos_education_standards": FgosScrape(
+        fgos_all_education_groups,
+        FGOS_EDUCATION_INNER_CLASS,
+        sync_education_standards,
+        "Образовательные стандарты на сайте ФГОС не изменились",
+        "образовательных стандартов",
+    ),
+}
+
+
+def program_stages() -> list[str]:
+    return [source.manifest_name for source in SOURCES.values()]
+
 
+def pipeline_stages() -> list[str]:
+    """Этапы прогресса `initial_setup_tasks` в порядке выполнения."""
+    return [*FGOS_SCRAPES, *program_stages()]
 
-def save_professional_standards(standards_df, program):
-    """Связывает профессиональные стандарты с программой."""
-    if standards_df is None or standards_df.empty:
-        return
 
-    for _, row in standards_df.iterrows():
-        code = row["Код"].split(".")
-        group_code, code = code[0], code[1]
-        try:
-            standard = ProfessionalStandard.objects.get(code=code, professional_standard_group__code=group_code)
-            program.professional_standards.add(standard)
-        except ProfessionalStandard.DoesNotExist:
-            logger.warning(f"Профессиональный стандарт с кодом {group_code}.{code} не найден")
+@shared_task
+def fail_stages(request, exc, traceback, run_id: str, stages: list[str]):  # noqa: ARG001
+    """Обработчик ошибки (link_error) задачи этапа: завершает этапы `stages` ошибкой `exc`.
+
+    Без него этап, задача или хорд которого упали, навсегда остается незавершенным.
+    """
+    for stage in stages:
+        fail_stage(run_id, stage, f"{type(exc).__name__}: {exc}")
+
+
+def fan_out_fgos(task, stage: str, run_id: str | None):
+    """Заменяет задачу `task` хордом из разбора групп каталога ФГОС и `save_fgos_standards`.
+
+    Группы разбираются параллельно, стандарты сохраняются одной пачкой, когда разобраны все.
+    """
+    run_id = run_id or task.request.id
+    try:
+        groups = FGOS_SCRAPES[stage].collect_groups()
+    except Exception as e:
+        logger.exception(f"Ошибка при получении каталога ФГОС {stage}: {e}")
+        raise task.retry(exc=e) from None
+
+    start_stage(run_id, stage, len(groups))
+    return task.replace(
+        chord(
+            group(parse_fgos_group.s(stage, item, run_id).set(queue="default") for item in groups),
+            save_fgos_standards.s(stage, run_id).set(queue="default").on_error(fail_stages.s(run_id, [stage])),
+        ),
+    )
 
 
 @shared_task(bind=True)
-def parse_fgos_professional_standards(self):
+def parse_fgos_professional_standards(self, run_id: str | None = None):
     """Создает модели ProfessionalStandard на основе данных с сайта ФГОС."""
-    try:
-        standards_data = extract_fgos_professional_standards()
-
-        created_count = 0
-        for data in standards_data:
-            # Проверяем, существует ли уже стандарт с таким кодом
-            if not (
-                ProfessionalStandard.objects.filter(
-                    code=data["code"],
-                    professional_standard_group__name=data["group_name"],
-                )
-                .select_related("professional_standard_group__name")
-                .exists()
-            ):
-                group, _ = ProfessionalStandardGroup.objects.get_or_create(
-                    code=data["group_code"],
-                    defaults={"name": data["group_name"], "code": data["group_code"]},
-                )
-                ProfessionalStandard.objects.create(
-                    name=data["name"],
-                    professional_standard_group=group,
-                    code=data["code"],
-                )
-                created_count += 1
+    return fan_out_fgos(self, "fgos_professional_standards", run_id)
+
 
+@shared_task(bind=True)
+def parse_fgos_education_standards(self, run_id: str | None = None):
+    """Создает модели FederalStateEducationStandard на основе данных с сайта ФГОС."""
+    return fan_out_fgos(self, "fgos_education_standards", run_id)
+
+
+@shared_task(
+    bind=True,
+    soft_time_limit=FGOS_GROUP_TIME_LIMIT,
+    time_limit=FGOS_GROUP_TIME_LIMIT + 60,
+    max_retries=FGOS_GROUP_MAX_RETRIES,
+)
+def parse_fgos_group(self, stage: str, group_data: dict, run_id: str) -> list[dict] | None:
+    """Разбирает стандарты одной группы каталога ФГОС.
+
+    None, если группа не разобрана за `FGOS_GROUP_TIME_LIMIT` секунд или после повторов:
+    зависшая страница задерживает только свою группу, остальные сохраняются без нее.
+    """
+    try:
+        rows = fgos_group_standards(group_data, FGOS_SCRAPES[stage].inner_class)
+    except SoftTimeLimitExceeded:
+        logger.error(f"Группа ФГОС {group_data['url']} не разобрана за {FGOS_GROUP_TIME_LIMIT} секунд")
+        rows = None
     except Exception as e:
-        logger.exception(f"Ошибка при парсинге профессиональных стандартов: {e}")
-        raise self.retry(exc=e) from None
+        if self.request.retries < self.max_retries:
+            raise self.retry(exc=e) from None
+        logger.exception(f"Ошибка при разборе группы ФГОС {group_data['url']}: {e}")
+        rows = None
+
+    advance_stage(run_id, stage, failed=rows is None)
+    return rows
 
+
+@shared_task(bind=True)
+def save_fgos_standards(self, group_rows: list[list[dict] | None], stage: str, run_id: str) -> str:
+    """Сохраняет стандарты всех разобранных групп одной пачкой.
+
+    Отпечаток данных запоминается, только если разобраны все группы: пропущенные
+    группы загрузятся при следующем запуске.
+    """
+    scrape = FGOS_SCRAPES[stage]
+    standards_data = [row for rows in group_rows if rows is not None for row in rows]
+    skipped = group_rows.count(None)
+
+    if not skipped and not http_cache.fingerprint_changed(stage, standards_data):
+        message = scrape.unchanged
     else:
-        return f"Создано {created_count} профессиональных стандартов"
+        with bulk_history(task_change_set(self)):
+            result = scrape.sync(standards_data)
+        message = f"Создано {result.created}, обновлено {result.updated} {scrape.title}"
+        if skipped:
+            message = f"{message}, не разобрано групп: {skipped}"
+        else:
+            http_cache.remember_fingerprint(stage, standards_data)
+
+    finish_stage(run_id, stage, message)
+    return message
 
 
 @shared_task(bind=True)
-def parse_fgos_education_standards(self):
-    """Создает модели FederalStateEducationStandard на основе данных с сайта ФГОС."""
-    try:
-        standards_data = extract_fgos_education_standards()
-
-        created_count = 0
-        for data in standards_data:
-            # Проверяем, существует ли уже стандарт с таким кодом
-            if not (
-                FederalStateEducationStandard.objects.filter(
-                    code=data["code"],
-                    edu_degree__code=data["degree_code"],
-                    edu_group__code=data["group_code"],
-                )
-                .select_related("edu_degree__code", "edu_group__code")
-                .exists()
-            ):
-                edu_group, _ = EducationGroup.objects.get_or_create(
-                    code=data["group_code"],
-                    defaults={"name": data["group_name"], "code": data["group_code"]},
-                )
-                edu_degree = EduDegree.objects.get(code=data["degree_code"])
-                FederalStateEducationStandard.objects.create(
-                    name=data["name"],
-                    edu_group=edu_group,
-                    edu_degree=edu_degree,
-                    code=data["code"],
-                )
-                created_count += 1
+def parse_university_programs(self, source_key: str, run_id: str | None = None):
+    """Собирает планы с сайта вуза и отправляет их на разбор в очередь источника.
+
+    Каждый PDF разбирается отдельной подзадачей, программы создаются одной пачкой
+    в `save_university_programs_task`, когда разобраны все документы. На разбор идут только
+    новые и измененные планы, поэтому программа, план которой заменен на сайте, обновляется
+    на месте вместе с хэшем документа и дисциплинами.
+    """
+    source = get_source(source_key)
+    run_id = run_id or self.request.id
+    programs_data = source.extract_listing(download=True)
+    # строки с нескачавшимся планом не входят в отпечаток: когда план скачается, отпечаток
+    # изменится, и строка будет обработана
+    failed = [data for data in programs_data if data["changed"] is None]
+    if failed:
+        logger.warning(f"Не скачано планов {source.abbreviation}: {len(failed)}")
+    listing = [
+        {**{key: value for key, value in data.items() if key != "changed"}, "file_path": str(data["file_path"])}
+        for data in programs_data
+        if data["changed"] is not None
+    ]
+    http_cache.remember_manifest(source.manifest_name, listing)
+    if not http_cache.fingerprint_changed(source.manifest_name, listing) and not any(
+        data["changed"] for data in programs_data
+    ):
+        message = f"Образовательные программы на сайте {source.abbreviation} не изменились"
+        finish_stage(run_id, source.manifest_name, message)
+        return message
+
+    backfill_document_hashes()
+    rows = skip_known_documents(listing)
+    if not rows:
+        http_cache.remember_fingerprint(source.manifest_name, listing)
+        message = f"Все документы {source.abbreviation} уже загружены"
+        finish_stage(run_id, source.manifest_name, message)
+        return message
 
+    start_stage(run_id, source.manifest_name, len(rows))
+    chord(
+        group(extract_program_document.s(source_key, row, run_id=run_id).set(queue=source.queue) for row in rows),
+        save_university_programs_task.s(source_key, listing=listing, update_existing=True, run_id=run_id)
+        .set(queue="default")
+        .on_error(fail_stages.s(run_id, [source.manifest_name])),
+    ).apply_async()
+
+    return f"Отправлено на разбор {len(rows)} новых или измененных документов из {len(listing)}"
+
+
+@shared_task(bind=True)
+def parse_all_university_programs(self, run_id: str | None = None):
+    """Запускает сбор программ всех источников, каждого - в его очереди."""
+    run_id = run_id or self.request.id
+    for source in SOURCES.values():
+        parse_university_programs.apply_async(
+            (source.key, run_id),
+            queue=source.queue,
+            link_error=fail_stages.s(run_id, [source.manifest_name]),
+        )
+    return f"Запущен сбор программ {len(SOURCES)} вузов"
+
+
+def parse_program_document(source: UniversitySource, data: dict) -> dict | None:
+    """Разбирает план одной программы парсером источника по тексту страниц из `DocumentArtifact`.
+
+    PDF открывается, только если данных этого файла еще нет.
+    """
+    try:
+        document_hash = data.get("document_hash") or file_sha256(data["file_path"])
+        artifact = get_or_build_artifact(document_hash, data["file_path"])
+        parsed = source.parse_pages(artifact.page_texts)
     except Exception as e:
-        logger.exception(f"Ошибка при парсинге образовательных стандартов: {e}")
-        raise self.retry(exc=e) from None
+        logger.exception(f"Ошибка при разборе документа {data['file_path']}: {e}")
+        return None
+    if parsed is None:
+        logger.info(f"{data['file_path']} | нет текста на странице")
+        return None
+    return {**data, **parsed, "parser_version": source.parser_version}
+
+
+@shared_task
+def extract_program_document(source_key: str, data: dict, run_id: str | None = None) -> dict | None:
+    source = get_source(source_key)
+    parsed = parse_program_document(source, data)
+    if run_id:
+        advance_stage(run_id, source.manifest_name, failed=parsed is None)
+    return parsed
+
+
+@shared_task
+def build_document_artifact(document_hash: str, file_path: str):
+    """Извлекает текст страниц, превью и число страниц документа, если их еще нет."""
+    artifact = get_or_build_artifact(document_hash, file_path)
+    return f"Документ {document_hash}: {artifact.page_count} страниц"
 
-    else:
-        return f"Создано {created_count} образовательных стандартов"
+
+@shared_task
+def build_missing_document_artifacts():
+    """Ставит в очередь documents извлечение данных документов программ, для которых их еще нет."""
+    documents = dict(
+        Program.objects.exclude(document="")
+        .exclude(document_hash="")
+        .exclude(document_hash__in=DocumentArtifact.objects.values("pk"))
+        .values_list("document_hash", "document"),
+    )
+    for document_hash, name in documents.items():
+        build_document_artifact.apply_async((document_hash, opop_storage.path(name)), queue="documents")
+    return f"Отправлено на извлечение {len(documents)} документов"
 
 
 @shared_task(bind=True)
-def parse_vsu_education_programs(self):  # noqa: ARG001
-    """Создает модели Program на основе данных с сайта ВУЗа."""
-    programs_data = extract_vsu_education_programs(download=True)
-    university = University.objects.get(abbreviation="ВГУ")
-
-    created_count = 0
-
-    for data in programs_data:
-        # Проверяем, существует ли уже программа с такими же данными
-        try:
-            with fitz.open(data["file_path"]) as doc:
-                page_text = doc[0].get_text(sort=True)
-                if not page_text:
-                    logger.info(f"{data['file_path']} | нет текста на странице")
-                    continue
-                document_parse_data = vsu_document_parser(page_text, university)
-
-            if "faculty" not in document_parse_data:
-                logger.warning(f"Факультет не найден | {data['file_path'].stem}")
-                continue
-
-            if document_parse_data["faculty"].name.lower() not in ALLOWED_FACULTIES:
-                continue
-
-            if not (
-                Program.objects.filter(
-                    code=data["code"],
-                    edu_degree__code=data["degree_code"],
-                    edu_group__code=data["group_code"],
-                    profile=data.get("profile", ""),
-                    approval_year=int(data.get("year")),
-                    faculty__name=document_parse_data["faculty"],
-                )
-                .select_related("edu_degree__code", "edu_group__code")
-                .exists()
-            ) and data.get("file_path"):
-                # data["file_path"].unlink()  # noqa: ERA001
-
-                try:
-                    edu_group = EducationGroup.objects.get(code=data["group_code"])
-                except ObjectDoesNotExist:
-                    logger.warning(f"Общая группа ОП - {data['group_code']} - отсутствует в базе")
-                    continue
-                edu_degree = EduDegree.objects.get(code=data["degree_code"])
-
-                with open(data["file_path"], "rb") as f:
-                    program = Program.objects.create(
-                        name=data["name"],
-                        edu_group=edu_group,
-                        edu_degree=edu_degree,
-                        code=data["code"],
-                        university=university,
-                        profile=data.get("profile", ""),
-                        approval_year=data.get("year"),
-                        document=File(f, name=data["file_path"].name),
-                        faculty=document_parse_data["faculty"],
-                    )
-                created_count += 1
-
-                # Сохраняем связанные проф.стандарты
-                save_professional_standards(document_parse_data["professional_standards"], program)
-
-                program.save()
-
-        except Exception as e:
-            logger.exception(f"Ошибка при парсинге образовательных программ: {e}")
-            continue
-
-    return f"Создано {created_count} образовательных программ"
+def save_university_programs_task(
+    self,
+    parsed_documents: list[dict | None],
+    source_key: str,
+    listing: list[dict],
+    update_existing=False,
+    run_id: str | None = None,
+):
+    """Создает модели Program вуза по результатам разбора документов одной пачкой.
+
+    С `update_existing` существующие программы обновляются разобранными заново данными.
+    """
+    source = get_source(source_key)
+    with bulk_history(task_change_set(self)):
+        result = save_university_programs(
+            [data for data in parsed_documents if data is not None],
+            source.university(),
+            source.allowed_faculties,
+            update_existing=update_existing,
+        )
+
+    http_cache.remember_fingerprint(source.manifest_name, listing)
+    if result.created or result.updated:
+        schedule_program_scores_refresh()
+    if result.updated:
+        build_similarity_index.apply_async(queue="default")
+    elif result.created:
+        update_similarity_index.apply_async(queue="default")
+
+    message = f"Создано {result.created}, обновлено {result.updated} образовательных программ {source.abbreviation}"
+    if run_id:
+        finish_stage(run_id, source.manifest_name, message)
+    return message
+
+
+def reprocess_rows(source: UniversitySource, force=False) -> tuple[list[dict], list[dict]]:
+    """Манифест последнего обхода сайта вуза и его строки, документы которых нужно разобрать заново."""
+    listing = http_cache.load_manifest(source.manifest_name) or []
+    rows = hash_rows(listing) if force else outdated_documents(listing, source.parser_version)
+    return listing, rows
+
+
+@shared_task
+def reprocess_university_programs(source_key: str, force=False):
+    """Разбирает заново уже скачанные планы вуза, не обращаясь к сайту.
+
+    Список программ берется из манифеста последнего обхода, текст страниц - из
+    `DocumentArtifact`. Разбираются только документы, разобранные прежней версией
+    парсера источника (с `force` - все), существующие программы обновляются на месте.
+    """
+    source = get_source(source_key)
+    listing, rows = reprocess_rows(source, force)
+    if not listing:
+        return f"Нет сохраненного списка программ {source.abbreviation}, сначала запустите parse_university_programs"
+    if not rows:
+        return f"Все документы {source.abbreviation} разобраны текущей версией парсера"
+
+    chord(
+        group(extract_program_document.s(source_key, row).set(queue=source.queue) for row in rows),
+        save_university_programs_task.s(source_key, listing=listing, update_existing=True).set(queue="default"),
+    ).apply_async()
+    return f"Отправлено на повторный разбор {len(rows)} документов из {len(listing)}"
+
+
+@shared_task
+def refresh_program_scores_task():
+    """Пересчитывает оценки востребованности и уникальности программ."""
+    cache.delete(f"{CACHE_KEY_PREFIX}:program-scores-scheduled")
+    return f"Обновлено {refresh_program_scores()} оценок образовательных программ"
+
+
+@shared_task
+def build_similarity_index():
+    """Полностью перестраивает индекс похожих программ."""
+    index = build_index()
+    save_index(index)
+    return f"Индекс похожих программ построен для {len(index.program_ids)} программ"
+
+
+@shared_task
+def update_similarity_index(changed_ids: list[int] | None = None):
+    """Добавляет в индекс похожих программ новые программы и пересчитывает `changed_ids`."""
+    index = read_index()
+    if index is None:
+        return build_similarity_index()
+    index = update_index(index, changed_ids or ())
+    save_index(index)
+    return f"Индекс похожих программ обновлен, программ в индексе: {len(index.program_ids)}"
+
+
+def schedule_program_scores_refresh():
+    """Ставит пересчет оценок после коммита, не чаще раза в `ANALYTICS_REFRESH_DELAY` секунд.
+
+    Изменения, сделанные до запуска уже поставленной задачи, попадут в ее расчет.
+    """
+
+    def schedule():
+        if cache.add(f"{CACHE_KEY_PREFIX}:program-scores-scheduled", 1, timeout=ANALYTICS_REFRESH_DELAY * 2):
+            refresh_program_scores_task.apply_async(countdown=ANALYTICS_REFRESH_DELAY, queue="default")
+
+    transaction.on_commit(schedule)
 
 
 @shared_task(bind=True)
 def initial_setup_tasks(self):
-    """Выполняет все задачи сбора данных последовательно."""
+    """Запускает все задачи сбора данных.
+
+    Стандарты ФГОС двух видов собираются параллельно, каждая группа каталога - своей
+    подзадачей; программы вузов собираются, когда сохранены оба вида стандартов.
+    Прогресс этапов - `get_progress(<id этой задачи>, pipeline_stages())`. Упавший этап
+    завершается ошибкой; если не сохранены стандарты, ошибкой завершаются и этапы вузов.
+    """
+    run_id = self.request.id
     try:
-        chain(
-            parse_fgos_professional_standards.s(),
-            parse_fgos_education_standards.s(),
-            parse_vsu_education_programs.s(),
-        ).apply_async(queue="default")
+        chord(
+            group(
+                parse_fgos_professional_standards.si(run_id)
+                .set(queue="default")
+                .on_error(fail_stages.s(run_id, ["fgos_professional_standards"])),
+                parse_fgos_education_standards.si(run_id)
+                .set(queue="default")
+                .on_error(fail_stages.s(run_id, ["fgos_education_standards"])),
+            ),
+            parse_all_university_programs.si(run_id)
+            .set(queue="default")
+            .on_error(fail_stages.s(run_id, program_stages())),
+        ).apply_async()
     except Exception as e:
         logger.exception(f"Ошибка при выполнении начальных задач: {e}")
         raise self.retry(exc=e) from None
@@ -201,6 +419,7 @@ def initial_setup_tasks(self):
 
 
 # Порядок запуска
-# 1) parse_fgos_professional_standards
-# 2) parse_fgos_education_standards
-# 3) parse_vsu_education_programs
+# 1) параллельно parse_fgos_professional_standards и parse_fgos_education_standards:
+#    каталог -> parse_fgos_group на каждую группу -> save_fgos_standards
+# 2) parse_all_university_programs - parse_university_programs каждого источника в его очереди:
+#    листинг -> extract_program_document на каждый документ -> save_university_programs_task
@@ -0,0 +1,77 @@
+import pytest
+from django.core.cache import cache
+from rest_framework.test import APIClient
+
+from edu_programs.models import (
+    EducationGroup,
+    EduDegree,
+    Faculty,
+    FederalStateEducationStandard,
+    ProfessionalStandard,
+    ProfessionalStandardGroup,
+    Program,
+    University,
+)
+
+
+@pytest.fixture(autouse=True)
+def _clear_cache():
+    cache.clear()
+    yield
+    cache.clear()
+
+
+@pytest.fixture()
+def api_client(django_user_model):
+    client = APIClient()
+    client.force_authenticate(django_user_model.objects.create(username="api"))
+    return client
+
+
+@pytest.fixture()
+def make_catalog():
+    """Создает `count` программ, профессиональных и образовательных стандартов.
+
+    Каждая программа связана с двумя профессиональными стандартами.
+    """
+
+    def make(count: int):
+        university = University.objects.create(name="Воронежский государственный университет", abbreviation="ВГУ")
+        faculty = Faculty.objects.create(university=university, name="Компьютерных наук", abbreviation="ФКН")
+        edu_group = EducationGroup.objects.create(code="09", name="Информатика и вычислительная техника")
+        edu_degree = EduDegree.objects.create(code="03", name="бакалавриат")
+        standard_group = ProfessionalStandardGroup.objects.create(code="06", name="Связь")
+
+        standards = ProfessionalStandard.objects.bulk_create(
+            ProfessionalStandard(name=f"Стандарт {i}", professional_standard_group=standard_group, code=f"{i:03d}")
+            for i in range(count)
+        )
+        FederalStateEducationStandard.objects.bulk_create(
+            FederalStateEducationStandard(
+                name=f"Направление {i}", edu_group=edu_group, edu_degree=edu_degree, code=f"{i:02d}"
+            )
+            for i in range(count)
+        )
+        programs = Program.objects.bulk_create(
+            Program(
+                name=f"Программа {i}",
+                edu_group=edu_group,
+                edu_degree=edu_degree,
+                code="01",
+                university=university,
+                faculty=faculty,
+                profile=f"Профиль {i}",
+                approval_year=2024,
+                document=f"opop_documents/plan{i}.pdf",
+            )
+            for i in range(count)
+        )
+        through = Program.professional_standards.through
+        through.objects.bulk_create(
+            through(program_id=program.pk, professionalstandard_id=standard.pk)
+            for i, program in enumerate(programs)
+            for standard in (standards[i], standards[(i + 1) % count])
+        )
+        return programs
+
+    return make
@@ -0,0 +1,72 @@
+import pytest
+from django.db.models import F, Value
+from rest_framework import status
+
+from edu_programs.admin import ProgramAdmin
+from edu_programs.models import Discipline, Faculty, University
+from edu_programs.search import RANK_ORDERING
+
+
+pytestmark = pytest.mark.django_db
+
+PROGRAM_CHANGELIST = "/admin/edu_programs/program/"
+
+# Запросов к БД на страницу списка в админке (вместе с сессией, пользователем и подсчетами):
+# не зависит от числа строк на странице
+CHANGELIST_QUERIES = {
+    PROGRAM_CHANGELIST: 10,
+    "/admin/edu_programs/professionalstandard/": 8,
+    "/admin/edu_programs/federalstateeducationstandard/": 9,
+    "/admin/edu_programs/faculty/": 8,
+    "/admin/edu_programs/discipline/": 7,
+}
+
+
+def reversed_rank_search(query, queryset):  # noqa: ARG001
+    """Поиск, ранжирующий выше созданные позже: порядок отличается от сортировки списка по умолчанию."""
+    return queryset.annotate(rank=F("pk"), similarity=Value(0.0)).order_by(*RANK_ORDERING)
+
+
+@pytest.fixture()
+def _rank_by_reversed_pk(monkeypatch):
+    monkeypatch.setattr(ProgramAdmin, "search_function", staticmethod(reversed_rank_search))
+
+
+@pytest.mark.usefixtures("_rank_by_reversed_pk")
+def test_program_search_keeps_relevance_order(admin_client, make_catalog):
+    programs = make_catalog(5)
+
+    response = admin_client.get(PROGRAM_CHANGELIST, {"q": "программа"})
+
+    assert [program.pk for program in response.context["cl"].result_list] == [program.pk for program in programs][::-1]
+
+
+@pytest.mark.usefixtures("_rank_by_reversed_pk")
+def test_program_search_follows_selected_column_order(admin_client, make_catalog):
+    make_catalog(5)
+    name_column = ProgramAdmin.list_display.index("name") + 1  # колонка 0 - выбор строк для действий
+
+    response = admin_client.get(PROGRAM_CHANGELIST, {"q": "программа", "o": str(name_column)})
+
+    names = [program.name for program in response.context["cl"].result_list]
+    assert names == sorted(names)
+
+
+@pytest.mark.parametrize("rows", [10, 100])
+@pytest.mark.parametrize(("url", "queries"), CHANGELIST_QUERIES.items())
+def test_changelist_query_count(admin_client, make_catalog, django_assert_num_queries, url, queries, rows):
+    programs = make_catalog(rows)
+    university = University.objects.get()
+    Faculty.objects.bulk_create(
+        Faculty(university=university, name=f"Факультет {i}", abbreviation=f"Ф{i}") for i in range(rows - 1)
+    )
+    Discipline.objects.bulk_create(
+        Discipline(program=program, index=f"Б1.О.{i}", name=f"Дисциплина {i}", competencies="УК-1")
+        for i, program in enumerate(programs)
+    )
+
+    with django_assert_num_queries(queries):
+        response = admin_client.get(url)
+
+    assert response.status_code == status.HTTP_200_OK
+    assert len(response.context["cl"].result_list) == rows
@@ -0,0 +1,49 @@
+import pytest
+from rest_framework import status
+
+
+pytestmark = pytest.mark.django_db
+
+CATALOG_SIZE = 100
+
+# Запросов к БД на страницу списка: не зависит от размера страницы
+LIST_QUERY_LIMITS = {
+    "/api/programs/": 2,  # программы со справочниками + профессиональные стандарты страницы
+    "/api/professional-standards/": 1,
+    "/api/education-standards/": 1,
+}
+
+
+@pytest.mark.parametrize("page_size", [10, CATALOG_SIZE])
+@pytest.mark.parametrize(("url", "max_queries"), LIST_QUERY_LIMITS.items())
+def test_list_page_query_count(api_client, make_catalog, django_assert_max_num_queries, url, max_queries, page_size):
+    make_catalog(CATALOG_SIZE)
+
+    with django_assert_max_num_queries(max_queries):
+        response = api_client.get(url, {"page_size": page_size})
+
+    assert response.status_code == status.HTTP_200_OK
+    assert len(response.data["results"]) == page_size
+
+
+@pytest.mark.parametrize("page_size", [10, CATALOG_SIZE])
+def test_program_list_without_standards_skips_prefetch(
+    api_client, make_catalog, django_assert_max_num_queries, page_size
+):
+    make_catalog(CATALOG_SIZE)
+
+    with django_assert_max_num_queries(1):
+        response = api_client.get("/api/programs/", {"page_size": page_size, "fields": "id,name,full_code"})
+
+    assert response.status_code == status.HTTP_200_OK
+    assert len(response.data["results"]) == page_size
+
+
+def test_cached_list_page_skips_database(api_client, make_catalog, django_assert_num_queries):
+    make_catalog(10)
+    api_client.get("/api/programs/")
+
+    with django_assert_num_queries(0):
+        response = api_client.get("/api/programs/")
+
+    assert response.status_code == status.HTTP_200_OK
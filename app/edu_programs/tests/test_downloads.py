@@ -0,0 +1,36 @@
+import pytest
+
+from edu_programs.downloads import RangeNotSatisfiable, parse_range
+
+
+@pytest.mark.parametrize(
+    ("header", "size", "expected"),
+    [
+        ("bytes=0-99", 1000, (0, 99)),
+        ("bytes=500-", 1000, (500, 999)),
+        ("bytes=900-2000", 1000, (900, 999)),
+        ("bytes=-100", 1000, (900, 999)),
+        ("bytes=-2000", 1000, (0, 999)),
+        ("bytes=0-0,5-9", 1000, None),
+        ("items=0-9", 1000, None),
+        ("bytes=9-0", 1000, None),
+        ("bytes=-", 1000, None),
+    ],
+)
+def test_parse_range(header, size, expected):
+    assert parse_range(header, size) == expected
+
+
+@pytest.mark.parametrize(
+    ("header", "size"),
+    [
+        ("bytes=1000-", 1000),
+        ("bytes=-0", 1000),
+        ("bytes=0-", 0),
+        ("bytes=-5", 0),
+        ("bytes=0-9", 0),
+    ],
+)
+def test_parse_range_not_satisfiable(header, size):
+    with pytest.raises(RangeNotSatisfiable):
+        parse_range(header, size)
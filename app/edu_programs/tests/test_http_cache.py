@@ -0,0 +1,48 @@
+import io
+
+import pytest
+import requests
+
+from edu_programs import tasks
+from edu_programs.parsers.http_cache import HttpCache, http_cache
+from edu_programs.parsers.http_client import fetcher
+
+
+URL = "https://fgosvo.ru/docs/index/2"
+
+
+def fake_response(status_code: int, content: bytes = b"") -> requests.Response:
+    response = requests.Response()
+    response.status_code = status_code
+    response._content = content  # noqa: SLF001
+    response.raw = io.BytesIO(content)
+    return response
+
+
+def respond_with(monkeypatch, response: requests.Response | None):
+    monkeypatch.setattr(fetcher, "request", lambda *args, **kwargs: response)  # noqa: ARG005
+
+
+def test_get_raises_without_response(monkeypatch, tmp_path):
+    respond_with(monkeypatch, None)
+
+    with pytest.raises(requests.ConnectionError):
+        HttpCache(tmp_path).get(URL)
+
+
+def test_get_raises_on_error_status(monkeypatch, tmp_path):
+    respond_with(monkeypatch, fake_response(503, b"<html>Service Unavailable</html>"))
+
+    with pytest.raises(requests.HTTPError):
+        HttpCache(tmp_path).get(URL)
+    assert not list(tmp_path.iterdir())
+
+
+def test_fgos_group_with_error_page_is_skipped(monkeypatch, tmp_path):
+    monkeypatch.setattr(http_cache, "directory", tmp_path)
+    monkeypatch.setattr(tasks.parse_fgos_group, "max_retries", 0)
+    respond_with(monkeypatch, fake_response(503, b"<html>Service Unavailable</html>"))
+
+    rows = tasks.parse_fgos_group.apply(args=("fgos_professional_standards", {"url": URL}, "run")).get()
+
+    assert rows is None
@@ -0,0 +1,46 @@
+import pytest
+from django.core.management import CommandError, call_command
+
+from edu_programs import tasks
+from edu_programs.progress import fail_stage, finish_stage, get_progress
+
+
+pytestmark = pytest.mark.django_db
+
+STAGE = "fgos_professional_standards"
+
+
+def failing_sync(standards_data):  # noqa: ARG001
+    msg = "БД недоступна"
+    raise RuntimeError(msg)
+
+
+def test_failed_save_finishes_stage_with_error(monkeypatch):
+    scrape = tasks.FGOS_SCRAPES[STAGE]
+    monkeypatch.setitem(
+        tasks.FGOS_SCRAPES,
+        STAGE,
+        scrape._replace(collect_groups=lambda: [{"url": "https://fgosvo.ru/group"}], sync=failing_sync),
+    )
+    monkeypatch.setattr(tasks, "fgos_group_standards", lambda *_: [{"code": "001"}])
+
+    tasks.parse_fgos_professional_standards.apply(args=("run",))
+
+    state = get_progress("run", [STAGE])[STAGE]
+    assert state["error"]
+    assert state["result"] == "Ошибка: RuntimeError: БД недоступна"
+
+
+def test_follow_exits_with_error_on_failed_stage():
+    stages = tasks.pipeline_stages()
+    for stage in stages[1:]:
+        finish_stage("run", stage, "готово")
+    fail_stage("run", stages[0], "RuntimeError")
+
+    with pytest.raises(CommandError, match=stages[0]):
+        call_command("initial_setup", run_id="run", interval=0)
+
+
+def test_follow_stops_after_timeout():
+    with pytest.raises(CommandError, match="did not finish"):
+        call_command("initial_setup", run_id="run", interval=0, timeout=0)
@@ -0,0 +1,37 @@
+import numpy as np
+import pytest
+
+from edu_programs.models import Program
+from edu_programs.similarity import build_index, update_index
+
+
+pytestmark = pytest.mark.django_db
+
+
+def test_update_index_matches_full_build(make_catalog):
+    programs = make_catalog(30)
+    added = programs[20:]
+    Program.objects.filter(pk__in=[program.pk for program in added]).delete()
+    previous = build_index(k=5)
+    Program.objects.bulk_create(added)
+    Program.professional_standards.through.objects.bulk_create(
+        Program.professional_standards.through(program_id=program.pk, professionalstandard_id=standard_id)
+        for program in added
+        for standard_id in (program.pk, program.pk % 30 + 1)
+    )
+
+    updated = update_index(previous, changed_ids=[programs[0].pk])
+    full = build_index(k=5)
+
+    assert np.array_equal(updated.program_ids, full.program_ids)
+    assert np.allclose(np.sort(updated.scores, axis=1), np.sort(full.scores, axis=1))
+
+
+def test_similar_programs_share_standards(make_catalog):
+    programs = make_catalog(10)
+    index = build_index(k=5)
+
+    similar = [program_id for program_id, _ in index.similar(programs[0].pk, limit=2)]
+
+    # программа 0 делит стандарты с программами 1 и 9 (см. make_catalog)
+    assert sorted(similar) == sorted([programs[1].pk, programs[9].pk])
@@ -0,0 +1,20 @@
+from django.urls import path
+from rest_framework.routers import DefaultRouter
+
+from edu_programs.views import (
+    FederalStateEducationStandardViewSet,
+    ProfessionalStandardViewSet,
+    ProgramViewSet,
+    SearchView,
+)
+
+
+router = DefaultRouter()
+router.register("programs", ProgramViewSet, basename="program")
+router.register("professional-standards", ProfessionalStandardViewSet, basename="professional-standard")
+router.register("education-standards", FederalStateEducationStandardViewSet, basename="education-standard")
+
+urlpatterns = [
+    path("search/", SearchView.as_view(), name="search"),
+    *router.urls,
+]
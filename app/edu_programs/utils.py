@@ -0,0 +1,10 @@
+import hashlib
+from pathlib import Path
+
+
+def file_sha256(file_path: Path | str, chunk_size: int = 1024 * 1024) -> str:
+    sha256 = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        while chunk := f.read(chunk_size):
+            sha256.update(chunk)
+    return sha256.hexdigest()
@@ -0,0 +1,242 @@
+from core.negotiation import IgnoreClientContentNegotiation
+from core.pagination import KeysetPagination
+from django.db.models import Prefetch
+from django.http import StreamingHttpResponse
+from django.shortcuts import get_object_or_404
+from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
+from rest_framework.generics import GenericAPIView
+from rest_framework.response import Response
+from rest_framework.viewsets import ReadOnlyModelViewSet
+
+from edu_programs.cache import get_or_set
+from edu_programs.const import SEARCH_RESULTS_LIMIT, SEARCH_RESULTS_MAX, SIMILARITY_TOP_K
+from edu_programs.downloads import serve_document
+from edu_programs.export import EXPORT_CONTENT_TYPES, stream_export
+from edu_programs.filters import FederalStateEducationStandardFilter, ProfessionalStandardFilter, ProgramFilter
+from edu_programs.models import (
+    Competency,
+    Discipline,
+    EducationGroup,
+    EduDegree,
+    Faculty,
+    FederalStateEducationStandard,
+    ProfessionalStandard,
+    ProfessionalStandardGroup,
+    Program,
+    ProgramScore,
+    University,
+)
+from edu_programs.search import search_professional_standards, search_programs
+from edu_programs.serializers import (
+    FederalStateEducationStandardSerializer,
+    ProfessionalStandardSerializer,
+    ProgramDetailSerializer,
+    ProgramSerializer,
+    SearchResultsSerializer,
+    SimilarProgramSerializer,
+)
+from edu_programs.similarity import get_index
+
+
+PROGRAM_CACHE_MODELS = (
+    Program,
+    EducationGroup,
+    EduDegree,
+    University,
+    Faculty,
+    ProfessionalStandard,
+    ProfessionalStandardGroup,
+    Discipline,
+    Competency,
+    ProgramScore,
+)
+
+
+def query_limit(request, default: int, maximum: int) -> int:
+    try:
+        return max(1, min(int(request.query_params.get("limit", default)), maximum))
+    except ValueError:
+        return default
+
+
+def program_queryset():
+    return Program.objects.select_related("edu_group", "edu_degree", "university", "faculty", "score")
+
+
+def professional_standards_prefetch():
+    return Prefetch(
+        "professional_standards",
+        queryset=ProfessionalStandard.objects.select_related("professional_standard_group"),
+    )
+
+
+class SparseFieldsViewMixin:
+    def requested_fields(self) -> set[str] | None:
+        requested = self.request.query_params.get("fields")
+        return {name.strip() for name in requested.split(",")} if requested else None
+
+    def wants(self, field: str) -> bool:
+        requested = self.requested_fields()
+        return requested is None or field in requested
+
+
+class CachedResponseMixin:
+    """Отдает list/retrieve из кэша, пока не изменились модели из `cache_models`.
+
+    Права доступа проверяются до обращения к кэшу, ответ не зависит от пользователя.
+    """
+
+    cache_models = ()
+
+    def cached_response(self, action):
+        data = get_or_set(
+            f"{self.basename}-{self.action}",
+            self.cache_models,
+            (self.request.get_host(), self.request.get_full_path()),
+            lambda: action().data,
+        )
+        return Response(data)
+
+    def list(self, request, *args, **kwargs):
+        return self.cached_response(lambda: super(CachedResponseMixin, self).list(request, *args, **kwargs))
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.cached_response(lambda: super(CachedResponseMixin, self).retrieve(request, *args, **kwargs))
+
+
+class ProgramViewSet(CachedResponseMixin, SparseFieldsViewMixin, ReadOnlyModelViewSet):
+    """PUBLIC METHOD.
+
+    DESCRIPTION: Образовательные программы вузов. Поддерживает `?fields=` и фильтры.
+    Страница списка - постоянное число запросов: основной и по одному на каждую
+    запрошенную связь многие-ко-многим.
+    """
+
+    pagination_class = KeysetPagination
+    filterset_class = ProgramFilter
+    cache_models = PROGRAM_CACHE_MODELS
+
+    def get_serializer_class(self):
+        if self.action == "similar":
+            return SimilarProgramSerializer
+        return ProgramDetailSerializer if self.action == "retrieve" else ProgramSerializer
+
+    def get_queryset(self):
+        queryset = program_queryset()
+        # у вложенного сериализатора `similar` параметр `?fields=` не действует
+        if self.action == "similar" or self.wants("professional_standards"):
+            queryset = queryset.prefetch_related(professional_standards_prefetch())
+        if self.action == "retrieve":
+            queryset = queryset.prefetch_related(
+                *(field for field in ("disciplines", "competencies") if self.wants(field)),
+            )
+        return queryset
+
+    @action(detail=True)
+    def similar(self, request, pk=None):
+        """PUBLIC METHOD.
+
+        DESCRIPTION: Самые похожие программы по профессиональным стандартам, названию и профилю.
+        Берутся из предрассчитанного индекса. `?limit=` - число программ, `?university=` - только
+        программы указанного вуза.
+        """
+        program = get_object_or_404(Program.objects.only("pk"), pk=pk)
+        index = get_index()
+        limit = query_limit(request, SIMILARITY_TOP_K, SIMILARITY_TOP_K)
+        neighbors = index.similar(program.pk) if index is not None else []
+
+        programs = self.get_queryset().filter(pk__in=[neighbor_id for neighbor_id, _ in neighbors])
+        if university := request.query_params.get("university"):
+            programs = programs.filter(university__abbreviation=university)
+        programs = {item.pk: item for item in programs}
+
+        results = [
+            {"score": score, "program": programs[neighbor_id]}
+            for neighbor_id, score in neighbors
+            if neighbor_id in programs
+        ][:limit]
+        return Response(self.get_serializer(results, many=True).data)
+
+    @action(detail=True, content_negotiation_class=IgnoreClientContentNegotiation)
+    def document(self, request, pk=None):
+        """PUBLIC METHOD.
+
+        DESCRIPTION: PDF документ ОПОП программы. Поддерживает Range (частичная загрузка),
+        If-None-Match (304 без передачи файла) и отдачу через nginx X-Accel-Redirect.
+        """
+        program = get_object_or_404(Program.objects.only("pk", "document", "document_hash"), pk=pk)
+        return serve_document(request, program)
+
+    @action(detail=False, content_negotiation_class=IgnoreClientContentNegotiation)
+    def export(self, request):
+        """PUBLIC METHOD.
+
+        DESCRIPTION: Выгрузка программ с профессиональными стандартами, по строке на пару
+        "программа - стандарт". `?file_format=csv|xlsx`, фильтры те же, что у списка программ.
+        Файл отдается потоком, не собираясь в памяти.
+        """
+        file_format = request.query_params.get("file_format", "csv")
+        if file_format not in EXPORT_CONTENT_TYPES:
+            raise ValidationError({"file_format": f"Допустимые форматы: {', '.join(EXPORT_CONTENT_TYPES)}"})
+
+        queryset = self.filter_queryset(Program.objects.all())
+        response = StreamingHttpResponse(
+            stream_export(file_format, queryset),
+            content_type=EXPORT_CONTENT_TYPES[file_format],
+        )
+        response["Content-Disposition"] = f'attachment; filename="programs.{file_format}"'
+        return response
+
+
+class ProfessionalStandardViewSet(CachedResponseMixin, ReadOnlyModelViewSet):
+    """PUBLIC METHOD.
+
+    DESCRIPTION: Профессиональные стандарты. Поддерживает `?fields=` и фильтры.
+    """
+
+    serializer_class = ProfessionalStandardSerializer
+    pagination_class = KeysetPagination
+    filterset_class = ProfessionalStandardFilter
+    cache_models = (ProfessionalStandard, ProfessionalStandardGroup)
+    queryset = ProfessionalStandard.objects.select_related("professional_standard_group")
+
+
+class FederalStateEducationStandardViewSet(CachedResponseMixin, ReadOnlyModelViewSet):
+    """PUBLIC METHOD.
+
+    DESCRIPTION: Федеральные образовательные стандарты. Поддерживает `?fields=` и фильтры.
+    """
+
+    serializer_class = FederalStateEducationStandardSerializer
+    pagination_class = KeysetPagination
+    filterset_class = FederalStateEducationStandardFilter
+    cache_models = (FederalStateEducationStandard, EducationGroup, EduDegree)
+    queryset = FederalStateEducationStandard.objects.select_related("edu_group", "edu_degree")
+
+
+class SearchView(GenericAPIView):
+    """PUBLIC METHOD.
+
+    DESCRIPTION: Поиск программ и профессиональных стандартов с учетом морфологии и опечаток,
+    а также по коду (`09.03.01`, `06.001`). `?q=` - запрос, `?limit=` - число результатов каждого типа.
+    """
+
+    serializer_class = SearchResultsSerializer
+
+    def get(self, request, *args, **kwargs):
+        query = request.query_params.get("q", "").strip()
+        if not query:
+            raise ValidationError({"q": "Укажите поисковый запрос"})
+        limit = query_limit(request, SEARCH_RESULTS_LIMIT, SEARCH_RESULTS_MAX)
+
+        data = get_or_set("search", PROGRAM_CACHE_MODELS, (query, limit), lambda: self.search(query, limit))
+        return Response(data)
+
+    def search(self, query: str, limit: int):
+        programs = search_programs(query, program_queryset().prefetch_related(professional_standards_prefetch()))
+        standards = search_professional_standards(
+            query,
+            ProfessionalStandard.objects.select_related("professional_standard_group"),
+        )
+        return self.get_serializer({"programs": programs[:limit], "professional_standards": standards[:limit]}).data
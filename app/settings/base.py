@@ -31,6 +31,7 @@ INSTALLED_APPS = [
     "django.contrib.sessions",
     "django.contrib.messages",
     "django.contrib.staticfiles",
+    "django.contrib.postgres",
     "django_celery_results",
     "django_celery_beat",
     "django_filters",
@@ -114,6 +115,17 @@ USE_TZ = True
 USE_L10N = True
 
 
+# Кэш общий для веб-процессов и воркеров celery: через него расходятся версии кэша
+# ответов и прогресс загрузки данных, поэтому Redis обязателен (проверка edu_programs.E001)
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.redis.RedisCache",
+        "LOCATION": getenv("REDIS_CACHE_URL", getenv("REDIS_URL")),
+        "KEY_PREFIX": "diplom",
+    },
+}
+
+
 CELERY_RESULT_BACKEND = "django-db"
 CELERY_BROKER_URL = getenv("REDIS_URL")
 CELERY_BROKER_CONNECTION_RETRY_ON_STARTUP = True
@@ -150,6 +162,12 @@ STATIC_ROOT = BASE_DIR / "static"
 MEDIA_URL = "/media/"
 MEDIA_ROOT = BASE_DIR / "mediafiles"
 
+# internal location nginx с каталогом uploads/opop/; если задан, документы ОПОП отдает nginx
+DOCUMENTS_ACCEL_REDIRECT_LOCATION = getenv("DOCUMENTS_ACCEL_REDIRECT_LOCATION", "")
+
+# срок хранения полной истории изменений; более старая сворачивается compact_history
+HISTORY_RETENTION_DAYS = int(getenv("HISTORY_RETENTION_DAYS", "730"))
+
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
 
@@ -213,6 +231,10 @@ ANALYTICS_CONFIG = {
         "competencies": 0.7,
         "disciplines": 0.3,
     },
+    "SIMILARITY_WEIGHTS": {
+        "standards": 0.6,
+        "text": 0.4,
+    },
 }
 
 
@@ -230,7 +252,7 @@ CELERY_BEAT_SCHEDULE = {
         "enabled": False,
     },
     "Сбор данных о направлениях подготовки": {
-        "task": "edu_programs.tasks.parse_vsu_education_programs",
+        "task": "edu_programs.tasks.parse_all_university_programs",
         "schedule": timedelta(days=365),
         "options": {"queue": "default"},
         "enabled": False,
@@ -241,4 +263,22 @@ CELERY_BEAT_SCHEDULE = {
         "options": {"queue": "default"},
         "enabled": False,
     },
+    "Перестроение индекса похожих программ": {
+        "task": "edu_programs.tasks.build_similarity_index",
+        "schedule": timedelta(days=7),
+        "options": {"queue": "default"},
+        "enabled": False,
+    },
+    "Извлечение текста и превью документов ОПОП": {
+        "task": "edu_programs.tasks.build_missing_document_artifacts",
+        "schedule": timedelta(days=1),
+        "options": {"queue": "default"},
+        "enabled": False,
+    },
+    "Сжатие старой истории изменений": {
+        "task": "core.tasks.compact_history_task",
+        "schedule": timedelta(days=7),
+        "options": {"queue": "default"},
+        "enabled": False,
+    },
 }
@@ -0,0 +1,16 @@
+from settings.base import *  # noqa: F403
+
+
+SECRET_KEY = "test"  # noqa: S105
+DEBUG = False
+
+# миграции проектных приложений создаются при развертывании (make migrations), в тестах
+# таблицы строятся по моделям
+MIGRATION_MODULES = {"core": None, "edu_programs": None}
+
+CACHES = {"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+SILENCED_SYSTEM_CHECKS = ["edu_programs.E001"]  # тесты идут в одном процессе
+
+CELERY_TASK_ALWAYS_EAGER = True
+
+PASSWORD_HASHERS = ["django.contrib.auth.hashers.MD5PasswordHasher"]
@@ -2,7 +2,7 @@ from core.views import HealthView
 from django.conf import settings
 from django.conf.urls.static import static
 from django.contrib import admin
-from django.urls import path, re_path
+from django.urls import include, path, re_path
 from drf_spectacular.views import SpectacularAPIView, SpectacularSwaggerView
 
 
@@ -15,6 +15,7 @@ urlpatterns = [
     re_path(r"^api/swagger/$", SpectacularSwaggerView.as_view(url_name="schema"), name="swagger-ui"),
     path("admin/", admin.site.urls),
     path("api/health/", HealthView.as_view()),
+    path("api/", include("edu_programs.urls")),
 ]
 
 